@@ -1,82 +1,244 @@
 """The Anova integration."""
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
+from typing import TYPE_CHECKING
 
-from anova_wifi import AnovaApi
-from anova_wifi import AnovaPrecisionCooker
-from anova_wifi import InvalidLogin
-from anova_wifi import NoDevicesFound
+import aiohttp
+from aiohttp.hdrs import USER_AGENT
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_PASSWORD
 from homeassistant.const import CONF_USERNAME
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
 from homeassistant.const import Platform
+from homeassistant.core import callback
+from homeassistant.core import Event
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers import aiohttp_client
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.helpers.typing import ConfigType
 
+from .const import CONF_PUSH_UPDATES
 from .const import DOMAIN
-from .coordinator import AnovaCoordinator
-from .models import AnovaData
-from .util import serialize_device_list
+from .const import KEEPALIVE_TIMEOUT
+from .const import MAX_CONNECTIONS
+from .const import MAX_CONNECTIONS_PER_HOST
 
-PLATFORMS = [Platform.SENSOR]
+# The API client and everything polling it are imported where they are used,
+# so loading the package for the config flow only costs const
+if TYPE_CHECKING:
+    from .models import AnovaData
+
+PLATFORMS = [Platform.BINARY_SENSOR, Platform.CLIMATE, Platform.SENSOR]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 _LOGGER = logging.getLogger(__name__)
 
 
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Anova services."""
+    # pylint: disable-next=import-outside-toplevel
+    from .services import async_setup_services
+
+    async_setup_services(hass)
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Anova from a config entry."""
+    # pylint: disable=import-outside-toplevel
+    from anova_wifi import AnovaApi, AnovaException, AnovaPrecisionCooker, InvalidLogin
+
+    from .auth import AnovaAuth
+    from .cache import AnovaStateCache
+    from .coordinator import AnovaAccountCoordinator, AnovaCoordinator
+    from .discovery import AnovaDeviceDiscovery
+    from .fleet import AnovaFleet
+    from .models import AnovaData
+    from .scheduler import async_get_scheduler
+
+    setup_start = time.monotonic()
+    session = async_create_account_session(hass)
+
+    async def _async_close_session(_: Event | None = None) -> None:
+        await session.close()
+
+    entry.async_on_unload(_async_close_session)
+    entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_session)
+    )
     api = AnovaApi(
-        aiohttp_client.async_get_clientsession(hass),
+        session,
         entry.data[CONF_USERNAME],
         entry.data[CONF_PASSWORD],
     )
+    auth = AnovaAuth(hass, entry, api)
     try:
-        await api.authenticate()
+        await auth.async_setup()
     except InvalidLogin as err:
         _LOGGER.error(
             "Login was incorrect - please log back in through the config flow. %s", err
         )
         return False
+    except (AnovaException, aiohttp.ClientError, asyncio.TimeoutError) as err:
+        raise ConfigEntryNotReady(f"Could not log in to Anova: {err}") from err
+    entry.async_on_unload(auth.async_stop)
     assert api.jwt
-    api.existing_devices = [
+    # Devices added or removed since the last start are picked up by discovery
+    # in the background instead of delaying setup.
+    devices = api.existing_devices = auth.devices = [
         AnovaPrecisionCooker(
-            aiohttp_client.async_get_clientsession(hass),
+            session,
             device[0],
             device[1],
             api.jwt,
         )
         for device in entry.data["devices"]
     ]
-    try:
-        new_devices = await api.get_devices()
-    except NoDevicesFound:
-        # get_devices raises an exception if no devices are online
-        new_devices = []
-    devices = api.existing_devices
-    if new_devices:
-        hass.config_entries.async_update_entry(
-            entry,
-            data={
-                **entry.data,
-                **{"devices": serialize_device_list(devices)},
-            },
-        )
+    state_cache = AnovaStateCache(hass, entry.entry_id)
+    cached_states = await state_cache.async_load()
     coordinators = [AnovaCoordinator(hass, device) for device in devices]
     for coordinator in coordinators:
-        await coordinator.async_config_entry_first_refresh()
-        firmware_version = coordinator.data.sensor.firmware_version
-        coordinator.async_setup(str(firmware_version))
-    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = AnovaData(
-        api_jwt=api.jwt, precision_cookers=devices, coordinators=coordinators
+        coordinator.state_cache = state_cache
+        if cached := cached_states.get(coordinator.anova_device.device_key):
+            coordinator.async_restore(cached)
+    account_coordinator = AnovaAccountCoordinator(hass, coordinators)
+    entry.async_on_unload(account_coordinator.async_stop)
+    # Polls of all accounts are spread out and rate limited together
+    scheduler = async_get_scheduler(hass)
+    scheduler.async_add_account(account_coordinator)
+    entry.async_on_unload(lambda: scheduler.async_remove_account(account_coordinator))
+    push_listener: AnovaPushListener | None = None
+    if entry.options.get(CONF_PUSH_UPDATES, False):
+        # Only accounts with push updates enabled pay for loading the listener
+        from .push import AnovaPushListener
+
+        push_listener = AnovaPushListener(hass, auth, coordinators)
+        push_listener.async_start()
+        entry.async_on_unload(push_listener.async_stop)
+    fleet = AnovaFleet(entry.entry_id)
+    for coordinator in coordinators:
+        fleet.async_add_coordinator(coordinator)
+    entry.async_on_unload(fleet.async_stop)
+    anova_data = hass.data.setdefault(DOMAIN, {})[entry.entry_id] = AnovaData(
+        auth=auth,
+        precision_cookers=devices,
+        coordinators=coordinators,
+        account_coordinator=account_coordinator,
+        push_listener=push_listener,
+        state_cache=state_cache,
+        fleet=fleet,
+        options=dict(entry.options),
     )
+
+    @callback
+    def _async_stop_programs() -> None:
+        for program in anova_data.programs.values():
+            program.async_stop()
+
+    entry.async_on_unload(_async_stop_programs)
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # Entities start from the cached state, or unavailable for devices without
+    # one, and are refreshed by the scheduler so setup doesn't wait on the cloud
+    account_coordinator.async_refresh_all()
+    discovery = AnovaDeviceDiscovery(hass, entry, anova_data)
+    discovery.async_start()
+    entry.async_on_unload(discovery.async_stop)
+    account_coordinator.stats.setup_time = round(time.monotonic() - setup_start, 3)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
     return True
 
 
+@callback
+def async_create_account_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """Create a client session tuned for polling the cookers of one account.
+
+    Every request goes to the same few Anova hosts, so connections are kept
+    alive for reuse and capped per host instead of sharing the general purpose
+    Home Assistant session.
+    """
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=MAX_CONNECTIONS,
+            limit_per_host=MAX_CONNECTIONS_PER_HOST,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+            enable_cleanup_closed=True,
+        ),
+        headers={USER_AGENT: SERVER_SOFTWARE},
+    )
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    # Discovery also updates the entry when the device list changes, which is
+    # handled without a reload.
+    anova_data: AnovaData = hass.data[DOMAIN][entry.entry_id]
+    if entry.options != anova_data.options:
+        await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        anova_data: AnovaData = hass.data[DOMAIN].pop(entry.entry_id)
+        # A save left pending could recreate the store after the entry is removed
+        await anova_data.state_cache.async_flush()
 
     return unload_ok
+
+
+async def async_remove_config_entry_device(
+    hass: HomeAssistant, entry: ConfigEntry, device_entry: dr.DeviceEntry
+) -> bool:
+    """Let the user remove a cooker that is no longer responding."""
+    # pylint: disable=import-outside-toplevel
+    from .discovery import async_remove_device
+    from .util import serialize_device_list
+
+    anova_data: AnovaData = hass.data[DOMAIN][entry.entry_id]
+    device_key = next(
+        (
+            identifier
+            for domain, identifier in device_entry.identifiers
+            if domain == DOMAIN
+        ),
+        None,
+    )
+    coordinator = next(
+        (
+            coordinator
+            for coordinator in anova_data.coordinators
+            if coordinator.anova_device.device_key == device_key
+        ),
+        None,
+    )
+    if coordinator is None:
+        # The account device holds the aggregates and goes with the entry
+        return device_key != entry.entry_id
+    if coordinator.last_update_success and coordinator.data is not None:
+        # A cooker that still answers is on the account and would come back
+        return False
+    async_remove_device(hass, anova_data, coordinator.anova_device.device_key)
+    hass.config_entries.async_update_entry(
+        entry,
+        data={
+            **entry.data,
+            "devices": serialize_device_list(anova_data.precision_cookers),
+        },
+    )
+    return True
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the cached token and states of a deleted config entry."""
+    # pylint: disable=import-outside-toplevel
+    from .auth import auth_store
+    from .cache import state_store
+
+    await auth_store(hass, entry.entry_id).async_remove()
+    await state_store(hass, entry.entry_id).async_remove()
@@ -0,0 +1,183 @@
+"""Token handling for the Anova integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+from typing import TypeVar
+
+import aiohttp
+from anova_wifi import AnovaApi
+from anova_wifi import AnovaException
+from anova_wifi import AnovaPrecisionCooker
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import callback
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DEFAULT_JWT_LIFETIME
+from .const import DOMAIN
+from .const import FIREBASE_TOKEN_LIFETIME
+from .const import JWT_REFRESH_MARGIN
+from .const import MAX_TOKEN_REFRESH_RETRY_INTERVAL
+from .const import TOKEN_REFRESH_RETRY_INTERVAL
+from .util import jwt_expiry
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+_T = TypeVar("_T")
+
+
+def auth_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """Return the store holding the cached token for a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.auth")
+
+
+class AnovaAuth:
+    """Caches the Anova JWT and serializes logins for an account."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        api: AnovaApi,
+    ) -> None:
+        """Set up the token handler."""
+        self.hass = hass
+        self.api = api
+        self.devices: list[AnovaPrecisionCooker] = []
+        self._entry = entry
+        self._store = auth_store(hass, entry.entry_id)
+        self._lock = asyncio.Lock()
+        self._jwt_expires: datetime | None = None
+        self._firebase_expires: datetime | None = None
+        self._unsub_refresh: Callable[[], None] | None = None
+        self._refresh_failures = 0
+
+    @property
+    def jwt(self) -> str | None:
+        """Return the current Anova JWT."""
+        return self.api.jwt
+
+    async def async_setup(self) -> None:
+        """Reuse a cached token when it is still valid, otherwise log in."""
+        cached = await self._store.async_load() or {}
+        jwt = cached.get("jwt") or self._entry.data.get("jwt")
+        expires: datetime | None = None
+        if cached.get("expires"):
+            expires = dt_util.parse_datetime(cached["expires"])
+        elif jwt:
+            expires = jwt_expiry(jwt)
+        if jwt and expires and expires - JWT_REFRESH_MARGIN > dt_util.utcnow():
+            _LOGGER.debug("Reusing cached Anova token valid until %s", expires)
+            self.api.jwt = jwt
+            self._jwt_expires = expires
+            self._async_schedule_refresh()
+            return
+        await self.async_reauthenticate()
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel the scheduled token refresh."""
+        if self._unsub_refresh is not None:
+            self._unsub_refresh()
+            self._unsub_refresh = None
+
+    async def async_reauthenticate(self, failed_jwt: str | None = None) -> str:
+        """Log in again, at most once for a burst of callers.
+
+        Callers that saw a token rejected pass it as failed_jwt, if another
+        caller already replaced that token while they waited on the lock, the
+        new token is returned without logging in again.
+        """
+        async with self._lock:
+            if failed_jwt is not None and self.api.jwt not in (None, failed_jwt):
+                return self.api.jwt
+            await self._async_login()
+        assert self.api.jwt is not None
+        return self.api.jwt
+
+    async def async_ensure_firebase_token(self) -> str:
+        """Return a Firebase token, logging in if it has expired.
+
+        Device discovery and the push websocket need it, polling does not.
+        """
+        async with self._lock:
+            if (
+                self.api._firebase_jwt is None
+                or self._firebase_expires is None
+                or self._firebase_expires <= dt_util.utcnow()
+            ):
+                await self._async_login()
+        assert self.api._firebase_jwt is not None
+        return self.api._firebase_jwt
+
+    async def async_call(self, func: Callable[..., Awaitable[_T]], *args: Any) -> _T:
+        """Call a device command, logging in again once if it is rejected."""
+        jwt = self.api.jwt
+        try:
+            return await func(*args)
+        except AnovaException:
+            raise
+        except Exception as err:  # pylint: disable=broad-except
+            # anova_wifi raises a bare Exception with the response body when a
+            # command is refused, which is what an expired token looks like.
+            _LOGGER.debug("Anova command failed, logging in again: %s", err)
+        await self.async_reauthenticate(jwt)
+        return await func(*args)
+
+    async def _async_login(self) -> None:
+        """Log in and persist the new token. Must hold the lock."""
+        _LOGGER.debug("Logging in to Anova")
+        await self.api.authenticate()
+        assert self.api.jwt is not None
+        now = dt_util.utcnow()
+        self._firebase_expires = now + FIREBASE_TOKEN_LIFETIME
+        self._jwt_expires = jwt_expiry(self.api.jwt) or now + DEFAULT_JWT_LIFETIME
+        for device in self.devices:
+            # The cookers keep their own copy of the token for commands
+            device._jwt = self.api.jwt
+        await self._store.async_save(
+            {"jwt": self.api.jwt, "expires": self._jwt_expires.isoformat()}
+        )
+        self._async_schedule_refresh()
+
+    @callback
+    def _async_schedule_refresh(self) -> None:
+        """Refresh the token in the background shortly before it expires."""
+        self.async_stop()
+        if self._jwt_expires is None:
+            return
+        self._unsub_refresh = async_track_point_in_utc_time(
+            self.hass,
+            self._async_scheduled_refresh,
+            max(self._jwt_expires - JWT_REFRESH_MARGIN, dt_util.utcnow()),
+        )
+
+    async def _async_scheduled_refresh(self, _: datetime) -> None:
+        """Refresh the token ahead of its expiry."""
+        self._unsub_refresh = None
+        try:
+            await self.async_reauthenticate(self.api.jwt)
+        except (AnovaException, aiohttp.ClientError, asyncio.TimeoutError) as err:
+            # Retry with backoff, the token is refreshed well before it expires
+            retry_in = min(
+                TOKEN_REFRESH_RETRY_INTERVAL * 2**self._refresh_failures,
+                MAX_TOKEN_REFRESH_RETRY_INTERVAL,
+            )
+            self._refresh_failures += 1
+            _LOGGER.warning(
+                "Could not refresh the Anova token, retrying in %s: %s", retry_in, err
+            )
+            self._unsub_refresh = async_track_point_in_utc_time(
+                self.hass, self._async_scheduled_refresh, dt_util.utcnow() + retry_in
+            )
+        else:
+            self._refresh_failures = 0
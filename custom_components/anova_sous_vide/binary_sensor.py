@@ -1,73 +1,133 @@
-# from homeassistant import config_entries
-# from .coordinator import AnovaCoordinator
-# from .entity import AnovaEntity
-# from homeassistant.components.binary_sensor import (
-#     BinarySensorEntity,
-#     BinarySensorEntityDescription,
-# )
-# from anova_wifi import AnovaPrecisionCookerBinarySensor
-# from .const import DOMAIN
-# from homeassistant.core import HomeAssistant
-# from homeassistant.helpers.entity_platform import AddEntitiesCallback
-
-# SENSOR_DESCRIPTIONS: list[BinarySensorEntityDescription] = [
-#     BinarySensorEntityDescription(
-#         AnovaPrecisionCookerBinarySensor.COOKING, name="Cooking"
-#     ),
-#     BinarySensorEntityDescription(
-#         AnovaPrecisionCookerBinarySensor.PREHEATING, name="Preheating"
-#     ),
-#     BinarySensorEntityDescription(
-#         AnovaPrecisionCookerBinarySensor.MAINTAINING, name="Maintaining"
-#     ),
-#     BinarySensorEntityDescription(
-#         AnovaPrecisionCookerBinarySensor.DEVICE_SAFE, name="Device is safe"
-#     ),
-#     BinarySensorEntityDescription(
-#         AnovaPrecisionCookerBinarySensor.WATER_LEAK, name="Water leak"
-#     ),
-#     BinarySensorEntityDescription(
-#         AnovaPrecisionCookerBinarySensor.WATER_LEVEL_CRITICAL,
-#         name="Water level critical",
-#     ),
-#     BinarySensorEntityDescription(
-#         AnovaPrecisionCookerBinarySensor.WATER_TEMP_TOO_HIGH,
-#         name="Water temperature too high",
-#     ),
-# ]
-
-
-# async def async_setup_entry(
-#     hass: HomeAssistant,
-#     entry: config_entries.ConfigEntry,
-#     async_add_entities: AddEntitiesCallback,
-# ) -> None:
-#     """Set up Anova device."""
-#     coordinators = hass.data[DOMAIN][entry.entry_id]
-#     for coordinator in coordinators.values():
-#         await coordinator.async_config_entry_first_refresh()
-#         sensors = [
-#             AnovaPrecissionCookerBinarySensor(coordinator, description)
-#             for description in SENSOR_DESCRIPTIONS if coordinator.data["binary_sensors"][description.key] is not None
-#         ]
-#         async_add_entities(sensors)
-
-
-# class AnovaPrecissionCookerBinarySensor(AnovaEntity, BinarySensorEntity):
-#     """Representation of an Anova Precission Cooker binary sensor."""
-
-#     def __init__(
-#         self, coordinator: AnovaCoordinator, description: BinarySensorEntityDescription
-#     ) -> None:
-#         """Initialize the binary sensor."""
-#         super().__init__(coordinator)
-#         self.entity_description = description
-#         self._sensor_update_key = description.key
-#         self._attr_unique_id = (
-#             f"{coordinator._device_unique_id}_{description.key}".lower()
-#         )
-
-#     @property
-#     def is_on(self) -> bool:
-#         """Return if motion is detected."""
-#         return self.coordinator.data["binary_sensors"][self._sensor_update_key]
+"""Support for Anova Binary Sensors."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from homeassistant import config_entries
+from homeassistant.components.binary_sensor import BinarySensorDeviceClass
+from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.components.binary_sensor import BinarySensorEntityDescription
+from homeassistant.core import callback
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+from .coordinator import AnovaCoordinator
+from .entity import AnovaDescriptionEntity
+from .entity import AnovaFleetEntity
+from .fleet import AnovaFleet
+from .models import AnovaData
+from .util import signal_new_coordinator
+
+
+@dataclass
+class AnovaFleetBinarySensorEntityDescriptionMixin:
+    """Describes the mixin variables for anova account aggregate binary sensors."""
+
+    value_fn: Callable[[AnovaFleet], bool]
+
+
+@dataclass
+class AnovaFleetBinarySensorEntityDescription(
+    BinarySensorEntityDescription, AnovaFleetBinarySensorEntityDescriptionMixin
+):
+    """Describes a Anova account aggregate binary sensor."""
+
+
+BINARY_SENSOR_DESCRIPTIONS: list[BinarySensorEntityDescription] = [
+    BinarySensorEntityDescription(
+        key="cooking",
+        device_class=BinarySensorDeviceClass.RUNNING,
+        translation_key="cooking",
+    ),
+    BinarySensorEntityDescription(
+        key="preheating",
+        device_class=BinarySensorDeviceClass.HEAT,
+        translation_key="preheating",
+    ),
+    BinarySensorEntityDescription(
+        key="maintaining",
+        device_class=BinarySensorDeviceClass.RUNNING,
+        translation_key="maintaining",
+    ),
+    BinarySensorEntityDescription(
+        key="device_safe",
+        translation_key="device_safe",
+        icon="mdi:shield-check",
+    ),
+    BinarySensorEntityDescription(
+        key="water_leak",
+        device_class=BinarySensorDeviceClass.MOISTURE,
+        translation_key="water_leak",
+    ),
+    BinarySensorEntityDescription(
+        key="water_level_critical",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        translation_key="water_level_critical",
+    ),
+    BinarySensorEntityDescription(
+        key="water_temp_too_high",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        translation_key="water_temp_too_high",
+    ),
+]
+
+FLEET_BINARY_SENSOR_DESCRIPTIONS: list[AnovaFleetBinarySensorEntityDescription] = [
+    AnovaFleetBinarySensorEntityDescription(
+        key="any_water_temp_too_high",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        translation_key="any_water_temp_too_high",
+        value_fn=lambda fleet: fleet.over_temperature > 0,
+    ),
+]
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: config_entries.ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up Anova device."""
+    anova_data: AnovaData = hass.data[DOMAIN][entry.entry_id]
+
+    @callback
+    def _async_add_coordinators(coordinators: list[AnovaCoordinator]) -> None:
+        """Add binary sensors for cookers."""
+        async_add_entities(
+            AnovaBinarySensor(coordinator, description)
+            for coordinator in coordinators
+            for description in BINARY_SENSOR_DESCRIPTIONS
+        )
+
+    _async_add_coordinators(anova_data.coordinators)
+    async_add_entities(
+        AnovaFleetBinarySensor(anova_data.fleet, entry.entry_id, description)
+        for description in FLEET_BINARY_SENSOR_DESCRIPTIONS
+    )
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, signal_new_coordinator(entry.entry_id), _async_add_coordinators
+        )
+    )
+
+
+class AnovaBinarySensor(AnovaDescriptionEntity, BinarySensorEntity):
+    """A binary sensor using Anova coordinator."""
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return the state."""
+        return self.coordinator.snapshot[self._snapshot_index]
+
+
+class AnovaFleetBinarySensor(AnovaFleetEntity, BinarySensorEntity):
+    """A binary sensor showing an aggregate over all cookers of an account."""
+
+    entity_description: AnovaFleetBinarySensorEntityDescription
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return the state."""
+        return self.entity_description.value_fn(self.fleet)
@@ -0,0 +1,80 @@
+"""Persistent last known state of Anova cookers."""
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from anova_wifi import APCUpdate
+from anova_wifi import APCUpdateBinary
+from anova_wifi import APCUpdateSensor
+from homeassistant.core import callback
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .const import STATE_SAVE_DELAY
+
+STORAGE_VERSION = 1
+
+
+def state_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """Return the store holding the last known state for a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.state")
+
+
+class AnovaStateCache:
+    """Keeps the last update of every cooker so entities can restore it.
+
+    Updates are kept as they are and only turned into dicts when the store
+    writes them, after the save delay.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Set up the cache."""
+        self._store = state_store(hass, entry_id)
+        self._updates: dict[str, APCUpdate] = {}
+        self._save_pending = False
+
+    async def async_load(self) -> dict[str, APCUpdate]:
+        """Load the cached updates, keyed by device key."""
+        states: dict[str, dict[str, Any]] = await self._store.async_load() or {}
+        for device_key, state in states.items():
+            try:
+                self._updates[device_key] = APCUpdate(
+                    binary_sensor=APCUpdateBinary(**state["binary_sensor"]),
+                    sensor=APCUpdateSensor(**state["sensor"]),
+                )
+            except (KeyError, TypeError):
+                # Written by a different version of anova_wifi, ignore it
+                continue
+        return dict(self._updates)
+
+    @callback
+    def async_update(self, device_key: str, data: APCUpdate) -> None:
+        """Remember the latest update of a device and save it later."""
+        self._updates[device_key] = data
+        self._async_schedule_save()
+
+    @callback
+    def async_remove(self, device_key: str) -> None:
+        """Forget a device that was removed from the account."""
+        if self._updates.pop(device_key, None) is not None:
+            self._async_schedule_save()
+
+    async def async_flush(self) -> None:
+        """Write a pending save now, so none is left behind on unload."""
+        if self._save_pending:
+            await self._store.async_save(self._data_to_save())
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Save after the delay, unless a save is already pending."""
+        if not self._save_pending:
+            self._save_pending = True
+            self._store.async_delay_save(self._data_to_save, STATE_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, dict[str, Any]]:
+        """Return the data to store."""
+        self._save_pending = False
+        return {device_key: asdict(data) for device_key, data in self._updates.items()}
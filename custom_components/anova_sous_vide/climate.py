@@ -1,105 +1,219 @@
-# """Climate entities for Anova."""
-# from typing import Any
-# from anova_wifi import AnovaPrecisionCookerBinarySensor, AnovaPrecisionCookerSensor
-# from homeassistant import config_entries
-# from homeassistant.components.climate import (
-#     ClimateEntity,
-#     ClimateEntityFeature,
-#     HVACAction,
-#     HVACMode,
-# )
-# from homeassistant.const import ATTR_TEMPERATURE, UnitOfTemperature
-# from homeassistant.core import HomeAssistant
-# from homeassistant.helpers import entity_platform
-# from .const import DOMAIN
-# from .coordinator import AnovaCoordinator
-# from .entity import AnovaEntity
-# from .models import AnovaData
-# async def async_setup_entry(
-#     hass: HomeAssistant,
-#     entry: config_entries.ConfigEntry,
-#     async_add_entities: entity_platform.AddEntitiesCallback,
-# ) -> None:
-#     """Set up Anova device."""
-#     anova_data: AnovaData = hass.data[DOMAIN][entry.entry_id]
-#     async_add_entities(
-#         AnovaSousVideClimateDevice(coordinator)
-#         for coordinator in anova_data.coordinators
-#     )
-# class AnovaSousVideClimateDevice(AnovaEntity, ClimateEntity):
-#     """Controls setting the temperature of a Anoav sous vide."""
-#     # Important to note - while the device supports displaying both celsius and farenheit, it always responds to the api in celsius
-#     _attr_temperature_unit = UnitOfTemperature.CELSIUS
-#     _attr_hvac_modes = [HVACMode.OFF, HVACMode.HEAT]
-#     _attr_supported_features = ClimateEntityFeature.TARGET_TEMPERATURE
-#     _attr_min_temp = 0.0  # celsius
-#     _attr_max_temp = 63.33  # celsius
-#     def __init__(self, coordinator: AnovaCoordinator) -> None:
-#         """Set up sous vide climate entity."""
-#         super().__init__(coordinator)
-#         self._attr_unique_id = f"{coordinator._device_unique_id}_climate"
-#     @property
-#     def current_temperature(self) -> float | None:
-#         """Get current temperature of the water in the sous vide."""
-#         return float(
-#             self.coordinator.data["sensors"][
-#                 AnovaPrecisionCookerSensor.WATER_TEMPERATURE
-#             ]
-#         )
-#     @property
-#     def target_temperature(self) -> float | None:
-#         """Get current target temperature of the sous vide."""
-#         return float(
-#             self.coordinator.data["sensors"][
-#                 AnovaPrecisionCookerSensor.TARGET_TEMPERATURE
-#             ]
-#         )
-#     @property
-#     def hvac_mode(self) -> HVACMode:
-#         """Get the current hvac mode of the sous vide."""
-#         return (
-#             HVACMode.HEAT
-#             if self.coordinator.data["binary_sensors"][
-#                 AnovaPrecisionCookerBinarySensor.COOKING
-#             ]
-#             or self.coordinator.data["binary_sensors"][
-#                 AnovaPrecisionCookerBinarySensor.PREHEATING
-#             ]
-#             or self.coordinator.data["binary_sensors"][
-#                 AnovaPrecisionCookerBinarySensor.MAINTAINING
-#             ]
-#             else HVACMode.OFF
-#         )
-#     @property
-#     def hvac_action(self) -> HVACAction | None:
-#         """Get the current heating action of the sous vide."""
-#         if self.coordinator.data["binary_sensors"][
-#             AnovaPrecisionCookerBinarySensor.PREHEATING
-#         ]:
-#             return HVACAction.HEATING
-#         if self.coordinator.data["binary_sensors"][
-#             AnovaPrecisionCookerBinarySensor.COOKING
-#         ]:
-#             return HVACAction.HEATING
-#         if self.coordinator.data["binary_sensors"][
-#             AnovaPrecisionCookerBinarySensor.MAINTAINING
-#         ]:
-#             return HVACAction.IDLE
-#         return HVACAction.OFF
-#     async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
-#         """Set the hvac mode of the sous vide."""
-#         if hvac_mode == HVACMode.OFF:
-#             await self.device.set_mode("IDLE")
-#         elif hvac_mode == HVACMode.HEAT:
-#             await self.device.set_mode("COOK")
-#         else:
-#             raise NotImplementedError
-#     async def async_set_temperature(self, **kwargs: Any) -> None:
-#         """Set the target temperature of the sous vide."""
-#         await self.device.set_target_temperature(kwargs[ATTR_TEMPERATURE])
-#     async def async_turn_on(self) -> None:
-#         """Start a sous vide cook."""
-#         await self.device.set_mode("COOK")
-#     async def async_turn_off(self) -> None:
-#         """Stop a sous vide cook."""
-#         await self.device.set_mode("IDLE")
+"""Climate entities for Anova."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant import config_entries
+from homeassistant.components.climate import ATTR_HVAC_MODE
+from homeassistant.components.climate import ClimateEntity
+from homeassistant.components.climate import ClimateEntityFeature
+from homeassistant.components.climate import HVACAction
+from homeassistant.components.climate import HVACMode
+from homeassistant.const import ATTR_TEMPERATURE
+from homeassistant.const import UnitOfTemperature
+from homeassistant.core import callback
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import entity_platform
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .auth import AnovaAuth
+from .const import DOMAIN
+from .const import SET_TEMPERATURE_DEBOUNCE
+from .const import TARGET_TEMPERATURE_TOLERANCE
+from .coordinator import AnovaCoordinator
+from .entity import AnovaEntity
+from .models import AnovaData
+from .snapshot import SNAPSHOT_INDEX
+from .snapshot import snapshot_indices
+from .util import signal_new_coordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+_WATER_TEMPERATURE = SNAPSHOT_INDEX["water_temperature"]
+_TARGET_TEMPERATURE = SNAPSHOT_INDEX["target_temperature"]
+_COOKING = SNAPSHOT_INDEX["cooking"]
+_PREHEATING = SNAPSHOT_INDEX["preheating"]
+_MAINTAINING = SNAPSHOT_INDEX["maintaining"]
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: config_entries.ConfigEntry,
+    async_add_entities: entity_platform.AddEntitiesCallback,
+) -> None:
+    """Set up Anova device."""
+    anova_data: AnovaData = hass.data[DOMAIN][entry.entry_id]
+
+    @callback
+    def _async_add_coordinators(coordinators: list[AnovaCoordinator]) -> None:
+        """Add climate entities for cookers."""
+        async_add_entities(
+            AnovaSousVideClimateDevice(coordinator, anova_data.auth)
+            for coordinator in coordinators
+        )
+
+    _async_add_coordinators(anova_data.coordinators)
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, signal_new_coordinator(entry.entry_id), _async_add_coordinators
+        )
+    )
+
+
+class AnovaSousVideClimateDevice(AnovaEntity, ClimateEntity):
+    """Controls setting the temperature of a Anova sous vide."""
+
+    # Important to note - while the device supports displaying both celsius and farenheit, it always responds to the api in celsius
+    _attr_temperature_unit = UnitOfTemperature.CELSIUS
+    _attr_hvac_modes = [HVACMode.OFF, HVACMode.HEAT]
+    _attr_supported_features = ClimateEntityFeature.TARGET_TEMPERATURE
+    _attr_min_temp = 0.0  # celsius
+    _attr_max_temp = 63.33  # celsius
+    _attr_name = None
+    _snapshot_indices = snapshot_indices(
+        "water_temperature",
+        "target_temperature",
+        "cooking",
+        "preheating",
+        "maintaining",
+    )
+
+    def __init__(self, coordinator: AnovaCoordinator, auth: AnovaAuth) -> None:
+        """Set up sous vide climate entity."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{coordinator._device_unique_id}_climate"
+        self._auth = auth
+        # Shown until the device confirms them, so the UI reacts immediately
+        self._optimistic_target: float | None = None
+        self._optimistic_hvac_mode: HVACMode | None = None
+        # Coalesces slider drags into a single write to the cloud
+        self._set_temperature_debouncer = Debouncer(
+            coordinator.hass,
+            _LOGGER,
+            cooldown=SET_TEMPERATURE_DEBOUNCE,
+            immediate=False,
+            function=self._async_write_target_temperature,
+        )
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel a pending temperature write."""
+        self._set_temperature_debouncer.async_cancel()
+        await super().async_will_remove_from_hass()
+
+    @property
+    def current_temperature(self) -> float | None:
+        """Get current temperature of the water in the sous vide."""
+        return float(self.coordinator.snapshot[_WATER_TEMPERATURE])
+
+    @property
+    def target_temperature(self) -> float | None:
+        """Get current target temperature of the sous vide."""
+        if self._optimistic_target is not None:
+            return self._optimistic_target
+        return float(self.coordinator.snapshot[_TARGET_TEMPERATURE])
+
+    @property
+    def hvac_mode(self) -> HVACMode:
+        """Get the current hvac mode of the sous vide."""
+        if self._optimistic_hvac_mode is not None:
+            return self._optimistic_hvac_mode
+        return HVACMode.HEAT if self._is_running else HVACMode.OFF
+
+    @property
+    def hvac_action(self) -> HVACAction | None:
+        """Get the current heating action of the sous vide."""
+        snapshot = self.coordinator.snapshot
+        if snapshot[_PREHEATING] or snapshot[_COOKING]:
+            return HVACAction.HEATING
+        if snapshot[_MAINTAINING]:
+            return HVACAction.IDLE
+        return HVACAction.OFF
+
+    @property
+    def _is_running(self) -> bool:
+        """Return if the sous vide is running a cook."""
+        snapshot = self.coordinator.snapshot
+        return bool(
+            snapshot[_COOKING] or snapshot[_PREHEATING] or snapshot[_MAINTAINING]
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Drop optimistic values once the device reports them."""
+        if self.coordinator.snapshot is not None:
+            if (
+                self._optimistic_target is not None
+                and abs(
+                    float(self.coordinator.snapshot[_TARGET_TEMPERATURE])
+                    - self._optimistic_target
+                )
+                <= TARGET_TEMPERATURE_TOLERANCE
+            ):
+                self._optimistic_target = None
+            if (
+                self._optimistic_hvac_mode is not None
+                and self._optimistic_hvac_mode
+                == (HVACMode.HEAT if self._is_running else HVACMode.OFF)
+            ):
+                self._optimistic_hvac_mode = None
+        super()._handle_coordinator_update()
+
+    async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
+        """Set the hvac mode of the sous vide."""
+        if hvac_mode not in self._attr_hvac_modes:
+            raise ServiceValidationError(f"Unsupported HVAC mode: {hvac_mode}")
+        self._optimistic_hvac_mode = hvac_mode
+        self.async_write_ha_state()
+        try:
+            await self._auth.async_call(
+                self.device.set_mode, "COOK" if hvac_mode == HVACMode.HEAT else "IDLE"
+            )
+        except Exception as err:  # pylint: disable=broad-except
+            self._optimistic_hvac_mode = None
+            self.async_write_ha_state()
+            raise HomeAssistantError(f"Could not set the mode: {err}") from err
+        await self.coordinator.async_refresh()
+        # Whatever the cooker reports after the write is the truth from now on
+        if self._optimistic_hvac_mode == hvac_mode:
+            self._optimistic_hvac_mode = None
+            self.async_write_ha_state()
+
+    async def async_set_temperature(self, **kwargs: Any) -> None:
+        """Set the target temperature of the sous vide."""
+        if (hvac_mode := kwargs.get(ATTR_HVAC_MODE)) is not None:
+            await self.async_set_hvac_mode(hvac_mode)
+        if (temperature := kwargs.get(ATTR_TEMPERATURE)) is None:
+            return
+        self._optimistic_target = round(float(temperature), 2)
+        self.async_write_ha_state()
+        await self._set_temperature_debouncer.async_call()
+
+    async def _async_write_target_temperature(self) -> None:
+        """Send the latest requested target temperature to the sous vide."""
+        if (target := self._optimistic_target) is None:
+            return
+        try:
+            await self._auth.async_call(self.device.set_target_temperature, target)
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.error("Could not set the target temperature: %s", err)
+            self._optimistic_target = None
+            self.async_write_ha_state()
+            return
+        await self.coordinator.async_refresh()
+        # Unless a newer target was requested meanwhile, whatever the cooker
+        # reports after the write is the truth from now on
+        if self._optimistic_target == target:
+            self._optimistic_target = None
+            self.async_write_ha_state()
+
+    async def async_turn_on(self) -> None:
+        """Start a sous vide cook."""
+        await self.async_set_hvac_mode(HVACMode.HEAT)
+
+    async def async_turn_off(self) -> None:
+        """Stop a sous vide cook."""
+        await self.async_set_hvac_mode(HVACMode.OFF)
@@ -1,17 +1,27 @@
 """Config flow for Anova."""
 from __future__ import annotations
 
+from typing import Any
+
 import voluptuous as vol
-from anova_wifi import AnovaApi
-from anova_wifi import AnovaOffline
-from anova_wifi import InvalidLogin
-from anova_wifi import NoDevicesFound
 from homeassistant import config_entries
 from homeassistant.const import CONF_PASSWORD
+from homeassistant.const import CONF_SCAN_INTERVAL
 from homeassistant.const import CONF_USERNAME
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers import aiohttp_client
+from homeassistant.util import dt as dt_util
 
+from .const import CONF_FAST_SCAN_INTERVAL
+from .const import CONF_IDLE_SCAN_INTERVAL
+from .const import CONF_PUSH_UPDATES
+from .const import CONF_RAW_TEMPERATURE_SENSORS
+from .const import CONF_TEMPERATURE_DEADBAND
+from .const import DEFAULT_FAST_SCAN_INTERVAL
+from .const import DEFAULT_IDLE_SCAN_INTERVAL
+from .const import DEFAULT_SCAN_INTERVAL
+from .const import DEFAULT_TEMPERATURE_DEADBAND
 from .const import DOMAIN
 
 
@@ -20,12 +30,25 @@ class AnovaConfligFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Get the options flow for this handler."""
+        return AnovaOptionsFlow(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, str] | None = None
     ) -> FlowResult:
         """Handle a flow initiated by the user."""
         errors: dict[str, str] = {}
         if user_input is not None:
+            # The API client is only needed once credentials are submitted,
+            # not to show the form or the options flow.
+            # pylint: disable-next=import-outside-toplevel
+            from anova_wifi import AnovaApi, AnovaOffline, InvalidLogin, NoDevicesFound
+
             api = AnovaApi(
                 aiohttp_client.async_get_clientsession(self.hass),
                 user_input[CONF_USERNAME],
@@ -49,7 +72,13 @@ class AnovaConfligFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     ]
                     return self.async_create_entry(
                         title="Anova Sous Vide",
-                        data={"jwt": api.jwt, "devices": device_list},
+                        data={
+                            CONF_USERNAME: user_input[CONF_USERNAME],
+                            CONF_PASSWORD: user_input[CONF_PASSWORD],
+                            "jwt": api.jwt,
+                            "devices": device_list,
+                            "discovered_at": dt_util.utcnow().isoformat(),
+                        },
                     )
 
                 except NoDevicesFound:
@@ -62,3 +91,57 @@ class AnovaConfligFlow(config_entries.ConfigFlow, domain=DOMAIN):
             ),
             errors=errors,
         )
+
+
+class AnovaOptionsFlow(config_entries.OptionsFlow):
+    """Handle Anova options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the polling intervals."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_FAST_SCAN_INTERVAL,
+                        default=options.get(
+                            CONF_FAST_SCAN_INTERVAL, DEFAULT_FAST_SCAN_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    vol.Required(
+                        CONF_SCAN_INTERVAL,
+                        default=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5)),
+                    vol.Required(
+                        CONF_IDLE_SCAN_INTERVAL,
+                        default=options.get(
+                            CONF_IDLE_SCAN_INTERVAL, DEFAULT_IDLE_SCAN_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5)),
+                    vol.Required(
+                        CONF_TEMPERATURE_DEADBAND,
+                        default=options.get(
+                            CONF_TEMPERATURE_DEADBAND, DEFAULT_TEMPERATURE_DEADBAND
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                    vol.Required(
+                        CONF_PUSH_UPDATES,
+                        default=options.get(CONF_PUSH_UPDATES, False),
+                    ): bool,
+                    vol.Required(
+                        CONF_RAW_TEMPERATURE_SENSORS,
+                        default=options.get(CONF_RAW_TEMPERATURE_SENSORS, True),
+                    ): bool,
+                }
+            ),
+        )
@@ -1,6 +1,100 @@
 """Constants for the Anova Sous Vide integration."""
+from datetime import timedelta
 
 DOMAIN = "anova_sous_vide"
 
 ANOVA_CLIENT = "anova_api_client"
 ANOVA_FIRMWARE_VERSION = "anova_firmware_version"
+
+CONF_FAST_SCAN_INTERVAL = "fast_scan_interval"
+CONF_IDLE_SCAN_INTERVAL = "idle_scan_interval"
+CONF_PUSH_UPDATES = "push_updates"
+CONF_TEMPERATURE_DEADBAND = "temperature_deadband"
+CONF_RAW_TEMPERATURE_SENSORS = "raw_temperature_sensors"
+
+# Polling intervals in seconds
+DEFAULT_FAST_SCAN_INTERVAL = 5
+DEFAULT_SCAN_INTERVAL = 30
+DEFAULT_IDLE_SCAN_INTERVAL = 300
+MAX_OFFLINE_SCAN_INTERVAL = 900
+# Seconds to wait for a device to answer, and for a probe of an offline one
+UPDATE_TIMEOUT = 5
+PROBE_TIMEOUT = 3
+# Consecutive failures after which a device is only probed
+CIRCUIT_BREAKER_THRESHOLD = 3
+# Poll fast once less than this many seconds of the cook remain
+NEARLY_DONE_THRESHOLD = 300
+# Maximum number of cookers polled at the same time for one account
+MAX_CONCURRENT_UPDATES = 4
+# Polls started per second across all accounts, with short bursts allowed
+MAX_REQUESTS_PER_SECOND = 2.0
+MAX_REQUEST_BURST = 4
+# How often the shared scheduler looks for cookers due to be polled
+SCHEDULER_TICK_INTERVAL = timedelta(seconds=1)
+
+# Poll this often, in seconds, while a device receives pushed updates
+PUSH_SAFETY_SCAN_INTERVAL = 300
+MAX_PUSH_RECONNECT_INTERVAL = 300
+
+# Used when the Anova JWT carries no expiry claim
+DEFAULT_JWT_LIFETIME = timedelta(days=30)
+# Refresh the Anova JWT this long before it expires
+JWT_REFRESH_MARGIN = timedelta(days=1)
+# A failed token refresh is retried after this long, doubling up to the maximum
+TOKEN_REFRESH_RETRY_INTERVAL = timedelta(minutes=1)
+MAX_TOKEN_REFRESH_RETRY_INTERVAL = timedelta(hours=1)
+# Firebase ID tokens are valid for an hour, renew them a little early
+FIREBASE_TOKEN_LIFETIME = timedelta(minutes=55)
+
+# Temperature changes smaller than this, in °C, don't update entities
+DEFAULT_TEMPERATURE_DEADBAND = 0.1
+TEMPERATURE_KEYS = ("heater_temperature", "triac_temperature", "water_temperature")
+# Heating rate changes smaller than this, in °C per minute, don't update it
+HEATING_RATE_DEADBAND = 0.02
+
+# A cook counts as on target while the water is within this many °C of it
+COOK_ON_TARGET_BAND = 0.5
+
+# Number of recent samples kept per device for derived sensors
+HISTORY_SIZE = 240
+# Samples spanned when computing the heating rate
+HISTORY_RATE_SAMPLES = 6
+
+# Fired when the cook timer of a cooker runs out
+EVENT_COOK_COMPLETE = f"{DOMAIN}_cook_complete"
+# Only move the completion timer once polls put the cook end this far off
+COOK_END_TOLERANCE = timedelta(seconds=2)
+
+# Fired when a cook program starts a stage and when it ends
+EVENT_PROGRAM_STAGE = f"{DOMAIN}_program_stage"
+EVENT_PROGRAM_COMPLETE = f"{DOMAIN}_program_complete"
+# A program stage has reached its target within this many °C
+PROGRAM_TARGET_TOLERANCE = 0.5
+# Poll fast once the water is this close, in °C, to a stage target
+PROGRAM_BOOST_MARGIN = 2.0
+# and for this many seconds before a stage timer runs out
+PROGRAM_BOOST_WINDOW = 60
+
+# Seconds to wait for further target temperature changes before writing
+SET_TEMPERATURE_DEBOUNCE = 1.5
+# A reported target within this many °C confirms a requested one, the cloud
+# may round or convert it
+TARGET_TEMPERATURE_TOLERANCE = 0.05
+
+# Number of recent request latencies kept for percentiles
+LATENCY_SAMPLES = 500
+
+# How often to look for cookers added to or removed from the account
+DISCOVERY_INTERVAL = timedelta(minutes=30)
+# Discovery needs a full login, so it waits this long after startup and is
+# skipped until the interval has passed since the device list was last checked
+DISCOVERY_STARTUP_DELAY = timedelta(minutes=5)
+
+# Connection limits of the dedicated per account client session
+MAX_CONNECTIONS = 20
+MAX_CONNECTIONS_PER_HOST = 8
+# Seconds an idle connection is kept open for reuse
+KEEPALIVE_TIMEOUT = 60
+
+# Seconds to wait before writing the last known device states to disk
+STATE_SAVE_DELAY = 60
@@ -0,0 +1,98 @@
+"""Local tracking of Anova cook sessions."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+from datetime import timedelta
+
+from anova_wifi import APCUpdate
+from homeassistant.core import callback
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+from .const import COOK_END_TOLERANCE
+from .const import EVENT_COOK_COMPLETE
+
+
+class AnovaCookSession:
+    """Times the end of a cook locally instead of waiting for the next poll.
+
+    Every update moves the expected end to now plus the remaining cook time,
+    but the completion timer is only rescheduled once it drifts by more than
+    the tolerance, so regular polls don't keep replacing it. Completion is
+    announced once per cook, polls that lag behind the end of the cook are
+    ignored until the cooker stops cooking. The end is cleared once the cook
+    completes, so it never shows a time in the past.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        device_key: str,
+        on_complete: Callable[[], None],
+    ) -> None:
+        """Set up an idle session."""
+        self.hass = hass
+        self.device_key = device_key
+        self._on_complete = on_complete
+        self.cook_end: datetime | None = None
+        # Set once the current cook was announced complete
+        self._completed = False
+        self._unsub_complete: Callable[[], None] | None = None
+
+    @callback
+    def async_update(self, data: APCUpdate) -> None:
+        """Follow the cook timer of a fresh update."""
+        now = dt_util.utcnow()
+        remaining = data.sensor.cook_time_remaining
+        if data.binary_sensor.cooking and remaining > 0:
+            if self._completed:
+                return
+            cook_end = now + timedelta(seconds=remaining)
+            if (
+                self.cook_end is None
+                or abs(cook_end - self.cook_end) > COOK_END_TOLERANCE
+            ):
+                self._async_schedule(cook_end)
+            return
+        if (
+            self._unsub_complete is not None
+            and self.cook_end is not None
+            and self.cook_end - now <= COOK_END_TOLERANCE
+        ):
+            # The cook finished just before the timer went off
+            self.async_stop()
+            self._async_complete(now)
+        self.async_stop()
+        self.cook_end = None
+        if not data.binary_sensor.cooking:
+            self._completed = False
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel the completion timer."""
+        if self._unsub_complete is not None:
+            self._unsub_complete()
+            self._unsub_complete = None
+
+    @callback
+    def _async_schedule(self, cook_end: datetime) -> None:
+        """Time the completion of a cook ending at cook_end."""
+        self.async_stop()
+        self.cook_end = cook_end
+        self._unsub_complete = async_track_point_in_utc_time(
+            self.hass, self._async_complete, cook_end
+        )
+
+    @callback
+    def _async_complete(self, _: datetime) -> None:
+        """Announce the end of the cook."""
+        self._unsub_complete = None
+        self._completed = True
+        cook_end, self.cook_end = self.cook_end, None
+        self.hass.bus.async_fire(
+            EVENT_COOK_COMPLETE,
+            {"device_key": self.device_key, "cook_end": cook_end.isoformat()},
+        )
+        self._on_complete()
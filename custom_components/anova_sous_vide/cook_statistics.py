@@ -0,0 +1,198 @@
+"""Per cook summaries imported as long term statistics."""
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Any
+
+from anova_wifi import APCUpdate
+from homeassistant.const import UnitOfTemperature
+from homeassistant.const import UnitOfTime
+from homeassistant.core import callback
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+
+from .const import COOK_ON_TARGET_BAND
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _CookSummary:
+    """Running summary of the water temperature during one cook."""
+
+    def __init__(self, start: datetime) -> None:
+        """Start an empty summary."""
+        self.start = start
+        self.minimum: float | None = None
+        self.maximum: float | None = None
+        # Time weighted, each sample counts until the next one arrives
+        self._weighted_sum = 0.0
+        self.duration = 0.0
+        self.on_target = 0.0
+        self._last_time: datetime | None = None
+        self._last_temperature = 0.0
+        self._last_target = 0.0
+
+    @property
+    def mean(self) -> float:
+        """Return the time weighted mean water temperature."""
+        if not self.duration:
+            return self._last_temperature
+        return self._weighted_sum / self.duration
+
+    def advance(self, time: datetime) -> None:
+        """Account for the time since the last sample."""
+        if self._last_time is None:
+            return
+        elapsed = (time - self._last_time).total_seconds()
+        self._weighted_sum += self._last_temperature * elapsed
+        self.duration += elapsed
+        if abs(self._last_temperature - self._last_target) <= COOK_ON_TARGET_BAND:
+            self.on_target += elapsed
+        self._last_time = time
+
+    def add(self, time: datetime, temperature: float, target: float) -> None:
+        """Add a sample."""
+        self.advance(time)
+        self.minimum = (
+            temperature if self.minimum is None else min(self.minimum, temperature)
+        )
+        self.maximum = (
+            temperature if self.maximum is None else max(self.maximum, temperature)
+        )
+        self._last_time = time
+        self._last_temperature = temperature
+        self._last_target = target
+
+
+class AnovaCookStatistics:
+    """Summarizes each cook of a cooker into external statistics.
+
+    A row is imported when the cooker stops running, holding the min, max and
+    mean water temperature and the time spent within the band around the
+    target. Cooks are filed under the hour they started in, a cook starting in
+    the same hour as the last one is merged into its row. Long range graphs
+    read these instead of every poll.
+    """
+
+    def __init__(self, hass: HomeAssistant, device_key: str) -> None:
+        """Set up without a cook in progress."""
+        self.hass = hass
+        object_id = slugify(device_key)
+        self.temperature_statistic_id = f"{DOMAIN}:{object_id}_cook_water_temperature"
+        self.on_target_statistic_id = f"{DOMAIN}:{object_id}_cook_time_on_target"
+        self._summary: _CookSummary | None = None
+        # The hour last filed and how long the cooks filed under it ran, to
+        # weigh their means when another cook is merged into the row
+        self._filed_start: datetime | None = None
+        self._filed_duration = 0.0
+
+    @callback
+    def async_update(self, time: datetime, data: APCUpdate) -> None:
+        """Add a fresh update to the current cook, importing it once it ends."""
+        binary_sensor = data.binary_sensor
+        if (
+            binary_sensor.cooking
+            or binary_sensor.preheating
+            or binary_sensor.maintaining
+        ):
+            if self._summary is None:
+                self._summary = _CookSummary(time)
+            self._summary.add(
+                time,
+                float(data.sensor.water_temperature),
+                float(data.sensor.target_temperature),
+            )
+            return
+        if (summary := self._summary) is None:
+            return
+        self._summary = None
+        summary.advance(time)
+        if summary.duration and "recorder" in self.hass.config.components:
+            self.hass.async_create_task(self._async_import(summary))
+
+    async def _async_import(self, summary: _CookSummary) -> None:
+        """Import the summary of a finished cook."""
+        # The recorder is only loaded when statistics are actually imported
+        # pylint: disable=import-outside-toplevel
+        from homeassistant.components.recorder import get_instance
+        from homeassistant.components.recorder.models import StatisticData
+        from homeassistant.components.recorder.models import StatisticMetaData
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics,
+            get_last_statistics,
+        )
+
+        def _last_row(statistic_id: str, types: set[str]) -> dict[str, Any] | None:
+            rows = get_last_statistics(self.hass, 1, statistic_id, True, types)
+            return rows[statistic_id][0] if rows.get(statistic_id) else None
+
+        # Statistics are hourly, a cook is filed under the hour it started in
+        start = dt_util.as_utc(summary.start).replace(minute=0, second=0, microsecond=0)
+        instance = get_instance(self.hass)
+        temperature_row = await instance.async_add_executor_job(
+            _last_row, self.temperature_statistic_id, {"mean", "min", "max"}
+        )
+        on_target_row = await instance.async_add_executor_job(
+            _last_row, self.on_target_statistic_id, {"state", "sum"}
+        )
+        mean = summary.mean
+        minimum = summary.minimum
+        maximum = summary.maximum
+        duration = summary.duration
+        if (
+            temperature_row is not None
+            and temperature_row["start"] == start.timestamp()
+        ):
+            # After a restart the earlier cooks of the hour count as long as this one
+            earlier = (
+                self._filed_duration if self._filed_start == start else summary.duration
+            )
+            duration += earlier
+            weighted = temperature_row["mean"] * earlier + mean * summary.duration
+            mean = weighted / duration
+            minimum = min(temperature_row["min"], minimum)
+            maximum = max(temperature_row["max"], maximum)
+        self._filed_start = start
+        self._filed_duration = duration
+        async_add_external_statistics(
+            self.hass,
+            StatisticMetaData(
+                has_mean=True,
+                has_sum=False,
+                name="Cook water temperature",
+                source=DOMAIN,
+                statistic_id=self.temperature_statistic_id,
+                unit_of_measurement=UnitOfTemperature.CELSIUS,
+            ),
+            [StatisticData(start=start, mean=round(mean, 2), min=minimum, max=maximum)],
+        )
+        on_target = summary.on_target / 60
+        total = 0.0
+        if on_target_row is not None:
+            total = on_target_row["sum"] or 0.0
+            if on_target_row["start"] == start.timestamp():
+                # The row of the hour is replaced, its state is already summed
+                earlier = on_target_row["state"] or 0.0
+                total -= earlier
+                on_target += earlier
+        on_target = round(on_target, 1)
+        async_add_external_statistics(
+            self.hass,
+            StatisticMetaData(
+                has_mean=False,
+                has_sum=True,
+                name="Cook time on target",
+                source=DOMAIN,
+                statistic_id=self.on_target_statistic_id,
+                unit_of_measurement=UnitOfTime.MINUTES,
+            ),
+            [StatisticData(start=start, state=on_target, sum=total + on_target)],
+        )
+        _LOGGER.debug(
+            "Imported cook statistics for %s starting %s",
+            self.temperature_statistic_id,
+            start,
+        )
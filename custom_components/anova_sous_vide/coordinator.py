@@ -1,18 +1,45 @@
 """Support for Anova Coordinators."""
+import asyncio
 import logging
+import time
 from datetime import timedelta
+from typing import Any
 
-import async_timeout
-from anova_wifi import AnovaOffline
 from anova_wifi import AnovaPrecisionCooker
 from anova_wifi import APCUpdate
+from homeassistant.const import CONF_SCAN_INTERVAL
 from homeassistant.core import callback
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
 
+from .cache import AnovaStateCache
+from .const import CONF_FAST_SCAN_INTERVAL
+from .const import CONF_IDLE_SCAN_INTERVAL
+from .const import CONF_TEMPERATURE_DEADBAND
+from .const import DEFAULT_FAST_SCAN_INTERVAL
+from .const import DEFAULT_IDLE_SCAN_INTERVAL
+from .const import DEFAULT_SCAN_INTERVAL
+from .const import DEFAULT_TEMPERATURE_DEADBAND
 from .const import DOMAIN
+from .const import HEATING_RATE_DEADBAND
+from .const import MAX_CONCURRENT_UPDATES
+from .const import PROBE_TIMEOUT
+from .const import PUSH_SAFETY_SCAN_INTERVAL
+from .const import TEMPERATURE_KEYS
+from .const import UPDATE_TIMEOUT
+from .cook import AnovaCookSession
+from .cook_statistics import AnovaCookStatistics
+from .history import AnovaSampleHistory
+from .polling import AnovaCircuitBreaker
+from .polling import AnovaPollingPolicy
+from .snapshot import build_snapshot
+from .snapshot import DEVICE_INDICES
+from .snapshot import SNAPSHOT_FIELDS
+from .stats import AnovaRequestStats
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,27 +57,309 @@ class AnovaCoordinator(DataUpdateCoordinator[APCUpdate]):
             hass,
             name="Anova Precision Cooker",
             logger=_LOGGER,
-            update_interval=timedelta(seconds=30),
+            # Polls are driven by the AnovaAccountCoordinator, not a per device timer
+            update_interval=None,
         )
         assert self.config_entry is not None
+        options = self.config_entry.options
+        self.polling_policy = AnovaPollingPolicy(
+            fast_interval=timedelta(
+                seconds=options.get(CONF_FAST_SCAN_INTERVAL, DEFAULT_FAST_SCAN_INTERVAL)
+            ),
+            interval=timedelta(
+                seconds=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+            ),
+            idle_interval=timedelta(
+                seconds=options.get(CONF_IDLE_SCAN_INTERVAL, DEFAULT_IDLE_SCAN_INTERVAL)
+            ),
+        )
+        self.poll_interval = self.polling_policy.interval
+        # Set by a running cook program while a stage transition is near
+        self.boost_polling = False
+        self.next_update = dt_util.utcnow()
+        # Where in its interval the device is polled, as a fraction of it, the
+        # scheduler spreads these out so cookers don't poll in lockstep
+        self.poll_phase: float | None = None
         self._device_unique_id = anova_device.device_key
         self.anova_device = anova_device
-        self.device_info: DeviceInfo | None = None
-
-    @callback
-    def async_setup(self, firmware_version: str) -> None:
-        """Set the firmware version info."""
+        # The firmware version is added once the device first answers
         self.device_info = DeviceInfo(
             identifiers={(DOMAIN, self._device_unique_id)},
             name="Anova Precision Cooker",
             manufacturer="Anova",
             model="Precision Cooker",
-            sw_version=firmware_version,
         )
+        self.breaker = AnovaCircuitBreaker(self.polling_policy.interval)
+        self.history = AnovaSampleHistory()
+        self.cook_statistics = AnovaCookStatistics(hass, self._device_unique_id)
+        # Completion is checked with a poll as soon as the local timer runs out
+        self.cook_session = AnovaCookSession(
+            hass, self._device_unique_id, self._async_cook_complete
+        )
+        self.stats = AnovaRequestStats()
+        self._update_task: asyncio.Task[APCUpdate] | None = None
+        # Set while data comes from the state cache rather than the device
+        self.stale = False
+        self.state_cache: AnovaStateCache | None = None
+        deadband = options.get(CONF_TEMPERATURE_DEADBAND, DEFAULT_TEMPERATURE_DEADBAND)
+        deadbands = {
+            **dict.fromkeys(TEMPERATURE_KEYS, deadband),
+            "heating_rate": HEATING_RATE_DEADBAND,
+        }
+        self._deadbands = tuple(deadbands.get(name, 0.0) for name in SNAPSHOT_FIELDS)
+        # Decoded once per update, entities read their field by index
+        self.snapshot: tuple[Any, ...] | None = None
+        # Snapshot values entities were last notified about, None until first data
+        self._notified_values: list[Any] | None = None
+        self._notified_success = True
+        # Snapshot indices that changed in the current update, None means all
+        self.changed_indices: set[int] | None = None
+
+    @callback
+    def async_restore(self, data: APCUpdate) -> None:
+        """Start out with the last known state from before a restart."""
+        self.data = data
+        self.anova_device.status = data
+        self.stale = True
+        # The cook end can't be known from a cached state, the first poll sets it
+        self.snapshot = build_snapshot(data, self.history, None)
+        self._async_update_firmware(str(data.sensor.firmware_version))
+
+    @callback
+    def _async_update_firmware(self, firmware_version: str) -> None:
+        """Fill in the firmware version once the device has answered."""
+        if self.device_info.get("sw_version") == firmware_version:
+            return
+        self.device_info["sw_version"] = firmware_version
+        device_registry = dr.async_get(self.hass)
+        if device := device_registry.async_get_device(
+            identifiers={(DOMAIN, self._device_unique_id)}
+        ):
+            device_registry.async_update_device(device.id, sw_version=firmware_version)
 
     async def _async_update_data(self) -> APCUpdate:
+        # Scheduled polls, manual entity updates and refreshes after a command
+        # can overlap, they all share a single in flight request.
+        if self._update_task is None or self._update_task.done():
+            self._update_task = self.hass.async_create_task(self._async_fetch())
+        return await asyncio.shield(self._update_task)
+
+    async def _async_fetch(self) -> APCUpdate:
+        """Fetch the latest state from the device."""
+        start = time.monotonic()
         try:
-            async with async_timeout.timeout(5):
-                return await self.anova_device.update()
-        except AnovaOffline as err:
+            # Probes of an offline cooker give up sooner
+            async with asyncio.timeout(
+                PROBE_TIMEOUT if self.breaker.is_open else UPDATE_TIMEOUT
+            ):
+                data = await self.anova_device.update()
+        except Exception as err:  # pylint: disable=broad-except
+            # Besides AnovaOffline and timeouts, an outage can surface as any
+            # aiohttp error or a malformed body, all of them count as failures.
+            self.stats.record(
+                time.monotonic() - start,
+                error=True,
+                timeout=isinstance(err, asyncio.TimeoutError),
+            )
+            self._async_record_failure()
             raise UpdateFailed(err) from err
+        self.stats.record(time.monotonic() - start)
+        self._schedule_next_update(
+            self.polling_policy.next_interval(data, self.boost_polling), in_phase=True
+        )
+        self._async_record(data)
+        return data
+
+    @callback
+    def _async_record_failure(self) -> None:
+        """Back off from a device that failed to update."""
+        was_open = self.breaker.is_open
+        self.breaker.record_failure(self.poll_interval)
+        if not self.breaker.is_open:
+            self._schedule_next_update(
+                self.polling_policy.next_interval(self.data, self.boost_polling),
+                in_phase=True,
+            )
+            return
+        if not was_open:
+            _LOGGER.info(
+                "Anova device %s failed %s updates in a row, probing it with backoff",
+                self._device_unique_id,
+                self.breaker.failures,
+            )
+        self._schedule_next_update(self.breaker.next_probe_interval())
+
+    @callback
+    def _async_record(self, data: APCUpdate) -> None:
+        """Record a fresh update from the device."""
+        if self.breaker.record_success():
+            _LOGGER.info("Anova device %s is back online", self._device_unique_id)
+        self.stale = False
+        now = dt_util.utcnow()
+        self.history.append(now.timestamp(), data)
+        self.cook_statistics.async_update(now, data)
+        self.cook_session.async_update(data)
+        self.snapshot = build_snapshot(data, self.history, self.cook_session.cook_end)
+        self._async_update_firmware(str(data.sensor.firmware_version))
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Work out which fields changed before notifying the listeners."""
+        start = time.process_time()
+        self.changed_indices = self._async_changed_indices()
+        if (
+            self.state_cache is not None
+            and self.data is not None
+            and self.last_update_success
+            and not self.stale
+            and (
+                self.changed_indices is None
+                or not self.changed_indices.isdisjoint(DEVICE_INDICES)
+            )
+        ):
+            # Only polls that change what the cooker reports are worth saving
+            self.state_cache.async_update(self._device_unique_id, self.data)
+        super().async_update_listeners()
+        self.stats.record_update_cpu_time(time.process_time() - start)
+
+    @callback
+    def _async_changed_indices(self) -> set[int] | None:
+        """Diff the snapshot against what entities were last notified of.
+
+        Temperatures and the heating rate only count as changed once they move
+        by more than their deadband from the last notified value, so slow drift
+        still shows up.
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            return None
+        previous = self._notified_values
+        if previous is None or self.last_update_success != self._notified_success:
+            self._notified_values = list(snapshot)
+            self._notified_success = self.last_update_success
+            return None
+        changed = set()
+        deadbands = self._deadbands
+        for index, value in enumerate(snapshot):
+            old_value = previous[index]
+            if value == old_value:
+                continue
+            if (
+                deadbands[index]
+                and value is not None
+                and old_value is not None
+                and abs(value - old_value) < deadbands[index]
+            ):
+                continue
+            previous[index] = value
+            changed.add(index)
+        return changed
+
+    @callback
+    def async_set_push_data(self, data: APCUpdate) -> None:
+        """Apply an update pushed over the websocket."""
+        self.anova_device.status = data
+        self._async_record(data)
+        # Keep a slow safety poll in case pushes for this device stop arriving
+        self._schedule_next_update(timedelta(seconds=PUSH_SAFETY_SCAN_INTERVAL))
+        self.async_set_updated_data(data)
+
+    @property
+    def is_active(self) -> bool:
+        """Return if the device is cooking, or about to change stage."""
+        if self.boost_polling:
+            return True
+        if self.data is None:
+            return False
+        return bool(
+            self.data.binary_sensor.cooking or self.data.binary_sensor.preheating
+        )
+
+    @callback
+    def _async_cook_complete(self) -> None:
+        """Drop the end of the finished cook and poll the cooker right away."""
+        if self.data is not None:
+            self.snapshot = build_snapshot(self.data, self.history, None)
+            self.async_update_listeners()
+        self.async_resume_polling()
+
+    @callback
+    def async_resume_polling(self) -> None:
+        """Go back to regular polling, starting on the next account tick."""
+        self._schedule_next_update(timedelta(0))
+
+    @callback
+    def async_set_boost_polling(self, boost: bool) -> None:
+        """Poll fast until told otherwise, starting with the next poll."""
+        if boost == self.boost_polling:
+            return
+        self.boost_polling = boost
+        if boost and not self.breaker.is_open:
+            interval = self.polling_policy.fast_interval
+            if self.next_update > dt_util.utcnow() + interval:
+                self._schedule_next_update(interval)
+
+    def _schedule_next_update(
+        self, interval: timedelta, in_phase: bool = False
+    ) -> None:
+        """Record when the scheduler should poll this device next.
+
+        Polls in phase go out at the first time, at least half an interval
+        away, that sits at the device's phase within the interval.
+        """
+        self.poll_interval = interval
+        now = dt_util.utcnow()
+        if not in_phase or self.poll_phase is None or not interval:
+            self.next_update = now + interval
+            return
+        seconds = interval.total_seconds()
+        earliest = now.timestamp() + seconds / 2
+        self.next_update = dt_util.utc_from_timestamp(
+            earliest + (self.poll_phase * seconds - earliest) % seconds
+        )
+
+
+class AnovaAccountCoordinator:
+    """Holds the cookers of an account for the shared AnovaScheduler."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinators: list[AnovaCoordinator],
+    ) -> None:
+        """Set up the account coordinator."""
+        self.hass = hass
+        self.coordinators: list[AnovaCoordinator] = []
+        self.stats = AnovaRequestStats()
+        for coordinator in coordinators:
+            self.async_add_coordinator(coordinator)
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_UPDATES)
+
+    @callback
+    def async_add_coordinator(self, coordinator: AnovaCoordinator) -> None:
+        """Start polling a device."""
+        coordinator.stats.parent = self.stats
+        self.coordinators.append(coordinator)
+
+    @callback
+    def async_remove_coordinator(self, coordinator: AnovaCoordinator) -> None:
+        """Stop polling a device."""
+        self.coordinators.remove(coordinator)
+        coordinator.cook_session.async_stop()
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop the cook timers of every device."""
+        for coordinator in self.coordinators:
+            coordinator.cook_session.async_stop()
+
+    @callback
+    def async_refresh_all(self) -> None:
+        """Have the scheduler refresh every device as soon as it can."""
+        for coordinator in self.coordinators:
+            coordinator.async_resume_polling()
+
+    async def async_refresh_device(self, coordinator: AnovaCoordinator) -> None:
+        """Refresh a single device, bounded by the account concurrency limit."""
+        async with self._semaphore:
+            await coordinator.async_refresh()
@@ -0,0 +1,51 @@
+"""Diagnostics support for Anova."""
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD
+from homeassistant.const import CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .models import AnovaData
+
+# Device keys are enough to read a cooker's state from the cloud
+TO_REDACT = {CONF_USERNAME, CONF_PASSWORD, "jwt", "devices", "device_key"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    anova_data: AnovaData = hass.data[DOMAIN][entry.entry_id]
+    diagnostics = {
+        "entry": {
+            "data": dict(entry.data),
+            "options": dict(entry.options),
+        },
+        "account": {
+            "stats": anova_data.account_coordinator.stats.as_dict(),
+            "push_connected": anova_data.push_listener is not None
+            and anova_data.push_listener.connected,
+        },
+        "cookers": [
+            {
+                "device_key": coordinator.anova_device.device_key,
+                "last_update_success": coordinator.last_update_success,
+                "consecutive_failures": coordinator.breaker.failures,
+                "circuit_open": coordinator.breaker.is_open,
+                "poll_interval": coordinator.poll_interval.total_seconds(),
+                "next_update": coordinator.next_update.isoformat(),
+                "stats": coordinator.stats.as_dict(),
+                "history_samples": len(coordinator.history),
+                "history_bytes": coordinator.history.memory_size,
+                "data": asdict(coordinator.data) if coordinator.data else None,
+            }
+            for coordinator in anova_data.coordinators
+        ],
+    }
+    return async_redact_data(diagnostics, TO_REDACT)
@@ -0,0 +1,176 @@
+"""Background discovery of cookers added to an Anova account."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable
+from datetime import datetime
+from datetime import timedelta
+
+import aiohttp
+from anova_wifi import AnovaException
+from anova_wifi import AnovaPrecisionCooker
+from anova_wifi import NoDevicesFound
+from homeassistant import config_entries
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import callback
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .const import DISCOVERY_INTERVAL
+from .const import DISCOVERY_STARTUP_DELAY
+from .coordinator import AnovaCoordinator
+from .models import AnovaData
+from .util import serialize_device_list
+from .util import signal_new_coordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AnovaDeviceDiscovery:
+    """Periodically adds new cookers of an account without a reload.
+
+    The cloud only lists cookers that are online, so a cooker missing from a
+    scan is never removed. Users remove cookers from the device page instead.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, entry: ConfigEntry, anova_data: AnovaData
+    ) -> None:
+        """Set up discovery."""
+        self.hass = hass
+        self.entry = entry
+        self.anova_data = anova_data
+        self._unsub: Callable[[], None] | None = None
+        self._stopped = False
+        self._lock = asyncio.Lock()
+
+    @callback
+    def async_start(self) -> None:
+        """Discover once the stored device list is due and then periodically."""
+        delay = DISCOVERY_STARTUP_DELAY
+        if discovered_at := dt_util.parse_datetime(
+            self.entry.data.get("discovered_at") or ""
+        ):
+            delay = max(delay, discovered_at + DISCOVERY_INTERVAL - dt_util.utcnow())
+        self._async_schedule(delay)
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop discovering."""
+        self._stopped = True
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def _async_schedule(self, delay: timedelta) -> None:
+        """Schedule the next discovery."""
+        self._unsub = async_call_later(self.hass, delay, self._async_scheduled)
+
+    async def _async_scheduled(self, _: datetime) -> None:
+        """Discover and schedule the next run."""
+        self._unsub = None
+        try:
+            await self._async_discover()
+        finally:
+            if not self._stopped:
+                self._async_schedule(DISCOVERY_INTERVAL)
+
+    async def _async_discover(self) -> None:
+        """Add cookers that are new on the account."""
+        if self._lock.locked():
+            return
+        async with self._lock:
+            auth = self.anova_data.auth
+            api = auth.api
+            known = {
+                device.device_key: device
+                for device in self.anova_data.precision_cookers
+            }
+            # get_devices only returns devices it doesn't know about, clear the
+            # known ones so the full account list comes back.
+            api.existing_devices = []
+            try:
+                await auth.async_ensure_firebase_token()
+                found = await api.get_devices()
+            except NoDevicesFound:
+                # Raised when no devices are online
+                return
+            except (
+                AnovaException,
+                aiohttp.ClientError,
+                asyncio.TimeoutError,
+                # anova_wifi decodes every websocket message as JSON, including
+                # the close frame when the cloud hangs up early
+                TypeError,
+                ValueError,
+            ) as err:
+                _LOGGER.debug("Anova device discovery failed: %s", err)
+                return
+            finally:
+                api.existing_devices = self.anova_data.precision_cookers
+            added = [device for device in found if device.device_key not in known]
+            if added:
+                self._async_add_devices(added)
+            # Remembered so restarts don't log in again just to discover
+            self.hass.config_entries.async_update_entry(
+                self.entry,
+                data={
+                    **self.entry.data,
+                    "devices": serialize_device_list(self.anova_data.precision_cookers),
+                    "discovered_at": dt_util.utcnow().isoformat(),
+                },
+            )
+
+    @callback
+    def _async_add_devices(self, devices: list[AnovaPrecisionCooker]) -> None:
+        """Create coordinators and entities for new cookers.
+
+        The new cookers are due right away and polled by the scheduler, within
+        the request budget like every other poll.
+        """
+        # Coordinators pick up their config entry from the context
+        config_entries.current_entry.set(self.entry)
+        coordinators = []
+        for device in devices:
+            _LOGGER.debug("Adding new Anova device %s", device.device_key)
+            coordinator = AnovaCoordinator(self.hass, device)
+            coordinator.state_cache = self.anova_data.state_cache
+            coordinators.append(coordinator)
+        self.anova_data.precision_cookers.extend(devices)
+        self.anova_data.coordinators.extend(coordinators)
+        account_coordinator = self.anova_data.account_coordinator
+        for coordinator in coordinators:
+            account_coordinator.async_add_coordinator(coordinator)
+            self.anova_data.fleet.async_add_coordinator(coordinator)
+            if self.anova_data.push_listener is not None:
+                self.anova_data.push_listener.async_add_coordinator(coordinator)
+            coordinator.async_resume_polling()
+        async_dispatcher_send(
+            self.hass, signal_new_coordinator(self.entry.entry_id), coordinators
+        )
+
+
+@callback
+def async_remove_device(
+    hass: HomeAssistant, anova_data: AnovaData, device_key: str
+) -> None:
+    """Tear down a cooker the user removed."""
+    _LOGGER.debug("Removing Anova device %s", device_key)
+    coordinator = next(
+        coordinator
+        for coordinator in anova_data.coordinators
+        if coordinator.anova_device.device_key == device_key
+    )
+    anova_data.account_coordinator.async_remove_coordinator(coordinator)
+    anova_data.fleet.async_remove_coordinator(coordinator)
+    if (program := anova_data.programs.pop(device_key, None)) is not None:
+        program.async_stop()
+    if anova_data.push_listener is not None:
+        anova_data.push_listener.async_remove_coordinator(coordinator)
+    anova_data.coordinators.remove(coordinator)
+    anova_data.precision_cookers.remove(coordinator.anova_device)
+    anova_data.state_cache.async_remove(device_key)
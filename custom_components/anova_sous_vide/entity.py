@@ -1,16 +1,26 @@
 """Base entity for the Anova integration."""
 from __future__ import annotations
 
+from typing import Any
+
+from homeassistant.core import callback
 from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.entity import EntityDescription
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .coordinator import AnovaCoordinator
+from .fleet import AnovaFleet
+from .snapshot import FIELD_INDICES
+from .snapshot import SNAPSHOT_INDEX
 
 
 class AnovaEntity(CoordinatorEntity[AnovaCoordinator], Entity):
     """Defines a Anova entity."""
 
+    # Snapshot indices of the fields this entity shows, None to write state on
+    # every update
+    _snapshot_indices: frozenset[int] | None = None
+
     def __init__(self, coordinator: AnovaCoordinator) -> None:
         """Initialize the Anova entity."""
         super().__init__(coordinator)
@@ -18,9 +28,37 @@ class AnovaEntity(CoordinatorEntity[AnovaCoordinator], Entity):
         self._attr_device_info = coordinator.device_info
         self._attr_has_entity_name = True
 
+    @property
+    def available(self) -> bool:
+        """Return if the device has answered at least once and is online."""
+        return super().available and self.coordinator.data is not None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Flag states restored from before a restart."""
+        return {"stale": True} if self.coordinator.stale else None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Only write state when a field this entity shows has changed."""
+        changed_indices = self.coordinator.changed_indices
+        if (
+            changed_indices is not None
+            and self._snapshot_indices is not None
+            and changed_indices.isdisjoint(self._snapshot_indices)
+        ):
+            return
+        self.coordinator.stats.record_state_write()
+        super()._handle_coordinator_update()
+
 
 class AnovaDescriptionEntity(AnovaEntity, Entity):
-    """Defines a Anova entity that uses a description."""
+    """Defines a Anova entity that uses a description.
+
+    Descriptions keyed by a snapshot field read that field by index.
+    """
+
+    _snapshot_index: int
 
     def __init__(
         self, coordinator: AnovaCoordinator, description: EntityDescription
@@ -28,4 +66,28 @@ class AnovaDescriptionEntity(AnovaEntity, Entity):
         """Initialize the entity and declare unique id based on description key."""
         super().__init__(coordinator)
         self.entity_description = description
+        if (index := SNAPSHOT_INDEX.get(description.key)) is not None:
+            self._snapshot_index = index
+            self._snapshot_indices = FIELD_INDICES[description.key]
         self._attr_unique_id = f"{coordinator._device_unique_id}_{description.key}"
+
+
+class AnovaFleetEntity(Entity):
+    """Defines an entity showing an aggregate over all cookers of an account."""
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    def __init__(
+        self, fleet: AnovaFleet, entry_id: str, description: EntityDescription
+    ) -> None:
+        """Initialize the entity and declare unique id based on description key."""
+        self.fleet = fleet
+        self.entity_description = description
+        self._attr_device_info = fleet.device_info
+        self._attr_unique_id = f"{entry_id}_{description.key}"
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the aggregates."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self.fleet.async_add_listener(self.async_write_ha_state))
@@ -0,0 +1,145 @@
+"""Account wide aggregates over all Anova cookers."""
+from __future__ import annotations
+
+import heapq
+from collections.abc import Callable
+from datetime import datetime
+from typing import NamedTuple
+
+from homeassistant.core import callback
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.entity import DeviceInfo
+
+from .const import DOMAIN
+from .coordinator import AnovaCoordinator
+from .snapshot import SNAPSHOT_INDEX
+
+_COOKING = SNAPSHOT_INDEX["cooking"]
+_OVER_TEMPERATURE = SNAPSHOT_INDEX["water_temp_too_high"]
+_COOK_END = SNAPSHOT_INDEX["cook_end"]
+
+
+class _Contribution(NamedTuple):
+    """What a single cooker adds to the aggregates."""
+
+    cooking: bool
+    over_temperature: bool
+    cook_end: datetime | None
+
+
+_NO_CONTRIBUTION = _Contribution(False, False, None)
+
+
+class AnovaFleet:
+    """Keeps counts and the next cook completion across an account.
+
+    Only the contribution of the cooker that updated is swapped out, so an
+    update costs the same however many cookers there are. Cook ends go in a
+    heap and superseded entries are dropped lazily when they reach the top.
+    """
+
+    def __init__(self, entry_id: str) -> None:
+        """Start with no cookers."""
+        # The aggregate entities belong to a device for the whole account
+        self.device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry_id)},
+            name="Anova account",
+            manufacturer="Anova",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+        self.cooking = 0
+        self.over_temperature = 0
+        self._contributions: dict[str, _Contribution] = {}
+        self._cook_ends: list[tuple[datetime, str]] = []
+        self._unsubs: dict[str, Callable[[], None]] = {}
+        self._listeners: list[Callable[[], None]] = []
+
+    @property
+    def next_cook_end(self) -> datetime | None:
+        """Return when the next running cook finishes."""
+        cook_ends = self._cook_ends
+        while cook_ends:
+            cook_end, device_key = cook_ends[0]
+            contribution = self._contributions.get(device_key)
+            if contribution is not None and contribution.cook_end == cook_end:
+                return cook_end
+            heapq.heappop(cook_ends)
+        return None
+
+    @callback
+    def async_add_coordinator(self, coordinator: AnovaCoordinator) -> None:
+        """Start following a cooker."""
+        device_key = coordinator.anova_device.device_key
+
+        @callback
+        def _async_handle_update() -> None:
+            self._async_update(device_key, coordinator)
+
+        self._unsubs[device_key] = coordinator.async_add_listener(_async_handle_update)
+        self._async_update(device_key, coordinator)
+
+    @callback
+    def async_remove_coordinator(self, coordinator: AnovaCoordinator) -> None:
+        """Stop following a cooker and drop its contribution."""
+        device_key = coordinator.anova_device.device_key
+        if (unsub := self._unsubs.pop(device_key, None)) is not None:
+            unsub()
+        self._async_set_contribution(device_key, None)
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop following every cooker."""
+        for unsub in self._unsubs.values():
+            unsub()
+        self._unsubs = {}
+
+    @callback
+    def async_add_listener(self, update_callback: Callable[[], None]) -> Callable:
+        """Listen for changes of the aggregates."""
+        self._listeners.append(update_callback)
+        return lambda: self._listeners.remove(update_callback)
+
+    @callback
+    def _async_update(self, device_key: str, coordinator: AnovaCoordinator) -> None:
+        """Recompute the contribution of a cooker that updated."""
+        snapshot = coordinator.snapshot
+        if snapshot is None or not coordinator.last_update_success:
+            # Offline cookers count as neither cooking nor too hot
+            self._async_set_contribution(device_key, None)
+            return
+        self._async_set_contribution(
+            device_key,
+            _Contribution(
+                bool(snapshot[_COOKING]),
+                bool(snapshot[_OVER_TEMPERATURE]),
+                snapshot[_COOK_END],
+            ),
+        )
+
+    @callback
+    def _async_set_contribution(
+        self, device_key: str, contribution: _Contribution | None
+    ) -> None:
+        """Swap the contribution of a cooker and notify if anything changed."""
+        old = self._contributions.get(device_key, _NO_CONTRIBUTION)
+        new = contribution or _NO_CONTRIBUTION
+        if new == old:
+            return
+        if contribution is None:
+            del self._contributions[device_key]
+        else:
+            self._contributions[device_key] = contribution
+        self.cooking += new.cooking - old.cooking
+        self.over_temperature += new.over_temperature - old.over_temperature
+        if new.cook_end is not None and new.cook_end != old.cook_end:
+            heapq.heappush(self._cook_ends, (new.cook_end, device_key))
+            if len(self._cook_ends) > 2 * len(self._contributions) + 8:
+                # Too many superseded entries below the top, rebuild the heap
+                self._cook_ends = [
+                    (other.cook_end, other_key)
+                    for other_key, other in self._contributions.items()
+                    if other.cook_end is not None
+                ]
+                heapq.heapify(self._cook_ends)
+        for update_callback in list(self._listeners):
+            update_callback()
@@ -0,0 +1,145 @@
+"""Recent sample history and derived cook analytics for Anova cookers."""
+from __future__ import annotations
+
+import math
+from array import array
+
+from anova_wifi import APCUpdate
+
+from .const import HISTORY_RATE_SAMPLES
+from .const import HISTORY_SIZE
+
+MODE_IDLE = 0
+MODE_PREHEATING = 1
+MODE_COOKING = 2
+MODE_MAINTAINING = 3
+
+
+def _mode_code(update: APCUpdate) -> int:
+    """Return the compact mode code stored for an update."""
+    if update.binary_sensor.preheating:
+        return MODE_PREHEATING
+    if update.binary_sensor.cooking:
+        return MODE_COOKING
+    if update.binary_sensor.maintaining:
+        return MODE_MAINTAINING
+    return MODE_IDLE
+
+
+class AnovaSampleHistory:
+    """Fixed size ring buffer of recent samples for one cooker.
+
+    Samples live in preallocated arrays, four of doubles and one of bytes, so
+    a device costs 33 bytes per sample regardless of how long it has been
+    running, about 8 KB with the default 240 samples. Adding a sample and
+    reading any of the derived values is O(1).
+    """
+
+    def __init__(
+        self, capacity: int = HISTORY_SIZE, rate_samples: int = HISTORY_RATE_SAMPLES
+    ) -> None:
+        """Allocate the buffer."""
+        self.capacity = capacity
+        self.rate_samples = rate_samples
+        self.timestamps = array("d", bytes(8 * capacity))
+        self.water_temperatures = array("d", bytes(8 * capacity))
+        self.heater_temperatures = array("d", bytes(8 * capacity))
+        self.triac_temperatures = array("d", bytes(8 * capacity))
+        self.modes = array("b", bytes(capacity))
+        self._next = 0
+        self._count = 0
+        # Running sums of the water temperature over maintaining samples
+        self._maintaining_count = 0
+        self._maintaining_sum = 0.0
+        self._maintaining_sum_sq = 0.0
+
+    def __len__(self) -> int:
+        """Return the number of samples held."""
+        return self._count
+
+    @property
+    def memory_size(self) -> int:
+        """Return the bytes allocated for samples."""
+        return sum(
+            len(samples) * samples.itemsize
+            for samples in (
+                self.timestamps,
+                self.water_temperatures,
+                self.heater_temperatures,
+                self.triac_temperatures,
+                self.modes,
+            )
+        )
+
+    def append(self, timestamp: float, update: APCUpdate) -> None:
+        """Add a sample, overwriting the oldest one once the buffer is full."""
+        index = self._next
+        if self._count == self.capacity:
+            if self.modes[index] == MODE_MAINTAINING:
+                self._remove_maintaining(self.water_temperatures[index])
+        else:
+            self._count += 1
+        mode = _mode_code(update)
+        water_temperature = float(update.sensor.water_temperature)
+        self.timestamps[index] = timestamp
+        self.water_temperatures[index] = water_temperature
+        self.heater_temperatures[index] = float(update.sensor.heater_temperature)
+        self.triac_temperatures[index] = float(update.sensor.triac_temperature)
+        self.modes[index] = mode
+        if mode == MODE_MAINTAINING:
+            self._maintaining_count += 1
+            self._maintaining_sum += water_temperature
+            self._maintaining_sum_sq += water_temperature**2
+        self._next = (index + 1) % self.capacity
+
+    def _remove_maintaining(self, water_temperature: float) -> None:
+        """Drop an evicted maintaining sample from the running sums."""
+        self._maintaining_count -= 1
+        self._maintaining_sum -= water_temperature
+        self._maintaining_sum_sq -= water_temperature**2
+
+    def _index(self, age: int) -> int:
+        """Return the buffer index of the sample age steps before the newest."""
+        return (self._next - 1 - age) % self.capacity
+
+    def _slope(self) -> float | None:
+        """Return the unrounded water temperature change in °C per second."""
+        if self._count < 2:
+            return None
+        newest = self._index(0)
+        oldest = self._index(min(self._count - 1, self.rate_samples))
+        elapsed = self.timestamps[newest] - self.timestamps[oldest]
+        if elapsed <= 0:
+            return None
+        delta = self.water_temperatures[newest] - self.water_temperatures[oldest]
+        return delta / elapsed
+
+    @property
+    def heating_rate(self) -> float | None:
+        """Return the water temperature change in °C per minute."""
+        if (slope := self._slope()) is None:
+            return None
+        return round(slope * 60, 2)
+
+    def time_to_target(self, target_temperature: float) -> int | None:
+        """Return the estimated seconds until the water reaches the target."""
+        # From the unrounded slope, slow rates would round to nothing
+        if (slope := self._slope()) is None:
+            return None
+        remaining = target_temperature - self.water_temperatures[self._index(0)]
+        if remaining == 0 or slope == 0 or (remaining > 0) != (slope > 0):
+            return None
+        return round(remaining / slope)
+
+    @property
+    def temperature_stability(self) -> float | None:
+        """Return the water temperature standard deviation while maintaining."""
+        if (
+            not self._count
+            or self.modes[self._index(0)] != MODE_MAINTAINING
+            or self._maintaining_count < 2
+        ):
+            return None
+        mean = self._maintaining_sum / self._maintaining_count
+        variance = self._maintaining_sum_sq / self._maintaining_count - mean**2
+        return round(math.sqrt(max(variance, 0.0)), 3)
@@ -1,15 +1,36 @@
 """Dataclass models for the Anova integration."""
+from __future__ import annotations
+
 from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import TYPE_CHECKING
 
 from anova_wifi import AnovaPrecisionCooker
 
+from .auth import AnovaAuth
+from .cache import AnovaStateCache
+from .coordinator import AnovaAccountCoordinator
 from .coordinator import AnovaCoordinator
+from .fleet import AnovaFleet
+from .program import AnovaProgram
+
+if TYPE_CHECKING:
+    # Only loaded for accounts with push updates enabled
+    from .push import AnovaPushListener
 
 
 @dataclass
 class AnovaData:
     """Data for the Anova integration."""
 
-    api_jwt: str
+    auth: AnovaAuth
     precision_cookers: list[AnovaPrecisionCooker]
     coordinators: list[AnovaCoordinator]
+    account_coordinator: AnovaAccountCoordinator
+    push_listener: AnovaPushListener | None
+    state_cache: AnovaStateCache
+    fleet: AnovaFleet
+    options: dict[str, Any]
+    # Cook programs running on the cookers, keyed by device key
+    programs: dict[str, AnovaProgram] = field(default_factory=dict)
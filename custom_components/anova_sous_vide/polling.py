@@ -0,0 +1,124 @@
+"""Adaptive polling policy for Anova precision cookers."""
+from __future__ import annotations
+
+import random
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+
+from anova_wifi import APCUpdate
+
+from .const import CIRCUIT_BREAKER_THRESHOLD
+from .const import DEFAULT_FAST_SCAN_INTERVAL
+from .const import DEFAULT_IDLE_SCAN_INTERVAL
+from .const import DEFAULT_SCAN_INTERVAL
+from .const import MAX_OFFLINE_SCAN_INTERVAL
+from .const import MAX_REQUEST_BURST
+from .const import MAX_REQUESTS_PER_SECOND
+from .const import NEARLY_DONE_THRESHOLD
+
+
+@dataclass
+class AnovaPollingPolicy:
+    """Decides how long to wait before polling a cooker again."""
+
+    fast_interval: timedelta = timedelta(seconds=DEFAULT_FAST_SCAN_INTERVAL)
+    interval: timedelta = timedelta(seconds=DEFAULT_SCAN_INTERVAL)
+    idle_interval: timedelta = timedelta(seconds=DEFAULT_IDLE_SCAN_INTERVAL)
+    nearly_done_threshold: int = NEARLY_DONE_THRESHOLD
+
+    def next_interval(self, data: APCUpdate | None, boost: bool = False) -> timedelta:
+        """Return the interval to wait based on the last update.
+
+        Boosting polls fast regardless of the state, e.g. around the stage
+        transitions of a cook program.
+        """
+        if boost:
+            return self.fast_interval
+        if data is None:
+            return self.interval
+        if data.binary_sensor.preheating:
+            return self.fast_interval
+        if data.binary_sensor.cooking:
+            if 0 < data.sensor.cook_time_remaining <= self.nearly_done_threshold:
+                return self.fast_interval
+            return self.interval
+        if data.binary_sensor.maintaining:
+            return self.interval
+        return self.idle_interval
+
+
+class AnovaCircuitBreaker:
+    """Stops regular polling of a cooker that keeps failing.
+
+    After threshold consecutive failures the breaker opens and the cooker is
+    only probed, with exponential backoff and jitter so that cookers which went
+    offline together don't retry in lockstep. Probes never come sooner than the
+    device was polled before it failed. Any successful update closes it.
+    """
+
+    def __init__(
+        self,
+        probe_interval: timedelta,
+        threshold: int = CIRCUIT_BREAKER_THRESHOLD,
+        max_probe_interval: timedelta = timedelta(seconds=MAX_OFFLINE_SCAN_INTERVAL),
+    ) -> None:
+        """Initialize a closed breaker."""
+        self.probe_interval = probe_interval
+        self.threshold = threshold
+        self.max_probe_interval = max_probe_interval
+        self.failures = 0
+        # Interval the device was polled at when the breaker opened
+        self.floor = probe_interval
+
+    @property
+    def is_open(self) -> bool:
+        """Return if regular polling is suspended."""
+        return self.failures >= self.threshold
+
+    def record_failure(self, poll_interval: timedelta) -> None:
+        """Count a failed update of a device polled at poll_interval."""
+        if not self.is_open:
+            self.floor = poll_interval
+        self.failures += 1
+
+    def record_success(self) -> bool:
+        """Reset the breaker, returning if it was open."""
+        was_open = self.is_open
+        self.failures = 0
+        return was_open
+
+    def next_probe_interval(self) -> timedelta:
+        """Return a jittered, exponentially growing delay until the next probe."""
+        base = max(self.probe_interval, self.floor)
+        ceiling = max(self.max_probe_interval, base)
+        backoff = min(base * 2 ** (self.failures - self.threshold), ceiling)
+        return max(backoff * random.uniform(0.5, 1.0), base)
+
+
+class AnovaRateLimiter:
+    """Token bucket capping how many requests are started per second."""
+
+    def __init__(
+        self,
+        rate: float = MAX_REQUESTS_PER_SECOND,
+        burst: int = MAX_REQUEST_BURST,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Start with a full bucket."""
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available."""
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
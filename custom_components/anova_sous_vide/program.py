@@ -0,0 +1,221 @@
+"""Multi stage cook programs run by the integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timedelta
+
+import aiohttp
+from anova_wifi import AnovaException
+from homeassistant.core import callback
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+
+from .auth import AnovaAuth
+from .const import EVENT_PROGRAM_COMPLETE
+from .const import EVENT_PROGRAM_STAGE
+from .const import PROGRAM_BOOST_MARGIN
+from .const import PROGRAM_BOOST_WINDOW
+from .const import PROGRAM_TARGET_TOLERANCE
+from .coordinator import AnovaCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class AnovaProgramStage:
+    """A single stage of a cook program."""
+
+    target_temperature: float
+    # Time to cook once the target is reached, None to move on right away
+    duration: timedelta | None = None
+    # End the program on this stage and keep the cooker at its temperature
+    hold: bool = False
+
+
+class AnovaProgram:
+    """Runs the stages of a cook program on one cooker.
+
+    The program only reacts to coordinator updates and its own stage timers,
+    commands are sent to the cooker at stage transitions only. Polling is
+    boosted while the water nears a stage target and shortly before a stage
+    timer runs out, so transitions are confirmed quickly.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: AnovaCoordinator,
+        auth: AnovaAuth,
+        stages: list[AnovaProgramStage],
+        on_done: Callable[[], None],
+    ) -> None:
+        """Set up a program that hasn't started yet."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.auth = auth
+        self.stages = stages
+        self._on_done = on_done
+        self.stage_index = -1
+        # Set once the water reached the target of the current stage
+        self._target_reached = False
+        self._transition: asyncio.Task[None] | None = None
+        self._unsub_listener: Callable[[], None] | None = None
+        self._unsub_timers: list[Callable[[], None]] = []
+
+    @property
+    def stage(self) -> AnovaProgramStage:
+        """Return the current stage."""
+        return self.stages[self.stage_index]
+
+    async def async_start(self) -> None:
+        """Start the first stage."""
+        self._unsub_listener = self.coordinator.async_add_listener(
+            self._async_handle_update
+        )
+        await self._async_next_stage()
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop following the program, leaving the cooker as it is."""
+        if self._transition is not None and not self._transition.done():
+            self._transition.cancel()
+        self._async_release()
+
+    @callback
+    def _async_release(self) -> None:
+        """Stop listening to the cooker and go back to regular polling."""
+        if self._unsub_listener is not None:
+            self._unsub_listener()
+            self._unsub_listener = None
+        self._async_cancel_timers()
+        self.coordinator.async_set_boost_polling(False)
+
+    @callback
+    def _async_cancel_timers(self) -> None:
+        """Cancel the timers of the current stage."""
+        for unsub in self._unsub_timers:
+            unsub()
+        self._unsub_timers = []
+
+    async def _async_next_stage(self) -> None:
+        """Send the next stage to the cooker.
+
+        Failing to start the first stage fails the service call, later stages
+        run in the background and log the failure.
+        """
+        self._async_cancel_timers()
+        self.stage_index += 1
+        if self.stage_index == len(self.stages):
+            await self._async_finish(idle=True)
+            return
+        stage = self.stage
+        self._target_reached = False
+        device = self.coordinator.anova_device
+        try:
+            await self.auth.async_call(
+                device.set_target_temperature, stage.target_temperature
+            )
+            if self.stage_index == 0:
+                await self.auth.async_call(device.set_mode, "COOK")
+        except (AnovaException, aiohttp.ClientError, asyncio.TimeoutError) as err:
+            self._async_release()
+            self._on_done()
+            if self.stage_index == 0:
+                raise HomeAssistantError(
+                    f"Could not start the cook program: {err}"
+                ) from err
+            _LOGGER.error(
+                "Could not start stage %s of the cook program on %s: %s",
+                self.stage_index + 1,
+                device.device_key,
+                err,
+            )
+            return
+        self.hass.bus.async_fire(
+            EVENT_PROGRAM_STAGE,
+            {
+                "device_key": device.device_key,
+                "stage": self.stage_index + 1,
+                "stages": len(self.stages),
+                "target_temperature": stage.target_temperature,
+            },
+        )
+        # Confirm the new target with the next account tick
+        self.coordinator.async_resume_polling()
+
+    async def _async_finish(self, idle: bool) -> None:
+        """End the program, turning the cooker off unless the stage holds."""
+        device = self.coordinator.anova_device
+        self._async_release()
+        if idle:
+            try:
+                await self.auth.async_call(device.set_mode, "IDLE")
+            except (AnovaException, aiohttp.ClientError, asyncio.TimeoutError) as err:
+                _LOGGER.error(
+                    "Could not stop the cook program on %s: %s", device.device_key, err
+                )
+        self.hass.bus.async_fire(
+            EVENT_PROGRAM_COMPLETE,
+            {"device_key": device.device_key, "stages": len(self.stages)},
+        )
+        self.coordinator.async_resume_polling()
+        self._on_done()
+
+    @callback
+    def _async_transition(self) -> None:
+        """Move on from the current stage unless a transition is running."""
+        if self._transition is not None and not self._transition.done():
+            return
+        if self.stage.hold:
+            self._transition = self.hass.async_create_task(
+                self._async_finish(idle=False)
+            )
+        else:
+            self._transition = self.hass.async_create_task(self._async_next_stage())
+
+    @callback
+    def _async_handle_update(self) -> None:
+        """Check an update against the target of the current stage."""
+        data = self.coordinator.data
+        if (
+            self._target_reached
+            or self.stage_index < 0
+            or self.stage_index >= len(self.stages)
+            or data is None
+            or not self.coordinator.last_update_success
+        ):
+            return
+        stage = self.stage
+        difference = abs(data.sensor.water_temperature - stage.target_temperature)
+        self.coordinator.async_set_boost_polling(difference <= PROGRAM_BOOST_MARGIN)
+        if difference > PROGRAM_TARGET_TOLERANCE:
+            return
+        self._target_reached = True
+        self.coordinator.async_set_boost_polling(False)
+        if stage.duration is None:
+            self._async_transition()
+            return
+        duration = stage.duration.total_seconds()
+        self._unsub_timers = [
+            async_call_later(self.hass, duration, self._async_stage_done),
+            async_call_later(
+                self.hass,
+                max(duration - PROGRAM_BOOST_WINDOW, 0),
+                self._async_boost,
+            ),
+        ]
+
+    @callback
+    def _async_boost(self, _: datetime) -> None:
+        """Poll fast in the run up to a stage transition."""
+        self.coordinator.async_set_boost_polling(True)
+
+    @callback
+    def _async_stage_done(self, _: datetime) -> None:
+        """Move on once the stage has cooked for its duration."""
+        self._async_transition()
@@ -0,0 +1,137 @@
+"""Push updates from the Anova device websocket."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any
+
+import aiohttp
+from anova_wifi import AnovaException
+from homeassistant.core import callback
+from homeassistant.core import HomeAssistant
+
+from .auth import AnovaAuth
+from .const import MAX_PUSH_RECONNECT_INTERVAL
+from .coordinator import AnovaCoordinator
+from .util import build_apc_update
+
+_LOGGER = logging.getLogger(__name__)
+
+DEVICES_WEBSOCKET_URL = "https://devices.anovaculinary.io/?token={token}&supportedAccessories=APC&platform=android"
+EVENT_APC_STATE = "EVENT_APC_STATE"
+
+
+class AnovaPushListener:
+    """Keeps a websocket open for an account and pushes state to coordinators."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        auth: AnovaAuth,
+        coordinators: list[AnovaCoordinator],
+    ) -> None:
+        """Set up the push listener."""
+        self.hass = hass
+        self.auth = auth
+        self.coordinators = {
+            coordinator.anova_device.device_key: coordinator
+            for coordinator in coordinators
+        }
+        self.connected = False
+        self._task: asyncio.Task[None] | None = None
+
+    @callback
+    def async_add_coordinator(self, coordinator: AnovaCoordinator) -> None:
+        """Start pushing updates to a new device's coordinator."""
+        self.coordinators[coordinator.anova_device.device_key] = coordinator
+
+    @callback
+    def async_remove_coordinator(self, coordinator: AnovaCoordinator) -> None:
+        """Stop pushing updates to a removed device's coordinator."""
+        self.coordinators.pop(coordinator.anova_device.device_key, None)
+
+    @callback
+    def async_start(self) -> None:
+        """Start listening in the background."""
+        self._task = self.hass.async_create_background_task(
+            self._async_run(), "anova_sous_vide push listener"
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop listening and hand every device back to polling."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._async_set_disconnected()
+
+    async def _async_run(self) -> None:
+        """Connect, listen and reconnect with backoff until stopped."""
+        attempt = 0
+        try:
+            while True:
+                try:
+                    await self._async_listen()
+                except (
+                    aiohttp.ClientError,
+                    asyncio.TimeoutError,
+                    AnovaException,
+                ) as err:
+                    _LOGGER.debug("Anova push connection failed: %s", err)
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception("Unexpected error in the Anova push connection")
+                else:
+                    attempt = 0
+                self._async_set_disconnected()
+                attempt += 1
+                await asyncio.sleep(min(2**attempt, MAX_PUSH_RECONNECT_INTERVAL))
+        finally:
+            # Devices must never be left waiting on a stream that is gone
+            self._async_set_disconnected()
+
+    async def _async_listen(self) -> None:
+        """Listen to a single websocket session until it closes."""
+        token = await self.auth.async_ensure_firebase_token()
+        url = DEVICES_WEBSOCKET_URL.format(token=token)
+        async with self.auth.api.session.ws_connect(url, heartbeat=30) as websocket:
+            _LOGGER.debug("Connected to the Anova push websocket")
+            self.connected = True
+            async for message in websocket:
+                if message.type is not aiohttp.WSMsgType.TEXT:
+                    break
+                try:
+                    data = json.loads(message.data)
+                except ValueError:
+                    _LOGGER.debug("Ignoring undecodable Anova frame: %s", message.data)
+                    continue
+                self._async_handle_message(data)
+
+    @callback
+    def _async_handle_message(self, message: dict[str, Any]) -> None:
+        """Feed a device state frame into its coordinator."""
+        if message.get("command") != EVENT_APC_STATE:
+            return
+        payload = message.get("payload") or {}
+        coordinator = self.coordinators.get(payload.get("cookerId"))
+        if coordinator is None:
+            return
+        state = payload.get("state") or {}
+        if isinstance(state.get("state"), dict):
+            state = state["state"]
+        try:
+            data = build_apc_update(state)
+        except (KeyError, TypeError) as err:
+            _LOGGER.debug("Ignoring unexpected Anova state frame: %s", err)
+            return
+        coordinator.async_set_push_data(data)
+
+    @callback
+    def _async_set_disconnected(self) -> None:
+        """Resume polling for every device after the stream drops."""
+        if not self.connected:
+            return
+        _LOGGER.debug("Anova push websocket disconnected, falling back to polling")
+        self.connected = False
+        for coordinator in self.coordinators.values():
+            coordinator.async_resume_polling()
@@ -0,0 +1,108 @@
+"""Polling schedule shared by every Anova account."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+
+from homeassistant.core import callback
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import DOMAIN
+from .const import SCHEDULER_TICK_INTERVAL
+from .coordinator import AnovaAccountCoordinator
+from .coordinator import AnovaCoordinator
+from .polling import AnovaRateLimiter
+
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant) -> AnovaScheduler:
+    """Return the scheduler shared by all config entries."""
+    if (scheduler := hass.data.get(DATA_SCHEDULER)) is None:
+        scheduler = hass.data[DATA_SCHEDULER] = AnovaScheduler(hass)
+    return scheduler
+
+
+class AnovaScheduler:
+    """Starts the polls of all accounts from one clock.
+
+    Every tick the cookers that are due are polled, actively cooking ones
+    first, as long as the shared rate limiter has tokens left. Anything over
+    the budget stays due and goes out on a later tick, so accounts set up at
+    the same time don't send their requests in bursts. Each cooker gets its
+    own phase, spaced evenly across all accounts, and is polled at that point
+    within its interval.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, rate_limiter: AnovaRateLimiter | None = None
+    ) -> None:
+        """Set up an idle scheduler."""
+        self.hass = hass
+        self.rate_limiter = rate_limiter or AnovaRateLimiter()
+        self.accounts: list[AnovaAccountCoordinator] = []
+        self._in_flight: set[AnovaCoordinator] = set()
+        # Number of cookers the phases were last spread over
+        self._phased = 0
+        self._unsub_tick: Callable[[], None] | None = None
+
+    @callback
+    def async_add_account(self, account: AnovaAccountCoordinator) -> None:
+        """Start polling the cookers of an account."""
+        self.accounts.append(account)
+        if self._unsub_tick is None:
+            self._unsub_tick = async_track_time_interval(
+                self.hass, self._async_tick, SCHEDULER_TICK_INTERVAL
+            )
+
+    @callback
+    def async_remove_account(self, account: AnovaAccountCoordinator) -> None:
+        """Stop polling the cookers of an account."""
+        self.accounts.remove(account)
+        if not self.accounts and self._unsub_tick is not None:
+            self._unsub_tick()
+            self._unsub_tick = None
+
+    @callback
+    def _async_spread_phases(self) -> None:
+        """Space the phases of all cookers evenly."""
+        coordinators = [
+            coordinator
+            for account in self.accounts
+            for coordinator in account.coordinators
+        ]
+        for index, coordinator in enumerate(coordinators):
+            coordinator.poll_phase = index / len(coordinators)
+        self._phased = len(coordinators)
+
+    @callback
+    def _async_tick(self, now: datetime) -> None:
+        """Start the polls that are due, within the request budget."""
+        # Cookers come and go with accounts and discovery
+        if self._phased != sum(len(account.coordinators) for account in self.accounts):
+            self._async_spread_phases()
+        due = [
+            (account, coordinator)
+            for account in self.accounts
+            for coordinator in account.coordinators
+            if coordinator.next_update <= now and coordinator not in self._in_flight
+        ]
+        if not due:
+            return
+        due.sort(key=lambda item: (not item[1].is_active, item[1].next_update))
+        for account, coordinator in due:
+            if not self.rate_limiter.try_acquire():
+                break
+            self._in_flight.add(coordinator)
+            self.hass.async_create_task(self._async_poll(account, coordinator))
+
+    async def _async_poll(
+        self, account: AnovaAccountCoordinator, coordinator: AnovaCoordinator
+    ) -> None:
+        """Poll a cooker through its account."""
+        try:
+            await account.async_refresh_device(coordinator)
+        finally:
+            self._in_flight.discard(coordinator)
@@ -3,97 +3,188 @@ from __future__ import annotations
 
 from collections.abc import Callable
 from dataclasses import dataclass
+from datetime import datetime
 
-from anova_wifi import APCUpdateSensor
 from homeassistant import config_entries
 from homeassistant.components.sensor import SensorDeviceClass
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.components.sensor import SensorEntityDescription
 from homeassistant.components.sensor import SensorStateClass
+from homeassistant.const import Platform
 from homeassistant.const import UnitOfTemperature
 from homeassistant.const import UnitOfTime
+from homeassistant.core import callback
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
 
+from .const import CONF_RAW_TEMPERATURE_SENSORS
 from .const import DOMAIN
+from .const import TEMPERATURE_KEYS
+from .coordinator import AnovaCoordinator
 from .entity import AnovaDescriptionEntity
+from .entity import AnovaFleetEntity
+from .fleet import AnovaFleet
 from .models import AnovaData
+from .stats import AnovaRequestStats
+from .util import signal_new_coordinator
 
 
 @dataclass
-class AnovaSensorEntityDescriptionMixin:
-    """Describes the mixin variables for anova sensors."""
+class AnovaFleetSensorEntityDescriptionMixin:
+    """Describes the mixin variables for anova account aggregate sensors."""
 
-    value_fn: Callable[[APCUpdateSensor], float | int | str]
+    value_fn: Callable[[AnovaFleet], StateType | datetime]
 
 
 @dataclass
-class AnovaSensorEntityDescription(
-    SensorEntityDescription, AnovaSensorEntityDescriptionMixin
+class AnovaFleetSensorEntityDescription(
+    SensorEntityDescription, AnovaFleetSensorEntityDescriptionMixin
 ):
-    """Describes a Anova sensor."""
+    """Describes a Anova account aggregate sensor."""
+
+
+@dataclass
+class AnovaStatsSensorEntityDescriptionMixin:
+    """Describes the mixin variables for anova request statistic sensors."""
+
+    value_fn: Callable[[AnovaRequestStats], float | int | None]
+
+
+@dataclass
+class AnovaStatsSensorEntityDescription(
+    SensorEntityDescription, AnovaStatsSensorEntityDescriptionMixin
+):
+    """Describes a Anova request statistic sensor."""
 
 
 SENSOR_DESCRIPTIONS: list[SensorEntityDescription] = [
-    AnovaSensorEntityDescription(
+    SensorEntityDescription(
         key="cook_time",
         state_class=SensorStateClass.TOTAL_INCREASING,
         native_unit_of_measurement=UnitOfTime.SECONDS,
         icon="mdi:clock-outline",
         translation_key="cook_time",
         device_class=SensorDeviceClass.DURATION,
-        value_fn=lambda data: data.cook_time,
-    ),
-    AnovaSensorEntityDescription(
-        key="state", translation_key="state", value_fn=lambda data: data.state
-    ),
-    AnovaSensorEntityDescription(
-        key="mode", translation_key="mode", value_fn=lambda data: data.mode
     ),
-    AnovaSensorEntityDescription(
+    SensorEntityDescription(key="state", translation_key="state"),
+    SensorEntityDescription(key="mode", translation_key="mode"),
+    SensorEntityDescription(
         key="target_temperature",
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
         icon="mdi:thermometer",
         translation_key="target_temperature",
-        value_fn=lambda data: data.target_temperature,
     ),
-    AnovaSensorEntityDescription(
+    SensorEntityDescription(
         key="cook_time_remaining",
         native_unit_of_measurement=UnitOfTime.SECONDS,
         icon="mdi:clock-outline",
         translation_key="cook_time_remaining",
         device_class=SensorDeviceClass.DURATION,
-        value_fn=lambda data: data.cook_time_remaining,
     ),
-    AnovaSensorEntityDescription(
+    SensorEntityDescription(
         key="heater_temperature",
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
         icon="mdi:thermometer",
         translation_key="heater_temperature",
-        value_fn=lambda data: data.heater_temperature,
     ),
-    AnovaSensorEntityDescription(
+    SensorEntityDescription(
         key="triac_temperature",
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
         icon="mdi:thermometer",
         translation_key="triac_temperature",
-        value_fn=lambda data: data.triac_temperature,
     ),
-    AnovaSensorEntityDescription(
+    SensorEntityDescription(
         key="water_temperature",
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
         icon="mdi:thermometer",
         translation_key="water_temperature",
-        value_fn=lambda data: data.water_temperature,
+    ),
+    SensorEntityDescription(
+        key="heating_rate",
+        native_unit_of_measurement="°C/min",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:thermometer-chevron-up",
+        translation_key="heating_rate",
+    ),
+    SensorEntityDescription(
+        key="time_to_target",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        icon="mdi:timer-sand",
+        translation_key="time_to_target",
+    ),
+    SensorEntityDescription(
+        key="temperature_stability",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:sine-wave",
+        translation_key="temperature_stability",
+    ),
+    SensorEntityDescription(
+        key="cook_end",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        icon="mdi:timer-check-outline",
+        translation_key="cook_end",
+    ),
+]
+
+STATS_SENSOR_DESCRIPTIONS: list[SensorEntityDescription] = [
+    AnovaStatsSensorEntityDescription(
+        key="poll_latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        translation_key="poll_latency",
+        value_fn=lambda stats: stats.latency_percentile(95),
+    ),
+    AnovaStatsSensorEntityDescription(
+        key="poll_errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        icon="mdi:alert-circle-outline",
+        translation_key="poll_errors",
+        value_fn=lambda stats: stats.errors,
+    ),
+    AnovaStatsSensorEntityDescription(
+        key="requests_last_hour",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        icon="mdi:cloud-sync-outline",
+        translation_key="requests_last_hour",
+        value_fn=lambda stats: stats.requests_last_hour,
+    ),
+]
+
+FLEET_SENSOR_DESCRIPTIONS: list[AnovaFleetSensorEntityDescription] = [
+    AnovaFleetSensorEntityDescription(
+        key="cookers_cooking",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:pot-steam-outline",
+        translation_key="cookers_cooking",
+        value_fn=lambda fleet: fleet.cooking,
+    ),
+    AnovaFleetSensorEntityDescription(
+        key="next_cook_end",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        icon="mdi:timer-check-outline",
+        translation_key="next_cook_end",
+        value_fn=lambda fleet: fleet.next_cook_end,
     ),
 ]
 
@@ -105,19 +196,88 @@ async def async_setup_entry(
 ) -> None:
     """Set up Anova device."""
     anova_data: AnovaData = hass.data[DOMAIN][entry.entry_id]
+    descriptions = SENSOR_DESCRIPTIONS
+    if not entry.options.get(CONF_RAW_TEMPERATURE_SENSORS, True):
+        # Cooks are still summarized in long term statistics, drop the sensors
+        # that would otherwise record every poll.
+        descriptions = [
+            description
+            for description in SENSOR_DESCRIPTIONS
+            if description.key not in TEMPERATURE_KEYS
+        ]
+        entity_registry = er.async_get(hass)
+        for coordinator in anova_data.coordinators:
+            for key in TEMPERATURE_KEYS:
+                if entity_id := entity_registry.async_get_entity_id(
+                    Platform.SENSOR, DOMAIN, f"{coordinator._device_unique_id}_{key}"
+                ):
+                    entity_registry.async_remove(entity_id)
+
+    @callback
+    def _async_add_coordinators(coordinators: list[AnovaCoordinator]) -> None:
+        """Add sensors for cookers."""
+        async_add_entities(
+            AnovaSensor(coordinator, description)
+            for coordinator in coordinators
+            for description in descriptions
+        )
+        async_add_entities(
+            AnovaStatsSensor(coordinator, description)
+            for coordinator in coordinators
+            for description in STATS_SENSOR_DESCRIPTIONS
+        )
+
+    _async_add_coordinators(anova_data.coordinators)
     async_add_entities(
-        AnovaSensor(coordinator, description)
-        for coordinator in anova_data.coordinators
-        for description in SENSOR_DESCRIPTIONS
+        AnovaFleetSensor(anova_data.fleet, entry.entry_id, description)
+        for description in FLEET_SENSOR_DESCRIPTIONS
+    )
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, signal_new_coordinator(entry.entry_id), _async_add_coordinators
+        )
     )
 
 
 class AnovaSensor(AnovaDescriptionEntity, SensorEntity):
     """A sensor using Anova coordinator."""
 
-    entity_description: AnovaSensorEntityDescription
+    @property
+    def native_value(self) -> StateType:
+        """Return the state."""
+        return self.coordinator.snapshot[self._snapshot_index]
+
+
+class AnovaStatsSensor(AnovaDescriptionEntity, SensorEntity):
+    """A diagnostic sensor showing request statistics of an Anova cooker."""
+
+    entity_description: AnovaStatsSensorEntityDescription
+
+    def __init__(
+        self, coordinator: AnovaCoordinator, description: SensorEntityDescription
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, description)
+        # Statistics change with every request, not with a data field
+        self._snapshot_indices = None
+
+    @property
+    def available(self) -> bool:
+        """Return True, statistics are kept while the device is offline."""
+        return True
 
     @property
     def native_value(self) -> StateType:
         """Return the state."""
-        return self.entity_description.value_fn(self.coordinator.data.sensor)
+        return self.entity_description.value_fn(self.coordinator.stats)
+
+
+class AnovaFleetSensor(AnovaFleetEntity, SensorEntity):
+    """A sensor showing an aggregate over all cookers of an account."""
+
+    entity_description: AnovaFleetSensorEntityDescription
+
+    @property
+    def native_value(self) -> StateType | datetime:
+        """Return the state."""
+        return self.entity_description.value_fn(self.fleet)
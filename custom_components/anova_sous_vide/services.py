@@ -0,0 +1,123 @@
+"""Services for the Anova integration."""
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.core import ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
+
+from .const import DOMAIN
+from .coordinator import AnovaCoordinator
+from .models import AnovaData
+from .program import AnovaProgram
+from .program import AnovaProgramStage
+
+SERVICE_RUN_PROGRAM = "run_program"
+SERVICE_CANCEL_PROGRAM = "cancel_program"
+
+ATTR_STAGES = "stages"
+ATTR_TARGET_TEMPERATURE = "target_temperature"
+ATTR_DURATION = "duration"
+ATTR_HOLD = "hold"
+
+STAGE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_TARGET_TEMPERATURE): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=63.33)
+        ),
+        vol.Optional(ATTR_DURATION): cv.positive_time_period,
+        vol.Optional(ATTR_HOLD, default=False): cv.boolean,
+    }
+)
+
+
+def _validate_hold(stages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Only allow the last stage to hold, it ends the program."""
+    if any(stage[ATTR_HOLD] for stage in stages[:-1]):
+        raise vol.Invalid("Only the last stage can hold")
+    return stages
+
+
+RUN_PROGRAM_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): cv.string,
+        vol.Required(ATTR_STAGES): vol.All(
+            cv.ensure_list, vol.Length(min=1), [STAGE_SCHEMA], _validate_hold
+        ),
+    }
+)
+CANCEL_PROGRAM_SCHEMA = vol.Schema({vol.Required(ATTR_DEVICE_ID): cv.string})
+
+
+def _async_get_device(
+    hass: HomeAssistant, device_id: str
+) -> tuple[AnovaData, AnovaCoordinator]:
+    """Return the entry data and coordinator of a cooker device."""
+    if (device := dr.async_get(hass).async_get_device_by_id(device_id)) is not None:
+        device_keys = {
+            identifier for domain, identifier in device.identifiers if domain == DOMAIN
+        }
+        for entry_id in device.config_entries:
+            if (anova_data := hass.data.get(DOMAIN, {}).get(entry_id)) is None:
+                continue
+            for coordinator in anova_data.coordinators:
+                if coordinator.anova_device.device_key in device_keys:
+                    return anova_data, coordinator
+    raise HomeAssistantError(f"Device {device_id} is not a loaded Anova cooker")
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    async def _async_run_program(call: ServiceCall) -> None:
+        """Start a cook program, replacing the one running on the cooker."""
+        anova_data, coordinator = _async_get_device(hass, call.data[ATTR_DEVICE_ID])
+        device_key = coordinator.anova_device.device_key
+        if (running := anova_data.programs.pop(device_key, None)) is not None:
+            running.async_stop()
+        program = AnovaProgram(
+            hass,
+            coordinator,
+            anova_data.auth,
+            [
+                AnovaProgramStage(
+                    target_temperature=stage[ATTR_TARGET_TEMPERATURE],
+                    duration=stage.get(ATTR_DURATION),
+                    hold=stage[ATTR_HOLD],
+                )
+                for stage in call.data[ATTR_STAGES]
+            ],
+            lambda: _async_forget_program(anova_data, device_key, program),
+        )
+        anova_data.programs[device_key] = program
+        await program.async_start()
+
+    async def _async_cancel_program(call: ServiceCall) -> None:
+        """Stop the cook program of a cooker, leaving the cooker as it is."""
+        anova_data, coordinator = _async_get_device(hass, call.data[ATTR_DEVICE_ID])
+        device_key = coordinator.anova_device.device_key
+        if (running := anova_data.programs.pop(device_key, None)) is not None:
+            running.async_stop()
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_RUN_PROGRAM, _async_run_program, schema=RUN_PROGRAM_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CANCEL_PROGRAM,
+        _async_cancel_program,
+        schema=CANCEL_PROGRAM_SCHEMA,
+    )
+
+
+def _async_forget_program(
+    anova_data: AnovaData, device_key: str, program: AnovaProgram
+) -> None:
+    """Drop a finished program unless it was already replaced."""
+    if anova_data.programs.get(device_key) is program:
+        del anova_data.programs[device_key]
@@ -0,0 +1,52 @@
+"""Flat snapshots of Anova updates shared by all entities of a cooker."""
+from __future__ import annotations
+
+from dataclasses import fields
+from datetime import datetime
+from operator import attrgetter
+from typing import Any
+
+from anova_wifi import APCUpdate
+from anova_wifi import APCUpdateBinary
+from anova_wifi import APCUpdateSensor
+
+from .history import AnovaSampleHistory
+
+SENSOR_FIELDS = tuple(field.name for field in fields(APCUpdateSensor))
+BINARY_SENSOR_FIELDS = tuple(field.name for field in fields(APCUpdateBinary))
+HISTORY_FIELDS = ("heating_rate", "time_to_target", "temperature_stability")
+SESSION_FIELDS = ("cook_end",)
+
+SNAPSHOT_FIELDS = SENSOR_FIELDS + BINARY_SENSOR_FIELDS + HISTORY_FIELDS + SESSION_FIELDS
+# Position of every field in a snapshot, entities look their index up once
+SNAPSHOT_INDEX = {name: index for index, name in enumerate(SNAPSHOT_FIELDS)}
+# Shared by all entities showing the same single field
+FIELD_INDICES = {name: frozenset((index,)) for name, index in SNAPSHOT_INDEX.items()}
+
+_get_sensor_fields = attrgetter(*SENSOR_FIELDS)
+_get_binary_sensor_fields = attrgetter(*BINARY_SENSOR_FIELDS)
+
+
+def build_snapshot(
+    data: APCUpdate, history: AnovaSampleHistory, cook_end: datetime | None
+) -> tuple[Any, ...]:
+    """Decode an update and its derived values into a tuple ordered like SNAPSHOT_FIELDS."""
+    return (
+        _get_sensor_fields(data.sensor)
+        + _get_binary_sensor_fields(data.binary_sensor)
+        + (
+            history.heating_rate,
+            history.time_to_target(data.sensor.target_temperature),
+            history.temperature_stability,
+            cook_end,
+        )
+    )
+
+
+def snapshot_indices(*names: str) -> frozenset[int]:
+    """Return the snapshot positions of the given fields."""
+    return frozenset(SNAPSHOT_INDEX[name] for name in names)
+
+
+# Fields the cooker reports itself, rather than ones derived from its history
+DEVICE_INDICES = snapshot_indices(*SENSOR_FIELDS, *BINARY_SENSOR_FIELDS)
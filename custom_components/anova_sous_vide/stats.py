@@ -0,0 +1,123 @@
+"""Request statistics for the Anova integration."""
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import Any
+
+from .const import LATENCY_SAMPLES
+
+
+class _MinuteCounter:
+    """Counts events over the last hour in sixty one minute buckets."""
+
+    def __init__(self) -> None:
+        """Initialize the buckets."""
+        self._counts = [0] * 60
+        self._keys = [0] * 60
+
+    def increment(self) -> None:
+        """Count one event now."""
+        minute = int(time.monotonic() // 60)
+        slot = minute % 60
+        if self._keys[slot] != minute:
+            self._keys[slot] = minute
+            self._counts[slot] = 0
+        self._counts[slot] += 1
+
+    def last_hour(self) -> int:
+        """Return the number of events in the last hour."""
+        oldest = int(time.monotonic() // 60) - 59
+        return sum(
+            count for key, count in zip(self._keys, self._counts) if key >= oldest
+        )
+
+
+class AnovaRequestStats:
+    """Counts requests and state writes for a device or an account.
+
+    Device stats roll up into their account's stats through parent. Hourly
+    rates are counted in one minute buckets and latencies are kept in a
+    bounded window, so recording is O(1) with fixed memory.
+    """
+
+    def __init__(self, parent: AnovaRequestStats | None = None) -> None:
+        """Initialize the counters."""
+        self.parent = parent
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.state_writes = 0
+        # CPU seconds spent notifying entities of each update
+        self.update_cpu_times: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.setup_time: float | None = None
+        self._requests_per_minute = _MinuteCounter()
+        self._state_writes_per_minute = _MinuteCounter()
+
+    def record(
+        self, latency: float, *, error: bool = False, timeout: bool = False
+    ) -> None:
+        """Record one request and how long it took in seconds."""
+        self.requests += 1
+        if error:
+            self.errors += 1
+        if timeout:
+            self.timeouts += 1
+        self.latencies.append(latency)
+        self._requests_per_minute.increment()
+        if self.parent is not None:
+            self.parent.record(latency, error=error, timeout=timeout)
+
+    def record_state_write(self) -> None:
+        """Record an entity state write caused by an update."""
+        self.state_writes += 1
+        self._state_writes_per_minute.increment()
+        if self.parent is not None:
+            self.parent.record_state_write()
+
+    def record_update_cpu_time(self, cpu_time: float) -> None:
+        """Record the CPU seconds spent notifying entities of an update."""
+        self.update_cpu_times.append(cpu_time)
+        if self.parent is not None:
+            self.parent.record_update_cpu_time(cpu_time)
+
+    @property
+    def requests_last_hour(self) -> int:
+        """Return the number of requests made in the last hour."""
+        return self._requests_per_minute.last_hour()
+
+    @property
+    def state_writes_last_hour(self) -> int:
+        """Return the number of state writes in the last hour."""
+        return self._state_writes_per_minute.last_hour()
+
+    def latency_percentile(self, percentile: float) -> float | None:
+        """Return a latency percentile in milliseconds over the recent window."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+        return round(ordered[index] * 1000, 1)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics for diagnostics."""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "requests_last_hour": self.requests_last_hour,
+            "latency_ms": {
+                "p50": self.latency_percentile(50),
+                "p95": self.latency_percentile(95),
+                "p99": self.latency_percentile(99),
+            },
+            "state_writes": self.state_writes,
+            "state_writes_last_hour": self.state_writes_last_hour,
+            "update_cpu_ms_mean": (
+                round(sum(self.update_cpu_times) / len(self.update_cpu_times) * 1000, 3)
+                if self.update_cpu_times
+                else None
+            ),
+            "setup_seconds": self.setup_time,
+        }
@@ -1,7 +1,81 @@
 """Anova utilities."""
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Any
+
 from anova_wifi import AnovaPrecisionCooker
+from anova_wifi import APCUpdate
+from anova_wifi import APCUpdateBinary
+from anova_wifi import APCUpdateSensor
+from anova_wifi.precission_cooker import MODE_MAP
+from anova_wifi.precission_cooker import STATE_MAP
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
 
 
 def serialize_device_list(devices: list[AnovaPrecisionCooker]) -> list[tuple[str, str]]:
     """Turn the device list into a serializable list that can be reconstructed."""
     return [(device.device_key, device.type) for device in devices]
+
+
+def signal_new_coordinator(entry_id: str) -> str:
+    """Return the dispatcher signal sent when cookers are added to an entry."""
+    return f"{DOMAIN}_new_coordinator_{entry_id}"
+
+
+def build_apc_update(anova_status: dict[str, Any]) -> APCUpdate:
+    """Build an APCUpdate from a raw device state body.
+
+    Mirrors the parsing done in AnovaPrecisionCooker.update so that state bodies
+    received outside of a poll produce identical updates.
+    """
+    system_info = "system-info"
+    for key in anova_status:
+        if "system-info" in key and "details" not in key and "nxp" not in key:
+            system_info = key
+            break
+    job_state = anova_status["job-status"]["state"]
+    pin_info = anova_status["pin-info"]
+    temperature_info = anova_status["temperature-info"]
+    return APCUpdate(
+        binary_sensor=APCUpdateBinary(
+            cooking=job_state == "COOKING",
+            preheating=job_state == "PREHEATING",
+            maintaining=job_state == "MAINTAINING",
+            device_safe=pin_info["device-safe"] == 1,
+            water_leak=pin_info["water-leak"] == 1,
+            water_level_critical=pin_info["water-level-critical"] == 1,
+            water_temp_too_high=(
+                pin_info["water-temp-too-high"] == 1
+                if "water-temp-too-high" in pin_info
+                else None
+            ),
+        ),
+        sensor=APCUpdateSensor(
+            cook_time=anova_status["job"]["cook-time-seconds"],
+            mode=MODE_MAP.get(anova_status["job"]["mode"], "Unknown"),
+            state=STATE_MAP.get(job_state, "No state"),
+            target_temperature=anova_status["job"]["target-temperature"],
+            cook_time_remaining=anova_status["job-status"]["cook-time-remaining"],
+            firmware_version=anova_status[system_info]["firmware-version"],
+            heater_temperature=temperature_info["heater-temperature"],
+            triac_temperature=temperature_info["triac-temperature"],
+            water_temperature=temperature_info["water-temperature"],
+        ),
+    )
+
+
+def jwt_expiry(jwt: str) -> datetime | None:
+    """Return when a JWT expires, read from its unverified exp claim."""
+    try:
+        payload = jwt.split(".")[1]
+        claims = json.loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        )
+        return dt_util.utc_from_timestamp(float(claims["exp"]))
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
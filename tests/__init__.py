@@ -0,0 +1,73 @@
+"""Tests for the Anova Sous Vide integration."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+from anova_wifi import APCUpdate
+from custom_components.anova_sous_vide.util import build_apc_update
+from homeassistant.util import dt as dt_util
+
+
+def anova_state(
+    state: str = "",
+    mode: str = "IDLE",
+    water_temperature: float = 20.0,
+    target_temperature: float = 55.0,
+    cook_time_remaining: int = 0,
+    cook_time: int = 0,
+    water_temp_too_high: int = 0,
+) -> dict[str, Any]:
+    """Return a device state body like the Anova cloud sends it."""
+    return {
+        "job": {
+            "cook-time-seconds": cook_time,
+            "mode": mode,
+            "target-temperature": target_temperature,
+        },
+        "job-status": {"state": state, "cook-time-remaining": cook_time_remaining},
+        "pin-info": {
+            "device-safe": 1,
+            "water-leak": 0,
+            "water-level-critical": 0,
+            "water-temp-too-high": water_temp_too_high,
+        },
+        "system-info-3220": {"firmware-version": "2.2.0"},
+        "temperature-info": {
+            "heater-temperature": water_temperature + 1,
+            "triac-temperature": 30.0,
+            "water-temperature": water_temperature,
+        },
+    }
+
+
+class StubCooker:
+    """Stands in for AnovaPrecisionCooker, keeping its state in memory."""
+
+    type = "a5"
+
+    def __init__(self, device_key: str, **state: Any) -> None:
+        """Start in the given state, idle by default."""
+        self.device_key = device_key
+        self.state = anova_state(**state)
+        # When each update was made
+        self.updates: list[datetime] = []
+        # How the cooker stores a requested target
+        self.store_target: Callable[[float], float] = lambda target: target
+        # Mode the cooker ends up in when asked to cook
+        self.cook_state = "PREHEATING"
+
+    async def update(self) -> APCUpdate:
+        """Return the current state."""
+        self.updates.append(dt_util.utcnow())
+        return build_apc_update(self.state)
+
+    async def set_target_temperature(self, temperature: float) -> None:
+        """Store a new target."""
+        self.state["job"]["target-temperature"] = self.store_target(temperature)
+
+    async def set_mode(self, mode: str) -> None:
+        """Start or stop cooking."""
+        self.state["job"]["mode"] = mode
+        self.state["job-status"]["state"] = self.cook_state if mode == "COOK" else ""
@@ -0,0 +1,206 @@
+"""A local stand-in for the Anova cloud."""
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import random
+import time
+import warnings
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import aiohttp
+from aiohttp import web
+from yarl import URL
+
+from . import anova_state
+
+FIREBASE_PATH = "/www.googleapis.com/identitytoolkit/v3/relyingparty/verifyPassword"
+DEVICE_TYPE = "a5"
+
+
+def make_jwt(lifetime: float = 365 * 24 * 3600) -> str:
+    """Return an unsigned JWT that expires after lifetime seconds."""
+    claims = json.dumps({"exp": int(time.time() + lifetime)}).encode()
+    payload = base64.urlsafe_b64encode(claims).decode().rstrip("=")
+    return f"e30.{payload}.signature"
+
+
+def state_frame(device_key: str, body: dict[str, Any]) -> dict[str, Any]:
+    """Return a websocket frame pushing the state of a cooker."""
+    return {
+        "command": "EVENT_APC_STATE",
+        "payload": {
+            "cookerId": device_key,
+            "type": DEVICE_TYPE,
+            "state": {"state": body},
+        },
+    }
+
+
+class AnovaCloud:
+    """Serves the endpoints anova_wifi talks to from plain dicts.
+
+    States are keyed by cooker, the websocket sends the device list and then
+    replays the queued frames. Every request is counted by route. Latency is
+    waited out in real time on a thread, so it holds under a frozen clock.
+    """
+
+    def __init__(self, seed: int = 0) -> None:
+        """Start without cookers."""
+        self.states: dict[str, dict[str, Any]] = {}
+        # Cookers whose state endpoint answers with an empty list
+        self.offline: set[str] = set()
+        # Seconds each cooker takes to answer a state request
+        self.latency: dict[str, float] = {}
+        # Share of state requests answered as offline, or with a server error
+        self.offline_rate = 0.0
+        self.error_rate = 0.0
+        self._random = random.Random(seed)
+        self._executor = ThreadPoolExecutor(max_workers=16)
+        # Sent on the websocket after the device list, str frames as they are
+        self.frames: list[dict[str, Any] | str] = []
+        # Close the websocket once the frames are sent
+        self.close_after_frames = False
+        self.requests: Counter[str] = Counter()
+        # Most state requests that were waiting on the cloud at the same time
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self.url = URL()
+        self._websockets: set[web.WebSocketResponse] = set()
+        self._runner: web.AppRunner | None = None
+        app = web.Application()
+        app.router.add_post(FIREBASE_PATH, self._firebase)
+        app.router.add_post("/anovaculinary.io/authenticate", self._authenticate)
+        app.router.add_get("/anovaculinary.io/devices/{key}/states/", self._state)
+        app.router.add_put("/anovaculinary.io/devices/{key}/current-job", self._job)
+        app.router.add_get("/devices.anovaculinary.io/", self._websocket)
+        self.app = app
+
+    def add_device(self, device_key: str, **state: Any) -> None:
+        """Add a cooker to the account."""
+        self.states[device_key] = anova_state(**state)
+
+    def add_devices(
+        self, count: int, prefix: str = "cooker", **state: Any
+    ) -> list[str]:
+        """Add count cookers and return their keys."""
+        device_keys = [f"{prefix}{index:03}" for index in range(count)]
+        for device_key in device_keys:
+            self.add_device(device_key, **state)
+        return device_keys
+
+    def session(self) -> CloudSession:
+        """Return a client session talking to this cloud."""
+        return CloudSession(self.url)
+
+    async def async_start(self) -> None:
+        """Listen on a free local port."""
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        self.url = URL(f"http://127.0.0.1:{port}")
+
+    async def async_stop(self) -> None:
+        """Stop listening."""
+        for websocket in list(self._websockets):
+            await websocket.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+        self._executor.shutdown(wait=False)
+
+    async def _firebase(self, request: web.Request) -> web.Response:
+        self.requests["firebase"] += 1
+        return web.json_response({"idToken": "firebase-token"})
+
+    async def _authenticate(self, request: web.Request) -> web.Response:
+        self.requests["authenticate"] += 1
+        return web.json_response({"jwt": make_jwt()})
+
+    async def _state(self, request: web.Request) -> web.Response:
+        self.requests["state"] += 1
+        device_key = request.match_info["key"]
+        if delay := self.latency.get(device_key):
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+            try:
+                await asyncio.get_running_loop().run_in_executor(
+                    self._executor, time.sleep, delay
+                )
+            finally:
+                self._in_flight -= 1
+        roll = self._random.random()
+        if roll < self.error_rate:
+            return web.Response(status=500, text="Internal Server Error")
+        if (
+            roll < self.error_rate + self.offline_rate
+            or device_key in self.offline
+            or device_key not in self.states
+        ):
+            return web.json_response([])
+        return web.json_response([{"body": self.states[device_key]}])
+
+    async def _job(self, request: web.Request) -> web.Response:
+        self.requests["job"] += 1
+        job = await request.json()
+        state = self.states[request.match_info["key"]]
+        state["job"]["target-temperature"] = job["target-temperature"]
+        state["job"]["cook-time-seconds"] = job["cook-time-seconds"]
+        state["job"]["mode"] = job["mode"].upper()
+        return web.json_response(job)
+
+    async def _websocket(self, request: web.Request) -> web.WebSocketResponse:
+        self.requests["websocket"] += 1
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        self._websockets.add(websocket)
+        try:
+            await websocket.send_json(
+                {
+                    "command": "EVENT_APC_WIFI_VERSION",
+                    "payload": [
+                        {"cookerId": device_key, "type": DEVICE_TYPE}
+                        for device_key in self.states
+                    ],
+                }
+            )
+            for frame in self.frames:
+                if isinstance(frame, str):
+                    await websocket.send_str(frame)
+                else:
+                    await websocket.send_json(frame)
+            if not self.close_after_frames:
+                async for _ in websocket:
+                    pass
+        finally:
+            self._websockets.discard(websocket)
+            await websocket.close()
+        return websocket
+
+
+with warnings.catch_warnings():
+    # Subclassing is discouraged, but it is the one place every request,
+    # websockets included, passes through
+    warnings.simplefilter("ignore", DeprecationWarning)
+
+    class CloudSession(aiohttp.ClientSession):
+        """Client session that sends requests for Anova hosts to the cloud."""
+
+        def __init__(self, cloud_url: URL) -> None:
+            """Send requests to cloud_url."""
+            super().__init__()
+            self._cloud_url = cloud_url
+
+        async def _request(
+            self, method: str, str_or_url: Any, **kwargs: Any
+        ) -> aiohttp.ClientResponse:
+            url = URL(str_or_url)
+            if url.is_absolute() and url.host != self._cloud_url.host:
+                url = self._cloud_url.with_path(f"/{url.host}{url.path}").with_query(
+                    url.query
+                )
+            return await super()._request(method, url, **kwargs)
@@ -0,0 +1,38 @@
+"""Fixtures for the Anova Sous Vide tests."""
+from collections.abc import AsyncGenerator
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+
+from .cloud import AnovaCloud
+from .harness import AnovaHarness
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Load the integration from custom_components."""
+    yield
+
+
+@pytest.fixture
+async def anova_cloud(
+    hass: HomeAssistant, socket_enabled: None
+) -> AsyncGenerator[AnovaCloud, None]:
+    """Serve a local stand-in for the Anova cloud."""
+    cloud = AnovaCloud()
+    await cloud.async_start()
+    yield cloud
+    await cloud.async_stop()
+
+
+@pytest.fixture
+async def harness(
+    hass: HomeAssistant, anova_cloud: AnovaCloud, freezer: FrozenDateTimeFactory
+) -> AsyncGenerator[AnovaHarness, None]:
+    """Set up accounts against the local cloud on a frozen clock."""
+    harness = AnovaHarness(hass, anova_cloud, freezer)
+    yield harness
+    await harness.async_stop()
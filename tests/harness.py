@@ -0,0 +1,236 @@
+"""Drives whole config entries against the local Anova cloud.
+
+Time is frozen and moved on a second at a time, so hours of polling run in
+seconds while every request still goes through anova_wifi and HTTP.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+from unittest.mock import patch
+
+from custom_components.anova_sous_vide.const import DOMAIN
+from custom_components.anova_sous_vide.models import AnovaData
+from custom_components.anova_sous_vide.polling import AnovaRateLimiter
+from custom_components.anova_sous_vide.scheduler import async_get_scheduler
+from freezegun import api as freezegun_api
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.const import CONF_PASSWORD
+from homeassistant.const import CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from .cloud import AnovaCloud
+from .cloud import DEVICE_TYPE
+from .cloud import make_jwt
+
+# Appended to as one JSON line per report, for tracking numbers across changes
+REPORT_PATH_ENV = "ANOVA_HARNESS_REPORT"
+
+
+def perf_counter() -> float:
+    """Return real seconds, also while the clock is frozen."""
+    # Looked up on the module, freezegun patches references held elsewhere
+    return freezegun_api.real_perf_counter()
+
+
+@dataclass
+class HarnessReport:
+    """Numbers from one harness run."""
+
+    name: str
+    devices: int
+    minutes: float
+    setup_seconds: float
+    # In process CPU per poll, the local cloud answering it included
+    poll_cpu_ms: float
+    # CPU spent notifying entities of an update
+    update_cpu_ms: float
+    memory_per_device_kib: float
+    state_writes_per_minute: float
+    requests: dict[str, int]
+
+    def __str__(self) -> str:
+        """Return the report as aligned lines."""
+        return "\n".join(f"{key:>24}: {value}" for key, value in asdict(self).items())
+
+    def save(self) -> None:
+        """Append the report to the file named by ANOVA_HARNESS_REPORT."""
+        if path := os.environ.get(REPORT_PATH_ENV):
+            with open(path, "a", encoding="utf-8") as report_file:
+                report_file.write(json.dumps(asdict(self)) + "\n")
+
+
+class AnovaHarness:
+    """Sets up accounts against the local cloud and moves time on."""
+
+    def __init__(
+        self, hass: HomeAssistant, cloud: AnovaCloud, freezer: FrozenDateTimeFactory
+    ) -> None:
+        """Use the given cloud and frozen clock."""
+        self.hass = hass
+        self.cloud = cloud
+        self.freezer = freezer
+        # Discovery reads the websocket until time.time() moves on, which it
+        # doesn't while the clock is frozen, so the cloud hangs up instead
+        cloud.close_after_frames = True
+        self.entries: list[MockConfigEntry] = []
+        # Wall clock seconds the last account took to set up
+        self.setup_seconds = 0.0
+
+    async def async_add_account(
+        self,
+        device_keys: list[str],
+        options: dict[str, Any] | None = None,
+        entry_id: str | None = None,
+    ) -> MockConfigEntry:
+        """Set up a config entry for cookers already on the cloud."""
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            entry_id=entry_id,
+            data={
+                CONF_USERNAME: f"user{len(self.entries)}@example.com",
+                CONF_PASSWORD: "password",
+                "jwt": make_jwt(),
+                "devices": [(device_key, DEVICE_TYPE) for device_key in device_keys],
+                "discovered_at": dt_util.utcnow().isoformat(),
+            },
+            options=options or {},
+        )
+        entry.add_to_hass(self.hass)
+        start = perf_counter()
+        with patch(
+            "custom_components.anova_sous_vide.async_create_account_session",
+            side_effect=lambda hass: self.cloud.session(),
+        ):
+            assert await self.hass.config_entries.async_setup(entry.entry_id)
+        # Setup times itself on the frozen clock, which doesn't move
+        self.setup_seconds = perf_counter() - start
+        # The shared budget refills on the frozen clock like everything else
+        scheduler = async_get_scheduler(self.hass)
+        if scheduler.rate_limiter._clock is not time.monotonic:
+            scheduler.rate_limiter = AnovaRateLimiter(clock=time.monotonic)
+        self.entries.append(entry)
+        return entry
+
+    def account(self, entry: MockConfigEntry) -> AnovaData:
+        """Return the runtime data of an account."""
+        return self.hass.data[DOMAIN][entry.entry_id]
+
+    def entity_id(self, device_key: str, key: str, domain: str = "sensor") -> str:
+        """Return the entity id of a cooker's entity."""
+        entity_id = er.async_get(self.hass).async_get_entity_id(
+            domain, DOMAIN, f"{device_key}_{key}"
+        )
+        assert entity_id is not None
+        return entity_id
+
+    async def async_advance(
+        self,
+        seconds: int,
+        on_second: Callable[[int], None] | None = None,
+        step: int = 1,
+    ) -> None:
+        """Move time on step seconds at a time, letting due polls finish.
+
+        Polls that fall due within a longer step go out at its end.
+        """
+        for second in range(0, seconds, step):
+            if on_second is not None:
+                on_second(second)
+            self.freezer.tick(timedelta(seconds=step))
+            async_fire_time_changed(self.hass)
+            await self.hass.async_block_till_done()
+
+    async def async_advance_until(
+        self, condition: Callable[[], bool], seconds: int = 300
+    ) -> int:
+        """Move time on until condition holds and return the seconds it took."""
+        for second in range(seconds):
+            if condition():
+                return second
+            await self.async_advance(1)
+        assert condition(), f"Not done after {seconds} s"
+        return seconds
+
+    async def async_measure(
+        self,
+        name: str,
+        device_count: int,
+        minutes: int,
+        on_second: Callable[[int], None] | None = None,
+        options: dict[str, Any] | None = None,
+        state: dict[str, Any] | None = None,
+    ) -> HarnessReport:
+        """Set up an account with device_count cookers and poll it for a while.
+
+        Setup time, CPU and state writes are measured on one account, polled
+        for the given minutes with on_second called every simulated second to
+        change the cloud. The cookers start in state, passed on to
+        anova_state. Memory is traced while a second account of the same size
+        is set up and first polled, on top of an account set up before so
+        imports and platforms aren't counted.
+        """
+        if not self.entries:
+            await self.async_add_account(self.cloud.add_devices(1, prefix="warmup"))
+            await self.async_advance(5)
+        state = state or {}
+        device_keys = self.cloud.add_devices(device_count, prefix=f"{name}-", **state)
+        entry = await self.async_add_account(device_keys, options)
+        setup_seconds = self.setup_seconds
+        await self.async_advance(5)
+        stats = self.account(entry).account_coordinator.stats
+        requests = self.cloud.requests.copy()
+        polls = stats.requests
+        state_writes = stats.state_writes
+        cpu = time.process_time()
+        await self.async_advance(minutes * 60, on_second)
+        cpu = time.process_time() - cpu
+        polls = stats.requests - polls
+        requests = self.cloud.requests - requests
+        device_keys = self.cloud.add_devices(
+            device_count, prefix=f"{name}-traced-", **state
+        )
+        tracemalloc.start()
+        start = tracemalloc.get_traced_memory()[0]
+        await self.async_add_account(device_keys, options)
+        await self.async_advance(5)
+        memory = tracemalloc.get_traced_memory()[0] - start
+        tracemalloc.stop()
+        report = HarnessReport(
+            name=name,
+            devices=device_count,
+            minutes=minutes,
+            setup_seconds=round(setup_seconds, 3),
+            poll_cpu_ms=round(cpu / max(polls, 1) * 1000, 3),
+            update_cpu_ms=round(
+                sum(stats.update_cpu_times)
+                / max(len(stats.update_cpu_times), 1)
+                * 1000,
+                3,
+            ),
+            memory_per_device_kib=round(memory / device_count / 1024, 1),
+            state_writes_per_minute=round(
+                (stats.state_writes - state_writes) / minutes, 1
+            ),
+            requests=dict(requests),
+        )
+        report.save()
+        return report
+
+    async def async_stop(self) -> None:
+        """Unload every account."""
+        for entry in self.entries:
+            await self.hass.config_entries.async_unload(entry.entry_id)
+        await self.hass.async_block_till_done()
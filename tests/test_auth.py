@@ -0,0 +1,172 @@
+"""Tests for token caching and logins."""
+import asyncio
+from datetime import timedelta
+from typing import Any
+from unittest.mock import AsyncMock
+from unittest.mock import patch
+
+import aiohttp
+import pytest
+from anova_wifi import AnovaException
+from custom_components.anova_sous_vide.auth import AnovaAuth
+from custom_components.anova_sous_vide.auth import STORAGE_VERSION
+from custom_components.anova_sous_vide.const import DOMAIN
+from custom_components.anova_sous_vide.const import TOKEN_REFRESH_RETRY_INTERVAL
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_PASSWORD
+from homeassistant.const import CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from .cloud import make_jwt
+
+
+class StubApi:
+    """Stands in for AnovaApi, counting logins."""
+
+    def __init__(self) -> None:
+        """Start logged out."""
+        self.jwt: str | None = None
+        self._firebase_jwt: str | None = None
+        self.logins = 0
+        self.error: Exception | None = None
+
+    async def authenticate(self) -> bool:
+        """Log in after a moment, or fail with the error set."""
+        self.logins += 1
+        await asyncio.sleep(0)
+        if self.error is not None:
+            raise self.error
+        # Distinct from the last token, also within the same second
+        self.jwt = make_jwt(lifetime=365 * 24 * 3600 + self.logins)
+        self._firebase_jwt = "firebase-token"
+        return True
+
+
+@pytest.fixture
+def entry(hass: HomeAssistant) -> MockConfigEntry:
+    """Return a config entry without a token."""
+    entry = MockConfigEntry(domain=DOMAIN, data={})
+    entry.add_to_hass(hass)
+    return entry
+
+
+@pytest.fixture
+def auth(hass: HomeAssistant, entry: MockConfigEntry) -> AnovaAuth:
+    """Return a token handler for a stubbed API."""
+    auth = AnovaAuth(hass, entry, StubApi())
+    yield auth
+    auth.async_stop()
+
+
+def _cache(hass_storage: dict[str, Any], entry: MockConfigEntry, jwt: str) -> None:
+    hass_storage[f"{DOMAIN}.{entry.entry_id}.auth"] = {
+        "version": STORAGE_VERSION,
+        "key": f"{DOMAIN}.{entry.entry_id}.auth",
+        "data": {"jwt": jwt},
+    }
+
+
+async def test_cached_token_is_reused(
+    hass_storage: dict[str, Any], entry: MockConfigEntry, auth: AnovaAuth
+) -> None:
+    """A cached token far from expiry saves the login."""
+    jwt = make_jwt()
+    _cache(hass_storage, entry, jwt)
+    await auth.async_setup()
+    assert auth.api.logins == 0
+    assert auth.jwt == jwt
+
+
+async def test_expiring_token_is_replaced(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    entry: MockConfigEntry,
+    auth: AnovaAuth,
+) -> None:
+    """A token about to expire is replaced and the new one cached."""
+    _cache(hass_storage, entry, make_jwt(lifetime=3600))
+    await auth.async_setup()
+    await hass.async_block_till_done()
+    assert auth.api.logins == 1
+    cached = hass_storage[f"{DOMAIN}.{entry.entry_id}.auth"]["data"]
+    assert cached["jwt"] == auth.jwt
+
+
+async def test_concurrent_logins_are_shared(auth: AnovaAuth) -> None:
+    """Callers that saw the same token rejected log in once between them."""
+    await auth.async_reauthenticate()
+    rejected = auth.jwt
+    jwts = await asyncio.gather(
+        *(auth.async_reauthenticate(rejected) for _ in range(5))
+    )
+    assert auth.api.logins == 2
+    assert set(jwts) == {auth.jwt}
+    assert auth.jwt != rejected
+
+
+async def test_rejected_command_is_retried_once(auth: AnovaAuth) -> None:
+    """A refused command logs in again and is sent once more."""
+    await auth.async_reauthenticate()
+    command = AsyncMock(side_effect=[Exception("Unauthorized"), "done"])
+    assert await auth.async_call(command, 55.0) == "done"
+    assert command.await_count == 2
+    assert auth.api.logins == 2
+    # Errors anova_wifi raises on purpose are not about the token
+    command = AsyncMock(side_effect=AnovaException("offline"))
+    with pytest.raises(AnovaException):
+        await auth.async_call(command)
+    assert auth.api.logins == 2
+
+
+@pytest.mark.parametrize(
+    "error",
+    [AnovaException("refused"), aiohttp.ClientError(), asyncio.TimeoutError()],
+)
+async def test_failed_refresh_is_retried(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    auth: AnovaAuth,
+    error: Exception,
+) -> None:
+    """A refresh that fails is retried with backoff until it goes through."""
+    await auth.async_reauthenticate()
+    auth.api.error = error
+    # As if the refresh timer ran out
+    auth.async_stop()
+    await auth._async_scheduled_refresh(dt_util.utcnow())
+    assert auth.api.logins == 2
+    for retry_in in (1, 2, 4):
+        freezer.tick(TOKEN_REFRESH_RETRY_INTERVAL * retry_in - timedelta(seconds=1))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+        logins = auth.api.logins
+        freezer.tick(timedelta(seconds=1))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+        assert auth.api.logins == logins + 1
+    auth.api.error = None
+    freezer.tick(TOKEN_REFRESH_RETRY_INTERVAL * 8)
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert auth._refresh_failures == 0
+    # The next refresh is scheduled ahead of the new token's expiry
+    assert auth._unsub_refresh is not None
+
+
+async def test_network_error_at_startup_retries_setup(hass: HomeAssistant) -> None:
+    """An unreachable cloud at startup retries setup instead of failing it."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_USERNAME: "user@example.com", CONF_PASSWORD: "password"},
+    )
+    entry.add_to_hass(hass)
+    with patch(
+        "custom_components.anova_sous_vide.auth.AnovaAuth.async_setup",
+        side_effect=aiohttp.ClientError,
+    ):
+        assert not await hass.config_entries.async_setup(entry.entry_id)
+    assert entry.state is ConfigEntryState.SETUP_RETRY
@@ -0,0 +1,112 @@
+"""Tests for the last known state of cookers kept across restarts."""
+from dataclasses import asdict
+from typing import Any
+from unittest.mock import patch
+
+from custom_components.anova_sous_vide.cache import AnovaStateCache
+from custom_components.anova_sous_vide.cache import STORAGE_VERSION
+from custom_components.anova_sous_vide.const import DEFAULT_IDLE_SCAN_INTERVAL
+from custom_components.anova_sous_vide.const import DOMAIN
+from custom_components.anova_sous_vide.const import STATE_SAVE_DELAY
+from custom_components.anova_sous_vide.util import build_apc_update
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from . import anova_state
+from .cloud import AnovaCloud
+from .harness import AnovaHarness
+
+ENTRY_ID = "account"
+STORAGE_KEY = f"{DOMAIN}.{ENTRY_ID}.state"
+
+
+async def test_entities_start_from_the_cache(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    anova_cloud: AnovaCloud,
+    harness: AnovaHarness,
+) -> None:
+    """Entities show the cached state until the first poll answers."""
+    (device_key,) = anova_cloud.add_devices(1, water_temperature=20.0)
+    cached = build_apc_update(anova_state(state="COOKING", water_temperature=55.5))
+    hass_storage[STORAGE_KEY] = {
+        "version": STORAGE_VERSION,
+        "key": STORAGE_KEY,
+        "data": {device_key: asdict(cached)},
+    }
+    await harness.async_add_account([device_key], entry_id=ENTRY_ID)
+    water = harness.entity_id(device_key, "water_temperature")
+    assert anova_cloud.requests["state"] == 0
+    assert hass.states.get(water).state == "55.5"
+    assert (
+        hass.states.get(harness.entity_id(device_key, "cooking", "binary_sensor")).state
+        == "on"
+    )
+    await harness.async_advance(2)
+    assert hass.states.get(water).state == "20.0"
+
+
+async def test_unchanged_polls_are_not_saved(
+    hass_storage: dict[str, Any], anova_cloud: AnovaCloud, harness: AnovaHarness
+) -> None:
+    """Only polls that change what entities show schedule a save."""
+    (device_key,) = anova_cloud.add_devices(1, water_temperature=20.0)
+    saves = []
+    delay_save = Store.async_delay_save
+
+    def _delay_save(store: Store, *args: Any) -> None:
+        if store.key == STORAGE_KEY:
+            saves.append(args)
+        delay_save(store, *args)
+
+    with patch.object(Store, "async_delay_save", _delay_save):
+        await harness.async_add_account([device_key], entry_id=ENTRY_ID)
+        await harness.async_advance(2)
+        assert len(saves) == 1
+        await harness.async_advance(STATE_SAVE_DELAY)
+        saved = hass_storage[STORAGE_KEY]["data"][device_key]
+        assert saved["sensor"]["water_temperature"] == 20.0
+        # Idle, polled every five minutes without anything changing
+        polls = anova_cloud.requests["state"]
+        await harness.async_advance(2 * DEFAULT_IDLE_SCAN_INTERVAL)
+        assert anova_cloud.requests["state"] > polls
+        assert len(saves) == 1
+        anova_cloud.states[device_key]["temperature-info"]["water-temperature"] = 21.0
+        await harness.async_advance(2 * DEFAULT_IDLE_SCAN_INTERVAL)
+    assert len(saves) == 2
+    saved = hass_storage[STORAGE_KEY]["data"][device_key]
+    assert saved["sensor"]["water_temperature"] == 21.0
+
+
+async def test_removed_entry_leaves_no_cache(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    anova_cloud: AnovaCloud,
+    harness: AnovaHarness,
+) -> None:
+    """A save pending when the entry is removed doesn't bring the cache back."""
+    entry = await harness.async_add_account(
+        anova_cloud.add_devices(1), entry_id=ENTRY_ID
+    )
+    await harness.async_advance(2)
+    assert STORAGE_KEY not in hass_storage
+    await hass.config_entries.async_remove(entry.entry_id)
+    await hass.async_block_till_done()
+    harness.entries.remove(entry)
+    await harness.async_advance(STATE_SAVE_DELAY + 1)
+    assert STORAGE_KEY not in hass_storage
+
+
+async def test_flush_writes_a_pending_save(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Unloading writes the cache right away instead of after the delay."""
+    cache = AnovaStateCache(hass, ENTRY_ID)
+    await cache.async_flush()
+    assert STORAGE_KEY not in hass_storage
+    cache.async_update("cooker", build_apc_update(anova_state()))
+    await cache.async_flush()
+    assert list(hass_storage[STORAGE_KEY]["data"]) == ["cooker"]
+    cache.async_remove("cooker")
+    await cache.async_flush()
+    assert hass_storage[STORAGE_KEY]["data"] == {}
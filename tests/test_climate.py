@@ -0,0 +1,129 @@
+"""Tests for the climate entity against a stubbed cooker."""
+from collections.abc import AsyncGenerator
+from collections.abc import Callable
+from datetime import timedelta
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from custom_components.anova_sous_vide.climate import AnovaSousVideClimateDevice
+from custom_components.anova_sous_vide.const import DOMAIN
+from custom_components.anova_sous_vide.const import SET_TEMPERATURE_DEBOUNCE
+from custom_components.anova_sous_vide.coordinator import AnovaCoordinator
+from homeassistant import config_entries
+from homeassistant.components.climate import HVACMode
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.common import MockEntityPlatform
+
+from . import StubCooker
+
+
+@pytest.fixture
+async def climate(
+    hass: HomeAssistant,
+) -> AsyncGenerator[tuple[AnovaSousVideClimateDevice, StubCooker], None]:
+    """Return a climate entity added to hass for a stubbed cooker."""
+    entry = MockConfigEntry(domain=DOMAIN, data={})
+    entry.add_to_hass(hass)
+    config_entries.current_entry.set(entry)
+    cooker = StubCooker("cooker")
+    coordinator = AnovaCoordinator(hass, cooker)
+    await coordinator.async_refresh()
+    auth = MagicMock()
+
+    async def _async_call(func: Callable[..., Any], *args: Any) -> Any:
+        return await func(*args)
+
+    auth.async_call = _async_call
+    entity = AnovaSousVideClimateDevice(coordinator, auth)
+    await MockEntityPlatform(hass).async_add_entities([entity])
+    yield entity, cooker
+    await entity.async_remove()
+
+
+async def _set_temperature(
+    hass: HomeAssistant, entity: AnovaSousVideClimateDevice, temperature: float
+) -> None:
+    await entity.async_set_temperature(temperature=temperature)
+    assert entity.target_temperature == temperature
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=SET_TEMPERATURE_DEBOUNCE + 1)
+    )
+    await hass.async_block_till_done()
+
+
+async def test_rounded_target_is_confirmed(
+    hass: HomeAssistant, climate: tuple[AnovaSousVideClimateDevice, StubCooker]
+) -> None:
+    """A target the cloud rounds still confirms the requested one."""
+    entity, cooker = climate
+    cooker.store_target = lambda target: round(target, 1)
+    await _set_temperature(hass, entity, 56.72)
+    assert entity._optimistic_target is None
+    assert entity.target_temperature == 56.7
+
+
+async def test_refused_target_shows_the_reported_one(
+    hass: HomeAssistant, climate: tuple[AnovaSousVideClimateDevice, StubCooker]
+) -> None:
+    """A target the cooker doesn't take isn't shown forever."""
+    entity, cooker = climate
+    cooker.store_target = lambda target: 55.0
+    await _set_temperature(hass, entity, 60.0)
+    assert entity._optimistic_target is None
+    assert entity.target_temperature == 55.0
+
+
+async def test_hvac_mode_is_confirmed(
+    hass: HomeAssistant, climate: tuple[AnovaSousVideClimateDevice, StubCooker]
+) -> None:
+    """The requested mode is shown until the cooker reports its own."""
+    entity, cooker = climate
+    await entity.async_set_hvac_mode(HVACMode.HEAT)
+    assert entity._optimistic_hvac_mode is None
+    assert hass.states.get(entity.entity_id).state == HVACMode.HEAT
+    # The cooker refuses to start, e.g. on low water
+    cooker.cook_state = ""
+    await entity.async_set_hvac_mode(HVACMode.OFF)
+    await entity.async_set_hvac_mode(HVACMode.HEAT)
+    assert entity._optimistic_hvac_mode is None
+    assert hass.states.get(entity.entity_id).state == HVACMode.OFF
+
+
+async def test_slider_drags_are_coalesced(
+    hass: HomeAssistant, climate: tuple[AnovaSousVideClimateDevice, StubCooker]
+) -> None:
+    """Targets set within the cooldown are sent once, the last one wins."""
+    entity, cooker = climate
+    sent: list[float] = []
+
+    async def _set_target_temperature(temperature: float) -> None:
+        sent.append(temperature)
+        cooker.state["job"]["target-temperature"] = temperature
+
+    cooker.set_target_temperature = _set_target_temperature
+    for temperature in (56.0, 57.0, 58.5):
+        await entity.async_set_temperature(temperature=temperature)
+        assert entity.target_temperature == temperature
+    assert sent == []
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=SET_TEMPERATURE_DEBOUNCE + 1)
+    )
+    await hass.async_block_till_done()
+    assert sent == [58.5]
+    assert entity._optimistic_target is None
+    assert entity.target_temperature == 58.5
+
+
+async def test_unsupported_hvac_mode(
+    climate: tuple[AnovaSousVideClimateDevice, StubCooker],
+) -> None:
+    """Modes the cooker doesn't have are refused."""
+    entity, _ = climate
+    with pytest.raises(ServiceValidationError):
+        await entity.async_set_hvac_mode(HVACMode.COOL)
+    assert entity._optimistic_hvac_mode is None
@@ -0,0 +1,74 @@
+"""Tests for local cook completion timing."""
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+from custom_components.anova_sous_vide.const import EVENT_COOK_COMPLETE
+from custom_components.anova_sous_vide.cook import AnovaCookSession
+from custom_components.anova_sous_vide.util import build_apc_update
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import async_capture_events
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from . import anova_state
+
+
+async def _advance(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, seconds: float
+) -> None:
+    freezer.tick(timedelta(seconds=seconds))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+
+async def test_cook_completes_once(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Polls lagging behind the end of a cook don't announce it again."""
+    events = async_capture_events(hass, EVENT_COOK_COMPLETE)
+    on_complete = MagicMock()
+    session = AnovaCookSession(hass, "cooker", on_complete)
+    session.async_update(
+        build_apc_update(anova_state(state="COOKING", cook_time_remaining=60))
+    )
+    cook_end = session.cook_end
+    await _advance(hass, freezer, 61)
+    assert len(events) == 1
+    assert events[0].data["cook_end"] == cook_end.isoformat()
+    assert on_complete.call_count == 1
+    assert session.cook_end is None
+    # The cloud still reports the last seconds of the cook
+    for remaining in (5, 3, 1):
+        session.async_update(
+            build_apc_update(
+                anova_state(state="COOKING", cook_time_remaining=remaining)
+            )
+        )
+        await _advance(hass, freezer, 10)
+        assert session.cook_end is None
+    session.async_update(build_apc_update(anova_state(state="COOKING")))
+    assert len(events) == 1
+    # The next cook is announced again once the cooker stopped in between
+    session.async_update(build_apc_update(anova_state(state="MAINTAINING")))
+    session.async_update(
+        build_apc_update(anova_state(state="COOKING", cook_time_remaining=30))
+    )
+    await _advance(hass, freezer, 31)
+    assert len(events) == 2
+    assert on_complete.call_count == 2
+    session.async_stop()
+
+
+async def test_cook_finished_between_polls(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """A poll seeing the cook done just before the timer announces it once."""
+    events = async_capture_events(hass, EVENT_COOK_COMPLETE)
+    session = AnovaCookSession(hass, "cooker", MagicMock())
+    session.async_update(
+        build_apc_update(anova_state(state="COOKING", cook_time_remaining=60))
+    )
+    await _advance(hass, freezer, 59)
+    session.async_update(build_apc_update(anova_state(state="MAINTAINING")))
+    await _advance(hass, freezer, 10)
+    assert len(events) == 1
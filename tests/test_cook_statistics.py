@@ -0,0 +1,108 @@
+"""Tests for the per cook summaries imported as long term statistics."""
+from datetime import datetime
+from datetime import timedelta
+from typing import Any
+
+import pytest
+from custom_components.anova_sous_vide.cook_statistics import _CookSummary
+from custom_components.anova_sous_vide.cook_statistics import AnovaCookStatistics
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder import Recorder
+from homeassistant.components.recorder.statistics import statistics_during_period
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+)
+
+HOUR = datetime(2024, 1, 1, 10, tzinfo=dt_util.UTC)
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(recorder_db_url: str) -> None:
+    """Prepare the database before hass starts, the integration isn't loaded."""
+
+
+def _summary(
+    start: datetime, *samples: tuple[float, float], end: float
+) -> _CookSummary:
+    """Return the summary of a cook at a 50 °C target.
+
+    Samples are minutes into the cook and the water temperature, the cook
+    stops end minutes in.
+    """
+    summary = _CookSummary(start)
+    for minutes, temperature in samples:
+        summary.add(start + timedelta(minutes=minutes), temperature, 50.0)
+    summary.advance(start + timedelta(minutes=end))
+    return summary
+
+
+async def _rows(
+    hass: HomeAssistant, statistics: AnovaCookStatistics
+) -> dict[str, list[dict[str, Any]]]:
+    """Return the hourly rows of both statistics."""
+    await async_wait_recording_done(hass)
+    return await get_instance(hass).async_add_executor_job(
+        statistics_during_period,
+        hass,
+        HOUR - timedelta(hours=1),
+        None,
+        {statistics.temperature_statistic_id, statistics.on_target_statistic_id},
+        "hour",
+        None,
+        {"mean", "min", "max", "state", "sum"},
+    )
+
+
+async def test_cooks_in_the_same_hour_are_merged(
+    recorder_mock: Recorder, hass: HomeAssistant
+) -> None:
+    """A second cook in the hour merges into its row instead of replacing it."""
+    statistics = AnovaCookStatistics(hass, "cooker")
+    # On target for 20 minutes, then 10 minutes at 54 °C
+    await statistics._async_import(
+        _summary(HOUR + timedelta(minutes=5), (0, 50.0), (20, 54.0), end=30)
+    )
+    await async_wait_recording_done(hass)
+    await statistics._async_import(
+        _summary(HOUR + timedelta(minutes=40), (0, 50.0), end=10)
+    )
+    rows = await _rows(hass, statistics)
+    (temperature,) = rows[statistics.temperature_statistic_id]
+    assert temperature["start"] == HOUR.timestamp()
+    # 30 minutes averaging 51.33 °C and 10 minutes at 50 °C
+    assert temperature["mean"] == pytest.approx(51.0, abs=0.01)
+    assert (temperature["min"], temperature["max"]) == (50.0, 54.0)
+    (on_target,) = rows[statistics.on_target_statistic_id]
+    assert (on_target["state"], on_target["sum"]) == (30.0, 30.0)
+
+
+async def test_on_target_sum_runs_across_hours(
+    recorder_mock: Recorder, hass: HomeAssistant
+) -> None:
+    """Each hour adds its time on target to the running sum."""
+    statistics = AnovaCookStatistics(hass, "cooker")
+    await statistics._async_import(
+        _summary(HOUR + timedelta(minutes=5), (0, 50.0), end=20)
+    )
+    await async_wait_recording_done(hass)
+    await statistics._async_import(
+        _summary(HOUR + timedelta(minutes=30), (0, 50.0), end=10)
+    )
+    await async_wait_recording_done(hass)
+    await statistics._async_import(
+        _summary(HOUR + timedelta(hours=1, minutes=10), (0, 50.0), (5, 49.0), end=15)
+    )
+    rows = await _rows(hass, statistics)
+    assert [
+        (row["start"], row["state"], row["sum"])
+        for row in rows[statistics.on_target_statistic_id]
+    ] == [
+        (HOUR.timestamp(), 30.0, 30.0),
+        ((HOUR + timedelta(hours=1)).timestamp(), 5.0, 35.0),
+    ]
+    assert [
+        (row["mean"], row["min"], row["max"])
+        for row in rows[statistics.temperature_statistic_id]
+    ] == [(50.0, 50.0, 50.0), (pytest.approx(49.33, abs=0.01), 49.0, 50.0)]
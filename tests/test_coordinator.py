@@ -0,0 +1,135 @@
+"""Tests for the Anova coordinator."""
+import asyncio
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+
+import aiohttp
+import pytest
+from anova_wifi import APCUpdate
+from custom_components.anova_sous_vide.const import DOMAIN
+from custom_components.anova_sous_vide.coordinator import AnovaCoordinator
+from custom_components.anova_sous_vide.snapshot import SNAPSHOT_INDEX
+from homeassistant import config_entries
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from . import StubCooker
+
+
+def _coordinator(hass: HomeAssistant, update: AsyncMock) -> AnovaCoordinator:
+    entry = MockConfigEntry(domain=DOMAIN, data={})
+    entry.add_to_hass(hass)
+    config_entries.current_entry.set(entry)
+    device = MagicMock(device_key="cooker", update=update)
+    return AnovaCoordinator(hass, device)
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        aiohttp.ContentTypeError(MagicMock(), ()),
+        aiohttp.ServerDisconnectedError(),
+        AttributeError("'NoneType' object has no attribute 'keys'"),
+    ],
+)
+async def test_unexpected_errors_count_as_failures(
+    hass: HomeAssistant, error: Exception
+) -> None:
+    """Errors other than AnovaOffline back off instead of polling every tick."""
+    coordinator = _coordinator(hass, AsyncMock(side_effect=error))
+    await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+    assert coordinator.next_update > dt_util.utcnow()
+    assert coordinator.breaker.failures == 1
+    assert coordinator.stats.errors == 1
+
+
+class GatedCooker(StubCooker):
+    """A cooker whose updates wait until the gate opens."""
+
+    def __init__(self, error: Exception | None = None) -> None:
+        """Start with the gate closed."""
+        super().__init__("cooker")
+        self.gate = asyncio.Event()
+        self.error = error
+        self.calls = 0
+
+    async def update(self) -> APCUpdate:
+        """Return the state, or fail, once the gate opens."""
+        self.calls += 1
+        await self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        return await super().update()
+
+
+async def test_overlapping_refreshes_share_a_poll(hass: HomeAssistant) -> None:
+    """Refreshes while a poll is in flight wait for it instead of polling."""
+    cooker = GatedCooker()
+    coordinator = _coordinator(hass, cooker.update)
+    first = hass.async_create_task(coordinator._async_update_data())
+    second = hass.async_create_task(coordinator._async_update_data())
+    await asyncio.sleep(0)
+    cooker.gate.set()
+    assert await first is await second
+    assert cooker.calls == 1
+
+
+async def test_overlapping_refreshes_share_an_error(hass: HomeAssistant) -> None:
+    """Every caller waiting on a failed poll sees its error."""
+    cooker = GatedCooker(aiohttp.ServerDisconnectedError())
+    coordinator = _coordinator(hass, cooker.update)
+    first = hass.async_create_task(coordinator._async_update_data())
+    second = hass.async_create_task(coordinator._async_update_data())
+    await asyncio.sleep(0)
+    cooker.gate.set()
+    errors = await asyncio.gather(first, second, return_exceptions=True)
+    assert all(isinstance(error, UpdateFailed) for error in errors)
+    assert errors[0] is errors[1]
+    assert cooker.calls == 1
+    assert coordinator.breaker.failures == 1
+
+
+async def test_cancelled_waiter_keeps_the_poll(hass: HomeAssistant) -> None:
+    """Cancelling one caller doesn't cancel the poll the others wait on."""
+    cooker = GatedCooker()
+    coordinator = _coordinator(hass, cooker.update)
+    first = hass.async_create_task(coordinator._async_update_data())
+    second = hass.async_create_task(coordinator._async_update_data())
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    assert first.cancelled()
+    assert not coordinator._update_task.done()
+    cooker.gate.set()
+    data = await second
+    assert data.sensor.water_temperature == 20.0
+    assert cooker.calls == 1
+
+
+@pytest.mark.parametrize(
+    ("key", "first", "small", "large"),
+    [
+        ("water_temperature", 40.0, 40.05, 40.15),
+        ("heating_rate", 0.5, 0.51, 0.53),
+    ],
+)
+async def test_deadbands(
+    hass: HomeAssistant, key: str, first: float, small: float, large: float
+) -> None:
+    """Changes within a field's deadband don't notify its entities."""
+    coordinator = _coordinator(hass, StubCooker("cooker").update)
+    await coordinator.async_refresh()
+    index = SNAPSHOT_INDEX[key]
+
+    def _changed(value: float) -> set[int] | None:
+        snapshot = list(coordinator.snapshot)
+        snapshot[index] = value
+        coordinator.snapshot = tuple(snapshot)
+        return coordinator._async_changed_indices()
+
+    _changed(first)
+    assert _changed(small) == set()
+    assert _changed(large) == {index}
@@ -0,0 +1,30 @@
+"""Tests for the diagnostics of an account."""
+import json
+
+from custom_components.anova_sous_vide.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from homeassistant.components.diagnostics import REDACTED
+from homeassistant.core import HomeAssistant
+
+from .harness import AnovaHarness
+
+
+async def test_diagnostics_are_redacted(
+    hass: HomeAssistant, harness: AnovaHarness
+) -> None:
+    """Nothing that logs in or reads a cooker ends up in diagnostics."""
+    device_keys = harness.cloud.add_devices(2)
+    entry = await harness.async_add_account(device_keys)
+    await harness.async_advance(5)
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    data = diagnostics["entry"]["data"]
+    for key in ("username", "password", "jwt", "devices"):
+        assert data[key] == REDACTED
+    cookers = diagnostics["cookers"]
+    assert [cooker["device_key"] for cooker in cookers] == [REDACTED, REDACTED]
+    assert all(cooker["last_update_success"] for cooker in cookers)
+    assert cookers[0]["data"]["sensor"]["water_temperature"] == 20.0
+    dumped = json.dumps(diagnostics, default=str)
+    for secret in (*device_keys, entry.data["username"], entry.data["jwt"]):
+        assert secret not in dumped
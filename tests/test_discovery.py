@@ -0,0 +1,153 @@
+"""Tests for the background discovery of cookers."""
+from datetime import timedelta
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+
+from anova_wifi import AnovaPrecisionCooker
+from custom_components.anova_sous_vide import async_remove_config_entry_device
+from custom_components.anova_sous_vide.const import DISCOVERY_INTERVAL
+from custom_components.anova_sous_vide.const import DISCOVERY_STARTUP_DELAY
+from custom_components.anova_sous_vide.const import DOMAIN
+from custom_components.anova_sous_vide.const import MAX_REQUEST_BURST
+from custom_components.anova_sous_vide.discovery import AnovaDeviceDiscovery
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from .cloud import AnovaCloud
+from .cloud import DEVICE_TYPE
+from .harness import AnovaHarness
+
+
+def _discovery(
+    hass: HomeAssistant, discovered_at: str | None
+) -> tuple[AnovaDeviceDiscovery, MagicMock]:
+    data = {"devices": []}
+    if discovered_at is not None:
+        data["discovered_at"] = discovered_at
+    entry = MockConfigEntry(domain=DOMAIN, data=data)
+    entry.add_to_hass(hass)
+    anova_data = MagicMock(precision_cookers=[], coordinators=[])
+    auth = anova_data.auth
+    auth.async_ensure_firebase_token = AsyncMock()
+    auth.api.get_devices = AsyncMock(return_value=[])
+    return AnovaDeviceDiscovery(hass, entry, anova_data), auth
+
+
+async def _advance(hass: HomeAssistant, delta: timedelta) -> None:
+    async_fire_time_changed(hass, dt_util.utcnow() + delta)
+    await hass.async_block_till_done()
+
+
+async def test_fresh_device_list_skips_login_on_restart(hass: HomeAssistant) -> None:
+    """A restart shortly after discovery doesn't log in to discover again."""
+    discovered_at = dt_util.utcnow() - timedelta(minutes=10)
+    discovery, auth = _discovery(hass, discovered_at.isoformat())
+    discovery.async_start()
+    await _advance(hass, DISCOVERY_STARTUP_DELAY + timedelta(seconds=1))
+    auth.async_ensure_firebase_token.assert_not_called()
+    await _advance(hass, DISCOVERY_INTERVAL - timedelta(minutes=10))
+    auth.async_ensure_firebase_token.assert_called_once()
+    assert dt_util.parse_datetime(discovery.entry.data["discovered_at"]) > (
+        discovered_at
+    )
+    discovery.async_stop()
+
+
+async def test_stale_device_list_discovers_after_startup(hass: HomeAssistant) -> None:
+    """Without a recent discovery, devices are discovered after a delay."""
+    discovery, auth = _discovery(hass, None)
+    discovery.async_start()
+    await _advance(hass, timedelta(seconds=1))
+    auth.async_ensure_firebase_token.assert_not_called()
+    await _advance(hass, DISCOVERY_STARTUP_DELAY + timedelta(seconds=1))
+    auth.async_ensure_firebase_token.assert_called_once()
+    discovery.async_stop()
+    await _advance(hass, DISCOVERY_STARTUP_DELAY + DISCOVERY_INTERVAL)
+    auth.async_ensure_firebase_token.assert_called_once()
+
+
+async def test_missing_cooker_is_kept(hass: HomeAssistant) -> None:
+    """A cooker that is offline during a scan stays set up."""
+    discovery, auth = _discovery(hass, None)
+    cooker = MagicMock(device_key="offline", type="a1")
+    discovery.anova_data.precision_cookers.append(cooker)
+    discovery.anova_data.coordinators.append(MagicMock(anova_device=cooker))
+    await discovery._async_discover()
+    assert discovery.anova_data.precision_cookers == [cooker]
+    assert discovery.entry.data["devices"] == [("offline", "a1")]
+
+
+async def test_closed_websocket_is_handled(hass: HomeAssistant) -> None:
+    """anova_wifi fails to decode the close frame when the cloud hangs up."""
+    discovery, auth = _discovery(hass, None)
+    auth.api.get_devices.side_effect = TypeError(
+        "the JSON object must be str, bytes or bytearray, not NoneType"
+    )
+    await discovery._async_discover()
+    assert "discovered_at" not in discovery.entry.data
+    assert auth.api.existing_devices is discovery.anova_data.precision_cookers
+
+
+async def test_remove_config_entry_device(hass: HomeAssistant) -> None:
+    """Only cookers that stopped answering can be removed by the user."""
+    discovery, _ = _discovery(hass, None)
+    entry = discovery.entry
+    anova_data = discovery.anova_data
+    hass.data[DOMAIN] = {entry.entry_id: anova_data}
+    for device_key, online in (("online", True), ("gone", False)):
+        cooker = MagicMock(device_key=device_key, type="a1")
+        anova_data.precision_cookers.append(cooker)
+        anova_data.coordinators.append(
+            MagicMock(anova_device=cooker, last_update_success=online)
+        )
+    device_registry = dr.async_get(hass)
+
+    def _device(identifier: str) -> dr.DeviceEntry:
+        return device_registry.async_get_or_create(
+            config_entry_id=entry.entry_id, identifiers={(DOMAIN, identifier)}
+        )
+
+    assert not await async_remove_config_entry_device(
+        hass, entry, _device(entry.entry_id)
+    )
+    assert not await async_remove_config_entry_device(hass, entry, _device("online"))
+    assert await async_remove_config_entry_device(hass, entry, _device("gone"))
+    assert [cooker.device_key for cooker in anova_data.precision_cookers] == ["online"]
+    assert [key for key, _ in entry.data["devices"]] == ["online"]
+    anova_data.state_cache.async_remove.assert_called_once_with("gone")
+
+
+async def test_new_cookers_are_polled_within_the_budget(
+    hass: HomeAssistant, anova_cloud: AnovaCloud, harness: AnovaHarness
+) -> None:
+    """Cookers found by a scan are polled by the scheduler, not all at once."""
+    entry = await harness.async_add_account(anova_cloud.add_devices(1))
+    await harness.async_advance(2)
+    anova_data = harness.account(entry)
+    api = anova_data.auth.api
+    new_keys = anova_cloud.add_devices(12, prefix="new")
+    api.get_devices = AsyncMock(
+        return_value=[
+            AnovaPrecisionCooker(api.session, device_key, DEVICE_TYPE, api.jwt)
+            for device_key in new_keys
+        ]
+    )
+    anova_cloud.max_in_flight = 0
+    polls = anova_cloud.requests["state"]
+    discovery = AnovaDeviceDiscovery(hass, entry, anova_data)
+    await discovery._async_discover()
+    await hass.async_block_till_done()
+    # Entities come up unavailable and wait for the scheduler
+    assert anova_cloud.requests["state"] == polls
+    assert hass.states.get(harness.entity_id(new_keys[0], "water_temperature"))
+    await harness.async_advance(1)
+    assert anova_cloud.requests["state"] - polls <= MAX_REQUEST_BURST
+    coordinators = anova_data.coordinators
+    await harness.async_advance_until(
+        lambda: all(coordinator.data is not None for coordinator in coordinators)
+    )
+    assert anova_cloud.max_in_flight <= MAX_REQUEST_BURST
+    assert [key for key, _ in entry.data["devices"]][1:] == new_keys
@@ -0,0 +1,183 @@
+"""Per update cost of the account wide aggregates."""
+import heapq
+from collections import Counter
+from datetime import datetime
+from datetime import timedelta
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+from custom_components.anova_sous_vide.const import DOMAIN
+from custom_components.anova_sous_vide.coordinator import AnovaCoordinator
+from custom_components.anova_sous_vide.fleet import AnovaFleet
+from custom_components.anova_sous_vide.snapshot import SNAPSHOT_INDEX
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant import config_entries
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from . import anova_state
+from . import StubCooker
+
+UPDATES = 5000
+_COOKING = SNAPSHOT_INDEX["cooking"]
+_COOK_END = SNAPSHOT_INDEX["cook_end"]
+
+
+class CountingContributions(dict):
+    """Counts the contributions the fleet looks up, stores and copies."""
+
+    def __init__(self, *args: Any, counts: Counter[str]) -> None:
+        """Start counting into counts."""
+        super().__init__(*args)
+        self.counts = counts
+
+    def get(self, *args: Any) -> Any:
+        """Count a lookup."""
+        self.counts["lookup"] += 1
+        return super().get(*args)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        """Count a store."""
+        self.counts["store"] += 1
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        """Count a removal."""
+        self.counts["store"] += 1
+        super().__delitem__(key)
+
+    def items(self) -> Any:
+        """Count every contribution copied when the heap is rebuilt."""
+        self.counts["rebuilt"] += len(self)
+        return super().items()
+
+
+def _counting_heapq(counts: Counter[str]) -> SimpleNamespace:
+    """Return heapq with pushes and pops counted."""
+
+    def _heappush(heap: list, item: Any) -> None:
+        counts["push"] += 1
+        heapq.heappush(heap, item)
+
+    def _heappop(heap: list) -> Any:
+        counts["pop"] += 1
+        return heapq.heappop(heap)
+
+    return SimpleNamespace(heappush=_heappush, heappop=_heappop, heapify=heapq.heapify)
+
+
+async def _coordinators(
+    hass: HomeAssistant, cookers: int, **state: Any
+) -> list[AnovaCoordinator]:
+    """Return coordinators that have polled stubbed cookers, idle by default."""
+    entry = MockConfigEntry(domain=DOMAIN, data={})
+    entry.add_to_hass(hass)
+    config_entries.current_entry.set(entry)
+    coordinators = [
+        AnovaCoordinator(hass, StubCooker(f"cooker-{index}", **state))
+        for index in range(cookers)
+    ]
+    for coordinator in coordinators:
+        await coordinator.async_refresh()
+    return coordinators
+
+
+def _set_snapshot(
+    coordinator: AnovaCoordinator, cooking: bool, cook_end: datetime | None
+) -> None:
+    snapshot = list(coordinator.snapshot)
+    snapshot[_COOKING] = cooking
+    snapshot[_COOK_END] = cook_end
+    coordinator.snapshot = tuple(snapshot)
+
+
+def _update(
+    coordinators: list[AnovaCoordinator], start: datetime, counts: Counter[str]
+) -> Counter[str]:
+    """Return the fleet operations counted over UPDATES updates.
+
+    Every update starts or stops a cook, so each one changes the aggregates.
+    """
+    counts.clear()
+    for update in range(UPDATES):
+        coordinator = coordinators[update % len(coordinators)]
+        cooking = not coordinator.snapshot[_COOKING]
+        cook_end = start + timedelta(minutes=update) if cooking else None
+        _set_snapshot(coordinator, cooking, cook_end)
+        coordinator.async_update_listeners()
+    return counts.copy()
+
+
+async def test_update_cost_is_constant(hass: HomeAssistant, record_property) -> None:
+    """An update does the same work with 100 cookers as with 10."""
+    start = dt_util.utcnow()
+    counts: Counter[str] = Counter()
+    operations = {}
+    for cookers in (10, 100):
+        coordinators = await _coordinators(hass, cookers)
+        fleet = AnovaFleet(f"account-{cookers}")
+        notified = []
+        fleet.async_add_listener(lambda: notified.append(None))
+        for coordinator in coordinators:
+            fleet.async_add_coordinator(coordinator)
+        fleet._contributions = CountingContributions(
+            fleet._contributions, counts=counts
+        )
+        with patch(
+            "custom_components.anova_sous_vide.fleet.heapq", _counting_heapq(counts)
+        ):
+            operations[cookers] = _update(coordinators, start, counts)
+            # The running totals agree with counting every cooker again
+            snapshots = [coordinator.snapshot for coordinator in coordinators]
+            assert fleet.cooking == sum(bool(s[_COOKING]) for s in snapshots)
+            assert fleet.next_cook_end == min(
+                (s[_COOK_END] for s in snapshots if s[_COOK_END] is not None),
+                default=None,
+            )
+        assert len(notified) == UPDATES
+        fleet.async_stop()
+        for name, count in operations[cookers].items():
+            record_property(f"{name}_per_update_{cookers}", count / UPDATES)
+    # One lookup and one store of the cooker that updated, and a push for
+    # every cook that starts, however many cookers there are
+    for name in ("lookup", "store", "push"):
+        assert operations[10][name] == operations[100][name]
+    assert operations[10]["lookup"] == operations[10]["store"] == UPDATES
+    assert operations[10]["push"] == UPDATES // 2
+    # Pushed entries leave the heap once, popped or dropped by a rebuild,
+    # where a recount would go over every cooker on every update
+    for cookers in (10, 100):
+        assert (
+            operations[cookers]["pop"] + operations[cookers]["rebuilt"]
+            <= operations[cookers]["push"] + cookers
+        )
+
+
+async def test_finished_cooks_leave_no_cook_end(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """The next cook end moves on once a cook finishes, before the next poll."""
+    first, second = await _coordinators(
+        hass, 2, state="COOKING", cook_time_remaining=60
+    )
+    second.anova_device.state = anova_state(state="COOKING", cook_time_remaining=600)
+    await second.async_refresh()
+    fleet = AnovaFleet("account")
+    for coordinator in (first, second):
+        fleet.async_add_coordinator(coordinator)
+    assert fleet.next_cook_end == first.cook_session.cook_end
+    freezer.tick(timedelta(seconds=61))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert first.snapshot[_COOK_END] is None
+    assert fleet.next_cook_end == second.cook_session.cook_end
+    assert fleet.next_cook_end > dt_util.utcnow()
+    freezer.tick(timedelta(seconds=540))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert fleet.next_cook_end is None
+    assert fleet.cooking == 2
+    fleet.async_stop()
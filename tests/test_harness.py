@@ -0,0 +1,229 @@
+"""End to end runs of the integration against the local cloud."""
+import random
+from collections import Counter
+
+import pytest
+from custom_components.anova_sous_vide.const import MAX_REQUEST_BURST
+from custom_components.anova_sous_vide.const import MAX_REQUESTS_PER_SECOND
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import async_capture_events
+
+from .cloud import AnovaCloud
+from .harness import AnovaHarness
+from .harness import perf_counter
+
+# Cooking with hours left, polled at the regular interval
+COOKING = {"state": "COOKING", "mode": "COOK", "cook_time_remaining": 4 * 3600}
+# Seconds the cloud takes to answer a state request in the scaling runs
+LATENCY = 0.1
+
+
+async def test_setup_entry_to_sensor(
+    hass: HomeAssistant, anova_cloud: AnovaCloud, harness: AnovaHarness
+) -> None:
+    """Cloud states reach the sensors through setup, scheduler and coordinator."""
+    device_keys = anova_cloud.add_devices(2, **COOKING, water_temperature=40.0)
+    await harness.async_add_account(device_keys)
+    await harness.async_advance(2)
+    water = [harness.entity_id(key, "water_temperature") for key in device_keys]
+    assert [hass.states.get(entity_id).state for entity_id in water] == [
+        "40.0",
+        "40.0",
+    ]
+    assert anova_cloud.requests["state"] == 2
+    assert anova_cloud.requests["authenticate"] == 0
+    anova_cloud.states[device_keys[0]]["temperature-info"]["water-temperature"] = 41.5
+    # Cookers poll every 30 s at their own phase, the first one may come
+    # sooner or later
+    await harness.async_advance(45)
+    assert hass.states.get(water[0]).state == "41.5"
+    assert hass.states.get(water[1]).state == "40.0"
+    assert 4 <= anova_cloud.requests["state"] <= 6
+
+
+async def test_offline_cooker_is_unavailable(
+    hass: HomeAssistant, anova_cloud: AnovaCloud, harness: AnovaHarness
+) -> None:
+    """A cooker the cloud has no state for doesn't hold up the others."""
+    device_keys = anova_cloud.add_devices(2)
+    anova_cloud.offline.add(device_keys[1])
+    await harness.async_add_account(device_keys)
+    await harness.async_advance(2)
+    states = [
+        hass.states.get(harness.entity_id(key, "water_temperature")).state
+        for key in device_keys
+    ]
+    assert states == ["20.0", "unavailable"]
+
+
+async def test_regression_numbers(
+    anova_cloud: AnovaCloud, harness: AnovaHarness, record_property
+) -> None:
+    """Report the numbers performance changes are measured by.
+
+    Twenty cooking cookers heat up by 0.5 °C a minute while the cloud answers one
+    state request in twenty with an error and another as offline.
+    """
+    anova_cloud.error_rate = 0.05
+    anova_cloud.offline_rate = 0.05
+
+    def _heat(second: int) -> None:
+        if second % 60:
+            return
+        for state in anova_cloud.states.values():
+            state["temperature-info"]["water-temperature"] += 0.5
+
+    report = await harness.async_measure("regression", 20, 10, _heat, state=COOKING)
+    for key, value in vars(report).items():
+        record_property(key, value)
+    # Timings are only reported, they depend on the machine running the tests.
+    # Budgets with headroom, a failure here means a change made things worse
+    assert report.memory_per_device_kib < 512
+    # Each cooker is polled every 30 s, failures back off, the token is reused
+    assert 20 * 2 * 10 * 0.75 <= report.requests["state"] <= 20 * 2 * 10 + 20
+    assert "authenticate" not in report.requests
+    # Mostly the water temperature, what is derived from it and the request
+    # stats, failed polls make every entity of a cooker unavailable
+    assert report.state_writes_per_minute <= 400
+
+
+@pytest.mark.parametrize("device_count", [1, 10, 50])
+async def test_first_poll_scaling(
+    anova_cloud: AnovaCloud,
+    harness: AnovaHarness,
+    device_count: int,
+    record_property,
+) -> None:
+    """Report requests and wall clock time until every cooker has answered.
+
+    The cloud takes LATENCY seconds per state request. The scheduler starts the
+    polls that fit the request budget each second and they wait on the cloud
+    together, so the wall clock time grows with the seconds the budget needs
+    rather than with the cookers.
+    """
+    device_keys = anova_cloud.add_devices(device_count)
+    for device_key in device_keys:
+        anova_cloud.latency[device_key] = LATENCY
+    start = perf_counter()
+    entry = await harness.async_add_account(device_keys)
+    coordinators = harness.account(entry).coordinators
+    seconds = await harness.async_advance_until(
+        lambda: all(coordinator.data is not None for coordinator in coordinators)
+    )
+    wall_seconds = perf_counter() - start
+    record_property("requests", dict(anova_cloud.requests))
+    record_property("wall_seconds", round(wall_seconds, 3))
+    record_property("simulated_seconds", seconds)
+    # One request per cooker, the cached token saves logging in
+    assert anova_cloud.requests == {"state": device_count}
+    # The first polls go out together, up to the burst the budget allows
+    assert anova_cloud.max_in_flight == min(device_count, MAX_REQUEST_BURST)
+    # and the rest at the steady rate
+    assert seconds <= 2 + max(device_count - MAX_REQUEST_BURST, 0) / (
+        MAX_REQUESTS_PER_SECOND
+    )
+
+
+async def test_startup_with_slow_and_offline_cookers(
+    hass: HomeAssistant,
+    anova_cloud: AnovaCloud,
+    harness: AnovaHarness,
+    record_property,
+) -> None:
+    """Report how long setup and the first answers take when cookers lag.
+
+    Three cookers take a second to answer and three are offline, listed before
+    the four that answer right away.
+    """
+    slow = anova_cloud.add_devices(3, prefix="slow")
+    offline = anova_cloud.add_devices(3, prefix="offline")
+    online = anova_cloud.add_devices(4, prefix="online")
+    for device_key in slow:
+        anova_cloud.latency[device_key] = 1.0
+    anova_cloud.offline.update(offline)
+    start = perf_counter()
+    entry = await harness.async_add_account(slow + offline + online)
+    # Setup doesn't wait on the cloud, entities start out unavailable
+    assert anova_cloud.requests["state"] == 0
+    coordinators = {
+        coordinator.anova_device.device_key: coordinator
+        for coordinator in harness.account(entry).coordinators
+    }
+    seconds = await harness.async_advance_until(
+        lambda: all(coordinators[key].data is not None for key in online + slow)
+    )
+    wall_seconds = perf_counter() - start
+    record_property("setup_seconds", round(harness.setup_seconds, 3))
+    record_property("wall_seconds", round(wall_seconds, 3))
+    record_property("simulated_seconds", seconds)
+    # Ten first polls at the request budget
+    assert seconds <= 4
+    for device_key in offline:
+        assert (
+            hass.states.get(harness.entity_id(device_key, "water_temperature")).state
+            == "unavailable"
+        )
+        assert "sw_version" not in coordinators[device_key].device_info
+    for device_key in online + slow:
+        assert (
+            hass.states.get(harness.entity_id(device_key, "water_temperature")).state
+            == "20.0"
+        )
+        assert coordinators[device_key].device_info["sw_version"] == "2.2.0"
+
+
+async def test_state_writes_over_a_cook(
+    hass: HomeAssistant,
+    anova_cloud: AnovaCloud,
+    harness: AnovaHarness,
+    record_property,
+) -> None:
+    """Report the state writes of a simulated four hour cook.
+
+    The water heats from 20 °C by 1 °C a minute and then holds 60 °C, with
+    readings jittering by up to 0.04 °C, while the timer counts down.
+    """
+    cook_seconds = 4 * 3600
+    (device_key,) = anova_cloud.add_devices(
+        1,
+        state="COOKING",
+        mode="COOK",
+        target_temperature=60.0,
+        cook_time=cook_seconds,
+        cook_time_remaining=cook_seconds,
+    )
+    state = anova_cloud.states[device_key]
+    jitter = random.Random(0)
+    entry = await harness.async_add_account([device_key])
+    await harness.async_advance(2)
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+
+    def _cook(second: int) -> None:
+        remaining = cook_seconds - second
+        state["job-status"]["cook-time-remaining"] = remaining
+        if not remaining:
+            state["job-status"]["state"] = ""
+            state["job"]["mode"] = "IDLE"
+        water = min(20.0 + second / 60, 60.0) + jitter.uniform(-0.04, 0.04)
+        state["temperature-info"]["water-temperature"] = round(water, 2)
+        state["temperature-info"]["heater-temperature"] = round(water + 1, 2)
+
+    await harness.async_advance(cook_seconds + 60, _cook, step=5)
+    polls = anova_cloud.requests["state"]
+    entities = [
+        registry_entry
+        for registry_entry in er.async_entries_for_config_entry(
+            er.async_get(hass), entry.entry_id
+        )
+        if not registry_entry.disabled_by
+    ]
+    writes = Counter(event.data["entity_id"] for event in events)
+    record_property("state_writes", writes.total())
+    record_property("state_writes_by_entity", dict(writes.most_common()))
+    record_property("polls", polls)
+    # The timer and the temperatures while heating, not every entity each poll
+    assert writes.total() < polls * len(entities) / 8
+    # One write a poll while heating, the jitter while holding writes nothing
+    assert writes[harness.entity_id(device_key, "water_temperature")] <= 2 * 40 + 1
@@ -0,0 +1,74 @@
+"""Tests for the sample history of a cooker."""
+from custom_components.anova_sous_vide.history import AnovaSampleHistory
+from custom_components.anova_sous_vide.util import build_apc_update
+
+from . import anova_state
+
+
+def _append(
+    history: AnovaSampleHistory, timestamp: float, water: float, state: str = "COOKING"
+) -> None:
+    history.append(
+        timestamp, build_apc_update(anova_state(state=state, water_temperature=water))
+    )
+
+
+def test_too_few_samples() -> None:
+    """Nothing is estimated from less than two samples."""
+    history = AnovaSampleHistory()
+    assert history.heating_rate is None
+    assert history.time_to_target(55.0) is None
+    _append(history, 0, 40.0)
+    assert history.heating_rate is None
+    assert history.time_to_target(55.0) is None
+    # Two samples at the same time have no slope either
+    _append(history, 0, 41.0)
+    assert history.heating_rate is None
+
+
+def test_flat_slope() -> None:
+    """Water that holds its temperature never reaches another target."""
+    history = AnovaSampleHistory()
+    for second in range(0, 60, 10):
+        _append(history, second, 40.0)
+    assert history.heating_rate == 0
+    assert history.time_to_target(55.0) is None
+    assert history.time_to_target(40.0) is None
+
+
+def test_time_to_target() -> None:
+    """The estimate follows the slope toward the target and not away from it."""
+    history = AnovaSampleHistory()
+    for second in range(0, 60, 10):
+        _append(history, second, 40.0 + second / 60)
+    assert history.heating_rate == 1.0
+    assert history.time_to_target(55.0) == (55.0 - 40.0 - 50 / 60) * 60
+    assert history.time_to_target(30.0) is None
+
+
+def test_slow_rate_still_estimates() -> None:
+    """A rate that rounds to zero still gives an estimate."""
+    history = AnovaSampleHistory()
+    # 0.003 °C a minute
+    for minute in range(7):
+        _append(history, minute * 60, 40.0 + minute * 0.003)
+    assert history.heating_rate == 0
+    assert history.time_to_target(40.018 + 0.03) == 600
+
+
+def test_wrap_around() -> None:
+    """Once full the oldest samples are overwritten and drop out of the sums."""
+    history = AnovaSampleHistory(capacity=4, rate_samples=2)
+    _append(history, 0, 50.0, state="MAINTAINING")
+    _append(history, 10, 60.0, state="MAINTAINING")
+    for second in range(20, 60, 10):
+        _append(history, second, 55.0 + second / 100, state="MAINTAINING")
+    assert len(history) == 4
+    assert history.memory_size == 4 * 33
+    # Only the last four samples, 55.2 to 55.5, are left
+    assert history.temperature_stability == round(0.0125**0.5, 3)
+    assert history.heating_rate == round(0.2 / 20 * 60, 2)
+    # Not maintaining any more, and the 55.2 sample fell out of the sums
+    _append(history, 60, 55.6)
+    assert history.temperature_stability is None
+    assert history._maintaining_count == 3
@@ -0,0 +1,53 @@
+"""Modules loaded to show the config flow."""
+import subprocess
+import sys
+from pathlib import Path
+
+# Already loaded by Home Assistant before any integration is
+PRELOADED = (
+    "aiohttp",
+    "voluptuous",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.aiohttp_client",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.device_registry",
+    "homeassistant.helpers.typing",
+)
+CONFIG_FLOW = "custom_components.anova_sous_vide.config_flow"
+# Loaded once an account is set up, never for the config flow
+HEAVY_MODULES = (
+    "anova_wifi",
+    "custom_components.anova_sous_vide.binary_sensor",
+    "custom_components.anova_sous_vide.climate",
+    "custom_components.anova_sous_vide.coordinator",
+    "custom_components.anova_sous_vide.scheduler",
+    "custom_components.anova_sous_vide.sensor",
+)
+
+
+def _loaded_modules(module: str) -> set[str]:
+    """Return the modules loaded in a fresh interpreter after importing module."""
+    code = "; ".join(f"import {name}" for name in (*PRELOADED, module))
+    code += "; import sys; print('\\n'.join(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return set(result.stdout.splitlines())
+
+
+def test_config_flow_imports() -> None:
+    """Showing the config flow doesn't load the API client or the pollers."""
+    modules = _loaded_modules(CONFIG_FLOW)
+    assert CONFIG_FLOW in modules
+    for name in HEAVY_MODULES:
+        assert name not in modules
+    assert not any(name.startswith("anova_wifi.") for name in modules)
+    assert {name for name in modules if name.startswith("custom_components.")} == {
+        "custom_components.anova_sous_vide",
+        "custom_components.anova_sous_vide.const",
+        CONFIG_FLOW,
+    }
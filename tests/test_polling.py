@@ -0,0 +1,136 @@
+"""Tests for the adaptive polling policy."""
+from datetime import timedelta
+
+from custom_components.anova_sous_vide.polling import AnovaCircuitBreaker
+from custom_components.anova_sous_vide.polling import AnovaPollingPolicy
+from custom_components.anova_sous_vide.util import build_apc_update
+
+from . import anova_state
+
+FAST = timedelta(seconds=5)
+INTERVAL = timedelta(seconds=30)
+IDLE = timedelta(seconds=300)
+
+
+def _policy() -> AnovaPollingPolicy:
+    return AnovaPollingPolicy(fast_interval=FAST, interval=INTERVAL, idle_interval=IDLE)
+
+
+def test_interval_by_state() -> None:
+    """The interval follows the state of the last update."""
+    policy = _policy()
+    assert policy.next_interval(None) == INTERVAL
+    assert policy.next_interval(build_apc_update(anova_state())) == IDLE
+    assert (
+        policy.next_interval(build_apc_update(anova_state(state="PREHEATING"))) == FAST
+    )
+    assert (
+        policy.next_interval(
+            build_apc_update(anova_state(state="COOKING", cook_time_remaining=3600))
+        )
+        == INTERVAL
+    )
+    assert (
+        policy.next_interval(
+            build_apc_update(anova_state(state="COOKING", cook_time_remaining=120))
+        )
+        == FAST
+    )
+    assert (
+        policy.next_interval(build_apc_update(anova_state(state="MAINTAINING")))
+        == INTERVAL
+    )
+
+
+def test_boost_polls_fast() -> None:
+    """A boost polls fast whatever the state."""
+    policy = _policy()
+    assert policy.next_interval(build_apc_update(anova_state()), boost=True) == FAST
+
+
+def test_configured_intervals() -> None:
+    """Configured intervals and thresholds are used."""
+    policy = AnovaPollingPolicy(
+        fast_interval=timedelta(seconds=2),
+        interval=timedelta(seconds=60),
+        idle_interval=timedelta(seconds=600),
+        nearly_done_threshold=60,
+    )
+    assert policy.next_interval(build_apc_update(anova_state())) == timedelta(
+        seconds=600
+    )
+    assert policy.next_interval(
+        build_apc_update(anova_state(state="COOKING", cook_time_remaining=120))
+    ) == timedelta(seconds=60)
+
+
+def test_simulated_day_with_fake_clock() -> None:
+    """Drive the policy through a cook on a fake clock and count the polls.
+
+    The cooker idles for 8 hours, preheats for 20 minutes, cooks for 2 hours
+    and then idles again until the day is over.
+    """
+    policy = _policy()
+    preheat_start = timedelta(hours=8)
+    cook_start = preheat_start + timedelta(minutes=20)
+    cook_end = cook_start + timedelta(hours=2)
+    day = timedelta(days=1)
+
+    def state_at(now: timedelta) -> dict:
+        if preheat_start <= now < cook_start:
+            return anova_state(state="PREHEATING", mode="COOK")
+        if cook_start <= now < cook_end:
+            return anova_state(
+                state="COOKING",
+                mode="COOK",
+                cook_time_remaining=int((cook_end - now).total_seconds()),
+            )
+        return anova_state()
+
+    now = timedelta(0)
+    polls = 0
+    fast_polls = 0
+    while now < day:
+        interval = policy.next_interval(build_apc_update(state_at(now)))
+        polls += 1
+        fast_polls += interval == FAST
+        now += interval
+
+    fixed_polls = day / INTERVAL
+    # Preheat and the last five minutes are polled fast
+    assert 280 <= fast_polls <= 320
+    # Idle hours barely cost anything, the whole day is far below fixed polling
+    assert polls < fixed_polls / 3
+
+
+def test_breaker_probes_no_sooner_than_before() -> None:
+    """An idle cooker isn't probed more often than it was polled."""
+    breaker = AnovaCircuitBreaker(INTERVAL, threshold=3)
+    for _ in range(3):
+        breaker.record_failure(IDLE)
+    assert breaker.is_open
+    intervals = []
+    for _ in range(10):
+        intervals.append(breaker.next_probe_interval())
+        breaker.record_failure(IDLE)
+    assert all(interval >= IDLE for interval in intervals)
+    assert max(intervals) <= breaker.max_probe_interval
+
+
+def test_breaker_backs_off_with_jitter() -> None:
+    """Probes of a cooker polled fast back off exponentially up to the cap."""
+    breaker = AnovaCircuitBreaker(INTERVAL, threshold=3)
+    for _ in range(3):
+        breaker.record_failure(FAST)
+    # Starts from the probe interval when it is longer than the poll interval
+    assert breaker.next_probe_interval() == INTERVAL
+    for _ in range(10):
+        breaker.record_failure(INTERVAL)
+    capped = {breaker.next_probe_interval() for _ in range(20)}
+    assert all(
+        INTERVAL <= interval <= breaker.max_probe_interval for interval in capped
+    )
+    # Cookers that went offline together don't all probe at the same moment
+    assert len(capped) > 1
+    assert breaker.record_success()
+    assert not breaker.is_open
@@ -0,0 +1,223 @@
+"""Tests for multi stage cook programs against a stubbed cooker."""
+import asyncio
+from collections.abc import Callable
+from datetime import timedelta
+from typing import Any
+from unittest.mock import MagicMock
+
+import aiohttp
+import pytest
+from anova_wifi import AnovaOffline
+from custom_components.anova_sous_vide.const import DOMAIN
+from custom_components.anova_sous_vide.const import EVENT_PROGRAM_COMPLETE
+from custom_components.anova_sous_vide.const import EVENT_PROGRAM_STAGE
+from custom_components.anova_sous_vide.const import PROGRAM_BOOST_WINDOW
+from custom_components.anova_sous_vide.coordinator import AnovaCoordinator
+from custom_components.anova_sous_vide.program import AnovaProgram
+from custom_components.anova_sous_vide.program import AnovaProgramStage
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant import config_entries
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from pytest_homeassistant_custom_component.common import async_capture_events
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from . import StubCooker
+
+
+@pytest.fixture
+async def coordinator(hass: HomeAssistant) -> AnovaCoordinator:
+    """Return a coordinator that has polled an idle stubbed cooker."""
+    entry = MockConfigEntry(domain=DOMAIN, data={})
+    entry.add_to_hass(hass)
+    config_entries.current_entry.set(entry)
+    coordinator = AnovaCoordinator(hass, StubCooker("cooker", water_temperature=20.0))
+    await coordinator.async_refresh()
+    return coordinator
+
+
+@pytest.fixture
+def on_done() -> MagicMock:
+    """Return the callback a program calls once it is done."""
+    return MagicMock()
+
+
+@pytest.fixture
+def program_factory(
+    hass: HomeAssistant, coordinator: AnovaCoordinator, on_done: MagicMock
+) -> Callable[[list[AnovaProgramStage]], AnovaProgram]:
+    """Return a factory for programs sending commands straight to the cooker."""
+    auth = MagicMock()
+
+    async def _async_call(func: Callable[..., Any], *args: Any) -> Any:
+        return await func(*args)
+
+    auth.async_call = _async_call
+    return lambda stages: AnovaProgram(hass, coordinator, auth, stages, on_done)
+
+
+async def _set_water(
+    hass: HomeAssistant, coordinator: AnovaCoordinator, temperature: float
+) -> None:
+    """Let the water reach temperature and poll the cooker."""
+    state = coordinator.anova_device.state
+    state["temperature-info"]["water-temperature"] = temperature
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+
+async def _advance(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, seconds: float
+) -> None:
+    freezer.tick(timedelta(seconds=seconds))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+
+async def test_stages_move_on_at_target(
+    hass: HomeAssistant,
+    coordinator: AnovaCoordinator,
+    program_factory: Callable[[list[AnovaProgramStage]], AnovaProgram],
+    on_done: MagicMock,
+) -> None:
+    """Each stage starts once the water reaches the target of the last one."""
+    stages = async_capture_events(hass, EVENT_PROGRAM_STAGE)
+    completes = async_capture_events(hass, EVENT_PROGRAM_COMPLETE)
+    cooker = coordinator.anova_device
+    program = program_factory([AnovaProgramStage(50.0), AnovaProgramStage(60.0)])
+    await program.async_start()
+    assert cooker.state["job"]["mode"] == "COOK"
+    assert cooker.state["job"]["target-temperature"] == 50.0
+    assert [event.data["stage"] for event in stages] == [1]
+    # Far from the target polls stay regular, close to it they speed up
+    await _set_water(hass, coordinator, 45.0)
+    assert not coordinator.boost_polling
+    await _set_water(hass, coordinator, 48.5)
+    assert coordinator.boost_polling
+    await _set_water(hass, coordinator, 49.7)
+    assert [event.data["stage"] for event in stages] == [1, 2]
+    assert cooker.state["job"]["target-temperature"] == 60.0
+    assert not coordinator.boost_polling
+    await _set_water(hass, coordinator, 60.0)
+    assert len(completes) == 1
+    assert on_done.call_count == 1
+    # Without a holding stage the cooker is turned off at the end
+    assert cooker.state["job"]["mode"] == "IDLE"
+    assert not coordinator._listeners
+
+
+async def test_duration_timer(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    coordinator: AnovaCoordinator,
+    program_factory: Callable[[list[AnovaProgramStage]], AnovaProgram],
+) -> None:
+    """A stage cooks for its duration once at target, polling fast near its end."""
+    completes = async_capture_events(hass, EVENT_PROGRAM_COMPLETE)
+    program = program_factory([AnovaProgramStage(50.0, duration=timedelta(minutes=10))])
+    await program.async_start()
+    await _set_water(hass, coordinator, 50.0)
+    assert not coordinator.boost_polling
+    await _advance(hass, freezer, 600 - PROGRAM_BOOST_WINDOW - 1)
+    assert not coordinator.boost_polling
+    await _advance(hass, freezer, 1)
+    assert coordinator.boost_polling
+    # Updates after the target was reached don't start the timer again
+    await _set_water(hass, coordinator, 50.2)
+    await _advance(hass, freezer, PROGRAM_BOOST_WINDOW)
+    assert len(completes) == 1
+    assert not coordinator.boost_polling
+    assert coordinator.anova_device.state["job"]["mode"] == "IDLE"
+
+
+async def test_hold_stage(
+    hass: HomeAssistant,
+    coordinator: AnovaCoordinator,
+    program_factory: Callable[[list[AnovaProgramStage]], AnovaProgram],
+    on_done: MagicMock,
+) -> None:
+    """A holding stage ends the program with the cooker still cooking."""
+    completes = async_capture_events(hass, EVENT_PROGRAM_COMPLETE)
+    program = program_factory([AnovaProgramStage(55.0, hold=True)])
+    await program.async_start()
+    await _set_water(hass, coordinator, 55.0)
+    assert len(completes) == 1
+    assert on_done.call_count == 1
+    job = coordinator.anova_device.state["job"]
+    assert (job["mode"], job["target-temperature"]) == ("COOK", 55.0)
+
+
+async def test_cancel_while_moving_stage(
+    hass: HomeAssistant,
+    coordinator: AnovaCoordinator,
+    program_factory: Callable[[list[AnovaProgramStage]], AnovaProgram],
+    on_done: MagicMock,
+) -> None:
+    """Stopping a program cancels the stage it is sending and releases the cooker."""
+    stages = async_capture_events(hass, EVENT_PROGRAM_STAGE)
+    cooker = coordinator.anova_device
+    program = program_factory([AnovaProgramStage(50.0), AnovaProgramStage(60.0)])
+    await program.async_start()
+    gate = asyncio.Event()
+    set_target_temperature = cooker.set_target_temperature
+
+    async def _slow_set_target_temperature(temperature: float) -> None:
+        await gate.wait()
+        await set_target_temperature(temperature)
+
+    cooker.set_target_temperature = _slow_set_target_temperature
+    await _set_water(hass, coordinator, 48.5)
+    # Reaching the target starts sending the second stage
+    cooker.state["temperature-info"]["water-temperature"] = 50.0
+    await coordinator.async_refresh()
+    await asyncio.sleep(0)
+    assert not program._transition.done()
+    program.async_stop()
+    gate.set()
+    await hass.async_block_till_done()
+    assert program._transition.cancelled()
+    assert [event.data["stage"] for event in stages] == [1]
+    assert cooker.state["job"]["target-temperature"] == 50.0
+    assert not coordinator.boost_polling
+    assert not coordinator._listeners
+    assert on_done.call_count == 0
+
+
+@pytest.mark.parametrize(
+    "error", [AnovaOffline("offline"), aiohttp.ClientError(), asyncio.TimeoutError()]
+)
+async def test_failing_first_stage_fails_the_call(
+    coordinator: AnovaCoordinator,
+    program_factory: Callable[[list[AnovaProgramStage]], AnovaProgram],
+    on_done: MagicMock,
+    error: Exception,
+) -> None:
+    """A cooker that refuses the first stage fails the service call."""
+    coordinator.anova_device.set_mode = MagicMock(side_effect=error)
+    program = program_factory([AnovaProgramStage(50.0)])
+    with pytest.raises(HomeAssistantError):
+        await program.async_start()
+    assert on_done.call_count == 1
+    assert not coordinator._listeners
+
+
+async def test_failing_later_stage_is_logged(
+    hass: HomeAssistant,
+    coordinator: AnovaCoordinator,
+    program_factory: Callable[[list[AnovaProgramStage]], AnovaProgram],
+    on_done: MagicMock,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """A stage failing in the background ends the program and is logged."""
+    completes = async_capture_events(hass, EVENT_PROGRAM_COMPLETE)
+    program = program_factory([AnovaProgramStage(50.0), AnovaProgramStage(60.0)])
+    await program.async_start()
+    coordinator.anova_device.set_target_temperature = MagicMock(
+        side_effect=AnovaOffline("offline")
+    )
+    await _set_water(hass, coordinator, 50.0)
+    assert "Could not start stage 2 of the cook program" in caplog.text
+    assert on_done.call_count == 1
+    assert not completes
+    assert not coordinator._listeners
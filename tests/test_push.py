@@ -0,0 +1,88 @@
+"""Tests for push updates, replayed against the local cloud."""
+import asyncio
+from collections.abc import AsyncGenerator
+from collections.abc import Callable
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+
+import pytest
+from custom_components.anova_sous_vide.push import AnovaPushListener
+from homeassistant.core import HomeAssistant
+
+from . import anova_state
+from .cloud import AnovaCloud
+from .cloud import state_frame
+
+
+@pytest.fixture
+async def push(
+    hass: HomeAssistant, anova_cloud: AnovaCloud
+) -> AsyncGenerator[tuple[AnovaPushListener, MagicMock], None]:
+    """Return a listener for one cooker connected to the local cloud."""
+    anova_cloud.add_device("cooker")
+    session = anova_cloud.session()
+    auth = MagicMock()
+    auth.async_ensure_firebase_token = AsyncMock(return_value="firebase-token")
+    auth.api.session = session
+    coordinator = MagicMock()
+    coordinator.anova_device.device_key = "cooker"
+    listener = AnovaPushListener(hass, auth, [coordinator])
+    yield listener, coordinator
+    listener.async_stop()
+    await asyncio.sleep(0)
+    await session.close()
+
+
+async def _wait_for(condition: Callable[[], bool]) -> None:
+    async with asyncio.timeout(5):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+async def test_replayed_frames_reach_the_coordinator(
+    anova_cloud: AnovaCloud, push: tuple[AnovaPushListener, MagicMock]
+) -> None:
+    """State frames are pushed, anything undecodable is skipped."""
+    listener, coordinator = push
+    anova_cloud.frames = [
+        "not json",
+        state_frame("other", anova_state()),
+        state_frame("cooker", anova_state(state="COOKING", mode="COOK")),
+    ]
+    listener.async_start()
+    await _wait_for(lambda: coordinator.async_set_push_data.called)
+    assert listener.connected
+    coordinator.async_set_push_data.assert_called_once()
+    data = coordinator.async_set_push_data.call_args.args[0]
+    assert data.binary_sensor.cooking
+    assert data.sensor.mode == "Cook"
+    coordinator.async_resume_polling.assert_not_called()
+
+
+async def test_closed_stream_falls_back_to_polling(
+    anova_cloud: AnovaCloud, push: tuple[AnovaPushListener, MagicMock]
+) -> None:
+    """Polling resumes as soon as the cloud hangs up."""
+    listener, coordinator = push
+    anova_cloud.close_after_frames = True
+    listener.async_start()
+    await _wait_for(lambda: coordinator.async_resume_polling.called)
+    assert not listener.connected
+    assert anova_cloud.requests["websocket"] == 1
+
+
+async def test_unexpected_error_keeps_listening(
+    anova_cloud: AnovaCloud, push: tuple[AnovaPushListener, MagicMock]
+) -> None:
+    """A frame that breaks the listener drops the connection, not the task."""
+    listener, coordinator = push
+    anova_cloud.frames = ["[]"]
+    listener.async_start()
+    await _wait_for(lambda: coordinator.async_resume_polling.called)
+    assert not listener.connected
+    assert not listener._task.done()
+    # The stream comes back after the backoff
+    anova_cloud.frames = [state_frame("cooker", anova_state(state="COOKING"))]
+    await asyncio.sleep(2)
+    await _wait_for(lambda: coordinator.async_set_push_data.called)
+    assert listener.connected
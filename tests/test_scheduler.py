@@ -0,0 +1,136 @@
+"""Tests for the scheduler shared by all accounts, on a fake clock."""
+import time
+from collections import Counter
+from collections.abc import AsyncGenerator
+from collections.abc import Callable
+from datetime import timedelta
+from typing import Any
+
+import pytest
+from custom_components.anova_sous_vide.const import DOMAIN
+from custom_components.anova_sous_vide.const import MAX_REQUEST_BURST
+from custom_components.anova_sous_vide.const import MAX_REQUESTS_PER_SECOND
+from custom_components.anova_sous_vide.coordinator import AnovaAccountCoordinator
+from custom_components.anova_sous_vide.coordinator import AnovaCoordinator
+from custom_components.anova_sous_vide.polling import AnovaRateLimiter
+from custom_components.anova_sous_vide.scheduler import AnovaScheduler
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant import config_entries
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from . import StubCooker
+
+# Polled every 30 s, the first two aren't actively cooking
+MAINTAINING = {"state": "MAINTAINING", "mode": "COOK"}
+COOKING = {"state": "COOKING", "mode": "COOK"}
+
+AddAccount = Callable[..., list[StubCooker]]
+
+
+@pytest.fixture
+async def scheduler(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> AsyncGenerator[tuple[AnovaScheduler, AddAccount], None]:
+    """Return a scheduler on the fake clock and a way to add accounts to it."""
+    entry = MockConfigEntry(domain=DOMAIN, data={})
+    entry.add_to_hass(hass)
+    # Looked up while frozen, so the budget refills on the fake clock
+    scheduler = AnovaScheduler(hass, AnovaRateLimiter(clock=time.monotonic))
+    accounts: list[AnovaAccountCoordinator] = []
+
+    def _add_account(cookers: int, **state: Any) -> list[StubCooker]:
+        prefix = f"account{len(accounts)}"
+        # Set here, fixtures run in a context of their own
+        config_entries.current_entry.set(entry)
+        stubs = [StubCooker(f"{prefix}-{index}", **state) for index in range(cookers)]
+        account = AnovaAccountCoordinator(
+            hass, [AnovaCoordinator(hass, stub) for stub in stubs]
+        )
+        accounts.append(account)
+        scheduler.async_add_account(account)
+        account.async_refresh_all()
+        return stubs
+
+    yield scheduler, _add_account
+    for account in accounts:
+        scheduler.async_remove_account(account)
+
+
+async def _advance(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, seconds: int
+) -> None:
+    for _ in range(seconds):
+        freezer.tick(timedelta(seconds=1))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+
+async def test_polls_are_spread_evenly(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    scheduler: tuple[AnovaScheduler, AddAccount],
+) -> None:
+    """Cookers of several accounts take turns instead of polling together."""
+    _, add_account = scheduler
+    cookers = [cooker for _ in range(3) for cooker in add_account(4, **MAINTAINING)]
+    # Set up at the same moment, the first polls go out as fast as allowed
+    await _advance(hass, freezer, 120)
+    start = dt_util.utcnow()
+    await _advance(hass, freezer, 60)
+    for cooker in cookers:
+        polls = [poll for poll in cooker.updates if poll > start]
+        assert [later - earlier for earlier, later in zip(polls, polls[1:])] == [
+            timedelta(seconds=30)
+        ]
+    polls = sorted(
+        poll
+        for cooker in cookers
+        for poll in cooker.updates
+        if start < poll <= start + timedelta(seconds=30)
+    )
+    assert len(polls) == 12
+    # 12 cookers polled every 30 s, one every 2.5 s on one second ticks
+    gaps = {
+        (later - earlier).total_seconds() for earlier, later in zip(polls, polls[1:])
+    }
+    assert gaps <= {2.0, 3.0}
+
+
+async def test_rate_is_capped(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    scheduler: tuple[AnovaScheduler, AddAccount],
+) -> None:
+    """Accounts due at the same time share the request budget, cooking first."""
+    anova_scheduler, add_account = scheduler
+    idle = add_account(20, **MAINTAINING) + add_account(20, **MAINTAINING)
+    cooking = add_account(20, **COOKING)
+    await _advance(hass, freezer, 40)
+    first_polls = Counter(cooker.updates[0] for cooker in idle + cooking)
+    first = min(first_polls)
+    # The burst and then the steady rate, however many cookers are due
+    assert first_polls[first] == MAX_REQUEST_BURST
+    assert (max(first_polls) - first).total_seconds() == (
+        60 - MAX_REQUEST_BURST
+    ) / MAX_REQUESTS_PER_SECOND
+    # Everything due at once again, now that the cookers are known to cook
+    for cooker in idle + cooking:
+        cooker.updates.clear()
+    for account in anova_scheduler.accounts:
+        account.async_refresh_all()
+    await _advance(hass, freezer, 40)
+    per_second = Counter(poll for cooker in idle + cooking for poll in cooker.updates)
+    first = min(per_second)
+    # Polls in phase keep going, so the burst may be partly spent already
+    assert per_second[first] <= MAX_REQUEST_BURST
+    assert all(
+        count <= MAX_REQUESTS_PER_SECOND
+        for second, count in per_second.items()
+        if second != first
+    )
+    assert max(cooker.updates[0] for cooker in cooking) < min(
+        cooker.updates[0] for cooker in idle
+    )
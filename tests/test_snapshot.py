@@ -0,0 +1,228 @@
+"""Cost of writing sensor states from snapshots, against reading the update."""
+import tracemalloc
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import pytest
+from anova_wifi import APCUpdate
+from custom_components.anova_sous_vide.const import DOMAIN
+from custom_components.anova_sous_vide.coordinator import AnovaCoordinator
+from custom_components.anova_sous_vide.entity import AnovaEntity
+from custom_components.anova_sous_vide.sensor import AnovaSensor
+from custom_components.anova_sous_vide.sensor import SENSOR_DESCRIPTIONS
+from custom_components.anova_sous_vide.snapshot import BINARY_SENSOR_FIELDS
+from custom_components.anova_sous_vide.snapshot import build_snapshot
+from custom_components.anova_sous_vide.snapshot import SENSOR_FIELDS
+from custom_components.anova_sous_vide.util import build_apc_update
+from homeassistant import config_entries
+from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import SensorEntityDescription
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.typing import StateType
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.common import MockEntityPlatform
+
+from . import anova_state
+from . import StubCooker
+
+POLLS = 10
+ENTITIES = 1000
+
+
+@dataclass
+class ValueFnSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor read through a function, as before snapshots."""
+
+    value_fn: Callable[[AnovaCoordinator], StateType] = lambda coordinator: None
+
+
+class ValueFnSensor(AnovaEntity, SensorEntity):
+    """A sensor as it was before snapshots, for comparison."""
+
+    entity_description: ValueFnSensorEntityDescription
+
+    def __init__(
+        self, coordinator: AnovaCoordinator, description: SensorEntityDescription
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"before_{description.key}"
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the state."""
+        return self.entity_description.value_fn(self.coordinator)
+
+
+# The value functions of the sensors before snapshots
+VALUE_FNS: dict[str, Callable[[AnovaCoordinator], StateType]] = {
+    "cook_time": lambda coordinator: coordinator.data.sensor.cook_time,
+    "state": lambda coordinator: coordinator.data.sensor.state,
+    "mode": lambda coordinator: coordinator.data.sensor.mode,
+    "target_temperature": lambda coordinator: (
+        coordinator.data.sensor.target_temperature
+    ),
+    "cook_time_remaining": lambda coordinator: (
+        coordinator.data.sensor.cook_time_remaining
+    ),
+    "heater_temperature": lambda coordinator: (
+        coordinator.data.sensor.heater_temperature
+    ),
+    "triac_temperature": lambda coordinator: coordinator.data.sensor.triac_temperature,
+    "water_temperature": lambda coordinator: coordinator.data.sensor.water_temperature,
+    "heating_rate": lambda coordinator: coordinator.history.heating_rate,
+    "time_to_target": lambda coordinator: coordinator.history.time_to_target(
+        coordinator.data.sensor.target_temperature
+    ),
+    "temperature_stability": lambda coordinator: (
+        coordinator.history.temperature_stability
+    ),
+}
+
+
+class CountingProxy:
+    """Counts the attributes read from an object and the objects within it."""
+
+    def __init__(self, target: Any, reads: Counter[str], nested: tuple[str, ...]):
+        """Wrap target, counting into reads."""
+        self._target = target
+        self._reads = reads
+        self._nested = nested
+
+    def __getattr__(self, name: str) -> Any:
+        """Count the read and pass it on."""
+        self._reads[name] += 1
+        value = getattr(self._target, name)
+        if name in self._nested:
+            return CountingProxy(value, self._reads, ())
+        return value
+
+
+@pytest.fixture
+async def coordinator(hass: HomeAssistant) -> AnovaCoordinator:
+    """Return a coordinator that has polled a stubbed cooker."""
+    entry = MockConfigEntry(domain=DOMAIN, data={})
+    entry.add_to_hass(hass)
+    config_entries.current_entry.set(entry)
+    coordinator = AnovaCoordinator(hass, StubCooker("cooker", state="COOKING"))
+    await coordinator.async_refresh()
+    return coordinator
+
+
+def _descriptions() -> list[SensorEntityDescription]:
+    return [
+        description
+        for description in SENSOR_DESCRIPTIONS
+        if description.key in VALUE_FNS
+    ]
+
+
+def _write_states(
+    coordinator: AnovaCoordinator,
+    sensors: list[SensorEntity],
+    decode: Callable[[APCUpdate], None],
+) -> tuple[int, int]:
+    """Return the update fields and history values read per poll.
+
+    Every poll changes the water temperature and every sensor writes its
+    state, the most a poll can cost.
+    """
+    reads: Counter[str] = Counter()
+    history = coordinator.history
+    coordinator.history = CountingProxy(history, reads, ())
+    for poll in range(POLLS):
+        data = build_apc_update(
+            anova_state(state="COOKING", water_temperature=40.0 + poll)
+        )
+        decode(CountingProxy(data, reads, ("sensor", "binary_sensor")))
+        for sensor in sensors:
+            sensor.async_write_ha_state()
+    coordinator.history = history
+    history_reads = sum(
+        reads.pop(name, 0)
+        for name in ("heating_rate", "time_to_target", "temperature_stability")
+    )
+    update_reads = reads.total() - reads["sensor"] - reads["binary_sensor"]
+    return update_reads // POLLS, history_reads // POLLS
+
+
+def _entity_bytes(create: Callable[[], Any]) -> float:
+    """Return the bytes allocated per entity created."""
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    entities = [create() for _ in range(ENTITIES)]
+    allocated = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    assert len(entities) == ENTITIES
+    return allocated / ENTITIES
+
+
+async def test_snapshot_cost(
+    hass: HomeAssistant, coordinator: AnovaCoordinator, record_property
+) -> None:
+    """Report the reads per poll and memory per entity before and after snapshots.
+
+    Before, a poll diffed every field of the update and each state write read
+    its field from the update again. With snapshots a poll reads every field
+    once and state writes index the snapshot. Memory is only reported, the
+    per field index sets are shared so an entity costs what it did before.
+    """
+    descriptions = _descriptions()
+    before_sensors = [
+        ValueFnSensor(
+            coordinator,
+            ValueFnSensorEntityDescription(
+                key=description.key,
+                name=f"before {description.key}",
+                value_fn=VALUE_FNS[description.key],
+            ),
+        )
+        for description in descriptions
+    ]
+    after_sensors = [
+        AnovaSensor(coordinator, description) for description in descriptions
+    ]
+    await MockEntityPlatform(hass).async_add_entities(before_sensors + after_sensors)
+    assert [sensor.native_value for sensor in before_sensors] == [
+        sensor.native_value for sensor in after_sensors
+    ]
+
+    def _decode_before(data: APCUpdate) -> None:
+        coordinator.data = data
+        # The update was diffed field by field against the last one
+        for update in (data.sensor, data.binary_sensor):
+            for name in vars(update._target):
+                getattr(update, name)
+
+    def _decode_after(data: APCUpdate) -> None:
+        coordinator.data = data
+        coordinator.snapshot = build_snapshot(data, coordinator.history, None)
+
+    before_update_reads, before_history_reads = _write_states(
+        coordinator, before_sensors, _decode_before
+    )
+    after_update_reads, after_history_reads = _write_states(
+        coordinator, after_sensors, _decode_after
+    )
+    before_description = before_sensors[-1].entity_description
+    before_bytes = _entity_bytes(lambda: ValueFnSensor(coordinator, before_description))
+    after_bytes = _entity_bytes(lambda: AnovaSensor(coordinator, descriptions[-1]))
+    for name, value in (
+        ("update_reads_per_poll_before", before_update_reads),
+        ("update_reads_per_poll_after", after_update_reads),
+        ("history_reads_per_poll_before", before_history_reads),
+        ("history_reads_per_poll_after", after_history_reads),
+        ("entity_bytes_before", round(before_bytes)),
+        ("entity_bytes_after", round(after_bytes)),
+    ):
+        record_property(name, value)
+    # Each field of the update once, plus the target for the time to target,
+    # where before every field was diffed
+    assert after_update_reads == len(SENSOR_FIELDS) + len(BINARY_SENSOR_FIELDS) + 1
+    # and every sensor but the three derived ones reading its field again
+    assert before_update_reads == after_update_reads + len(VALUE_FNS) - 3
+    # Each derived value once, also when several entities show it
+    assert after_history_reads == before_history_reads == 3